@@ -1,15 +1,15 @@
 from flask import Flask
 from .extensions import db, migrate, login_manager
-from datetime import datetime
-from .cart.cart_utils import cart_count  # adjust import path if needed
+from . import sqlite_utils, template_globals
 
 
-def create_app():
+def create_app(config_object='config.Config'):
 
     app = Flask(__name__)
-    app.config.from_object('config.Config')
+    app.config.from_object(config_object)
 
     db.init_app(app)
+    sqlite_utils.init_app(app)  # WAL & co. on every connection, fresh pool after fork
     migrate.init_app(app, db)
     login_manager.init_app(app)
 
@@ -36,18 +36,15 @@ def create_app():
     def healthz():
         return "ok", 200
 
-    @app.context_processor
-    def inject_globals():
-        return {
-            "cart_items_count": cart_count(),                # badge number
-            "current_year": datetime.utcnow().year,          # footer year
-        }
+    # COUNTRIES, cart badge, footer year -- computed lazily, once per request
+    template_globals.init_app(app)
 
     return app
 
 
-from .models import User
+from .principal import load_principal
 #What tf is this for?
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
\ No newline at end of file
+    # user + customer/supplier/admin profile, cached per worker (app/principal.py)
+    return load_principal(int(user_id))
\ No newline at end of file
@@ -1,4 +1,4 @@
 from flask import Blueprint
 admin = Blueprint('admin', __name__, template_folder='templates')
 
-from . import routes
+from . import routes, commands
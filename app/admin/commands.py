@@ -0,0 +1,20 @@
+# app/admin/commands.py
+import click
+
+from . import admin
+from .metrics import rebuild_metrics
+from .supplier_search import rebuild_supplier_search
+
+
+@admin.cli.command("rebuild-metrics")
+def rebuild_metrics_command():
+    """Recount the admin dashboard counters from scratch (flask admin rebuild-metrics)."""
+    rows = rebuild_metrics()
+    click.echo(f"Rebuilt {rows} metric rows.")
+
+
+@admin.cli.command("rebuild-supplier-search")
+def rebuild_supplier_search_command():
+    """Rebuild the admin supplier lookup index (flask admin rebuild-supplier-search)."""
+    count = rebuild_supplier_search()
+    click.echo(f"Indexed {count} suppliers.")
@@ -1,7 +1,7 @@
 # app/admin/forms.py
 from flask_wtf import FlaskForm
-from wtforms import StringField, SelectField, SubmitField
-from wtforms.validators import Optional
+from wtforms import StringField, SelectField, SubmitField, TextAreaField
+from wtforms.validators import Optional, Length
 
 STATUS_CHOICES = [
     ("", "Submitted & Under Review"),
@@ -23,6 +23,7 @@ class VerificationFilterForm(FlaskForm):
 
 
 class VerificationActionForm(FlaskForm):
+    note = TextAreaField("Note to supplier", validators=[Optional(), Length(max=500)])
     approve = SubmitField("Approve")
     needs_more_info = SubmitField("Needs Info")
     reject = SubmitField("Reject")
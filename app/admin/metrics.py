@@ -0,0 +1,145 @@
+# app/admin/metrics.py
+"""
+Counters for the admin dashboard.
+
+`admin_metric` holds one row per (metric, dim1, dim2, day):
+
+  suppliers -- status, registration country      (day '')
+  products  -- status or DELETED, category        (day '')
+  signups   -- role, ''                           (day of User.created_at)
+
+Triggers on supplier, product and user move a row's count from its old key
+to its new one on insert, update and delete. They sit in the database rather
+than in ORM events, so bulk UPDATEs (product_actions, review_actions) are
+counted too. The dashboard reads a few dozen rows instead of grouping the
+base tables. `flask admin rebuild-metrics` recounts everything from scratch.
+"""
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import event, text
+
+from app.extensions import db
+from app.models import AdminMetric, ProductStatus, SupplierStatus
+from app.sqlite_utils import is_sqlite
+
+# metric -> (table, columns whose change moves the row, dim1, dim2, day); `r` is the row alias
+METRICS = {
+    "suppliers": ("supplier", "status, reg_country", "{r}.status", "coalesce({r}.reg_country, '')", "''"),
+    "products": ("product", "status, is_deleted, category",
+                 "CASE WHEN {r}.is_deleted THEN 'DELETED' ELSE {r}.status END",
+                 "coalesce({r}.category, '')", "''"),
+    "signups": ("user", "role, created_at", "{r}.role", "''", "coalesce(date({r}.created_at), '')"),
+}
+KEY = "metric, dim1, dim2, day"
+SIGNUP_DAYS = 30
+
+
+def _key_sql(metric: str, row: str) -> str:
+    _table, _columns, *exprs = METRICS[metric]
+    return ", ".join([f"'{metric}'"] + [expr.format(r=row) for expr in exprs])
+
+
+def _bump(metric: str, row: str) -> str:
+    return f"""INSERT INTO admin_metric ({KEY}, n) VALUES ({_key_sql(metric, row)}, 1)
+            ON CONFLICT ({KEY}) DO UPDATE SET n = n + 1;"""
+
+
+def _drop(metric: str, row: str) -> str:
+    return f"""UPDATE admin_metric SET n = n - 1 WHERE ({KEY}) = ({_key_sql(metric, row)});
+            DELETE FROM admin_metric WHERE ({KEY}) = ({_key_sql(metric, row)}) AND n <= 0;"""
+
+
+def _changed(metric: str) -> str:
+    _table, _columns, *exprs = METRICS[metric]
+    return " OR ".join(f"({e.format(r='old')}) IS NOT ({e.format(r='new')})" for e in exprs)
+
+
+METRICS_DDL = tuple(
+    ddl
+    for metric, (table, columns, *_exprs) in METRICS.items()
+    for ddl in (
+        f"""
+        CREATE TRIGGER IF NOT EXISTS admin_metric_{metric}_ai AFTER INSERT ON "{table}"
+        BEGIN
+            {_bump(metric, 'new')}
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS admin_metric_{metric}_au AFTER UPDATE OF {columns} ON "{table}"
+        WHEN {_changed(metric)}
+        BEGIN
+            {_drop(metric, 'old')}
+            {_bump(metric, 'new')}
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS admin_metric_{metric}_ad AFTER DELETE ON "{table}"
+        BEGIN
+            {_drop(metric, 'old')}
+        END
+        """,
+    )
+)
+
+
+@event.listens_for(db.metadata, "after_create")
+def install_metric_triggers(target, connection, **kw):
+    if not is_sqlite(connection):
+        return
+    for ddl in METRICS_DDL:
+        connection.execute(text(ddl))
+
+
+def rebuild_metrics() -> int:
+    """Recount every metric from the base tables. Returns the number of rows."""
+    conn = db.session.connection()
+    conn.execute(text("DELETE FROM admin_metric"))
+    rows = 0
+    for metric, (table, *_rest) in METRICS.items():
+        rows += conn.execute(text(
+            f'INSERT INTO admin_metric ({KEY}, n) '
+            f'SELECT {_key_sql(metric, "t")}, count(*) FROM "{table}" t GROUP BY 2, 3, 4'
+        )).rowcount
+    db.session.commit()
+    return rows
+
+
+def dashboard_metrics(today: date = None) -> dict:
+    """Everything the admin dashboard shows, from the counters alone."""
+    today = today or datetime.utcnow().date()   # days are UTC, as CURRENT_TIMESTAMP writes them
+    since = today - timedelta(days=SIGNUP_DAYS - 1)
+    rows = AdminMetric.query.filter(db.or_(
+        AdminMetric.metric.in_(("suppliers", "products")),
+        db.and_(AdminMetric.metric == "signups", AdminMetric.day >= since.isoformat()),
+    )).all()
+
+    suppliers, pending_by_country, products, live_by_category = {}, {}, {}, {}
+    signups = {(since + timedelta(days=i)).isoformat(): 0 for i in range(SIGNUP_DAYS)}
+    signups_by_role = {}
+    for row in rows:
+        if row.metric == "suppliers":
+            status = SupplierStatus[row.dim1]
+            suppliers[status.value] = suppliers.get(status.value, 0) + row.n
+            if status in (SupplierStatus.SUBMITTED, SupplierStatus.UNDER_REVIEW):
+                pending_by_country[row.dim2] = pending_by_country.get(row.dim2, 0) + row.n
+        elif row.metric == "products":
+            status = "deleted" if row.dim1 == "DELETED" else ProductStatus[row.dim1].value
+            products[status] = products.get(status, 0) + row.n
+            if status == ProductStatus.LIVE.value:
+                live_by_category[row.dim2] = live_by_category.get(row.dim2, 0) + row.n
+        elif row.day in signups:
+            signups[row.day] += row.n
+            signups_by_role[row.dim1] = signups_by_role.get(row.dim1, 0) + row.n
+
+    week = (today - timedelta(days=6)).isoformat()
+    return {
+        "suppliers": dict(sorted(suppliers.items())),   # status value -> n
+        "suppliers_total": sum(suppliers.values()),
+        "pending": sum(pending_by_country.values()),
+        "pending_by_country": dict(sorted(pending_by_country.items(), key=lambda kv: -kv[1])),
+        "products": dict(sorted(products.items())),     # status value or "deleted" -> n
+        "live_by_category": dict(sorted(live_by_category.items(), key=lambda kv: -kv[1])[:10]),
+        "signups": signups,
+        "signups_by_role": signups_by_role,
+        "signups_7d": sum(n for day, n in signups.items() if day >= week),
+    }
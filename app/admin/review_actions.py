@@ -0,0 +1,73 @@
+# app/admin/review_actions.py
+"""
+Approve / request more info / reject, for one supplier or a few hundred.
+
+Each action is one UPDATE guarded by the statuses it may start from and by
+the admin's country scope. It records the reviewer, the time and the note
+along with the new status, and RETURNING tells us which ids it touched.
+Whatever didn't match is looked up once more to say why it was skipped.
+Listing, export and page-cache triggers on supplier.status react as for any
+other status change.
+"""
+from sqlalchemy import func, select, update
+
+from app.extensions import db
+from app.models import Supplier, SupplierStatus
+
+# statuses a review decision can be taken on
+REVIEWABLE = (SupplierStatus.SUBMITTED, SupplierStatus.UNDER_REVIEW,
+              SupplierStatus.NEEDS_MORE_INFO, SupplierStatus.REJECTED)
+
+# action -> (statuses it applies to, new status)
+REVIEW_ACTIONS = {
+    "approve": (REVIEWABLE, SupplierStatus.APPROVED),
+    "needs_more_info": ((SupplierStatus.SUBMITTED, SupplierStatus.UNDER_REVIEW), SupplierStatus.NEEDS_MORE_INFO),
+    "reject": ((SupplierStatus.SUBMITTED, SupplierStatus.UNDER_REVIEW, SupplierStatus.NEEDS_MORE_INFO),
+               SupplierStatus.REJECTED),
+}
+MAX_IDS = 1000
+
+
+def _skip_reason(row, scope_country) -> str:
+    if row is None:
+        return "not found"
+    if scope_country and (row.reg_country or "").upper() != scope_country:
+        return "outside your country"
+    return f"is {row.status.value}"
+
+
+def bulk_review_action(admin, scope_country, action: str, supplier_ids, note: str = None):
+    """
+    Apply `action` to the given suppliers as `admin` (an Admin row) and commit.
+    `scope_country` is the country a country admin is limited to, or None.
+    Returns (changed ids, {skipped id: reason}); ids past MAX_IDS are skipped unchanged.
+    """
+    ids = list(dict.fromkeys(int(sid) for sid in supplier_ids))
+    # past MAX_IDS nothing is touched, but each id still gets an outcome
+    ids, over_limit = ids[:MAX_IDS], {sid: "over the batch limit" for sid in ids[MAX_IDS:]}
+    if not ids:
+        return [], over_limit
+
+    sources, target = REVIEW_ACTIONS[action]
+    conditions = [Supplier.id.in_(ids), Supplier.status.in_(sources)]
+    if scope_country:
+        conditions.append(func.upper(Supplier.reg_country) == scope_country)
+    changed = db.session.execute(
+        update(Supplier)
+        .where(*conditions)
+        .values(status=target, reviewed_at=func.now(), reviewed_by=admin.id,
+                reviewer_note=(note or "").strip()[:500] or None)
+        .returning(Supplier.id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+    db.session.commit()
+
+    missed = [sid for sid in ids if sid not in set(changed)]
+    skipped = {}
+    if missed:
+        rows = {row.id: row for row in db.session.execute(
+            select(Supplier.id, Supplier.status, Supplier.reg_country).where(Supplier.id.in_(missed))
+        )}
+        skipped = {sid: _skip_reason(rows.get(sid), scope_country) for sid in missed}
+    skipped.update(over_limit)
+    return changed, skipped
@@ -1,9 +1,14 @@
-from flask import render_template, request, flash, redirect, url_for
+from flask import render_template, request, flash, redirect, url_for, abort, jsonify
 from flask_login import login_required, current_user
-from app.security import role_required
+from app.security import role_required, admin_country_scope, can_view_supplier_documents
 from app.models import User, Supplier, SupplierStatus
 from app.extensions import db
+from app.pagination import keyset_paginate, cached_count
 from .forms import VerificationFilterForm, VerificationActionForm
+from .verification import queue_query, queue_summary, QUEUE_KEYS
+from .review_actions import REVIEW_ACTIONS, bulk_review_action
+from .metrics import dashboard_metrics
+from .supplier_search import lookup_suppliers, LOOKUP_LIMIT
 from . import admin
 
 COUNTRIES = [
@@ -20,12 +25,15 @@ COUNTRIES = [
     ("TL", "Timor-Leste"),
 ]
 
+REVIEW_MESSAGES = {"approve": "approved", "needs_more_info": "marked as needs more info", "reject": "rejected"}
+REVIEW_CATEGORIES = {"approve": "success", "needs_more_info": "warning", "reject": "danger"}
+
 
 @admin.route("/dashboard")
 @login_required
 @role_required('admin')
 def dashboard():
-    return render_template("admin/dashboard.html")
+    return render_template("admin/dashboard.html", metrics=dashboard_metrics())
 
 
 @admin.route("/verification_queue", methods=["GET"])
@@ -33,44 +41,25 @@ def dashboard():
 @role_required('admin')
 def verification_queue():
     form = VerificationFilterForm(request.args)
-    # country field only for global admin (hide/ignore for country_admin)
-    if current_user.role == "admin":
-        form.country.choices = [("", "All")] + COUNTRIES
-    else:
-        form.country.choices = [("", "All")]
-
-    q = Supplier.query
-
-    # scope by country for country_admins
-    if current_user.role == "country_admin" and current_user.country_code:
-        q = q.filter(Supplier.reg_country == current_user.country_code.upper())
+    # country admins only ever see their own country
+    scope_country = admin_country_scope(current_user)
+    form.country.choices = [("", "All")] + ([] if scope_country else COUNTRIES)
 
     # read normalized values from form
     search = (form.q.data or "").strip()
     status_str = (form.status.data or "").strip()
     country = (form.country.data or "").strip().upper()
-
-    # status default: submitted + under_review
-    if status_str:
-        try:
-            q = q.filter(Supplier.status == SupplierStatus(status_str))
-        except ValueError:
-            pass
-    else:
-        q = q.filter(Supplier.status.in_([SupplierStatus.SUBMITTED, SupplierStatus.UNDER_REVIEW]))
-
-    if current_user.role == "admin" and country:
-        q = q.filter(Supplier.reg_country == country)
-
-    if search:
-        like = f"%{search}%"
-        q = q.join(User).filter(or_(
-            Supplier.business_name.ilike(like),
-            Supplier.company_registration_number.ilike(like),
-            User.email.ilike(like),
-        ))
-
-    suppliers = q.order_by(Supplier.submitted_at.desc().nullslast(), Supplier.id.desc()).all()
+    try:
+        status = SupplierStatus(status_str) if status_str else None
+    except ValueError:
+        status = None
+
+    q = queue_query(scope_country, status, country, search)
+    suppliers = keyset_paginate(
+        q, QUEUE_KEYS,
+        after=request.args.get("after"), before=request.args.get("before"), per_page=25,
+        total=cached_count(q, ("admin.verification_queue", scope_country, status_str, country, search)),
+    )
 
     action_form = VerificationActionForm()  # for inline row actions
 
@@ -78,34 +67,97 @@ def verification_queue():
         "admin/verification_queue.html",
         form=form,                # pass the form
         suppliers=suppliers,
+        summary=queue_summary(scope_country),
+        current_filters={"q": search, "status": status_str, "country": country},
         countries=COUNTRIES,      # only needed if your template still uses it elsewhere
         action_form=action_form
     )
 
 
 
+@admin.route("/suppliers/lookup")
+@login_required
+@role_required('admin')
+def supplier_lookup():
+    """Typeahead: GET ?q=term -> {"results": [...], "truncated": bool}."""
+    limit = max(1, min(request.args.get("limit", LOOKUP_LIMIT, type=int), 25))
+    suppliers, truncated = lookup_suppliers(request.args.get("q", ""), admin_country_scope(current_user), limit=limit)
+    return jsonify(results=[{
+        "id": s.id,
+        "business_name": s.business_name,
+        "registration_number": s.company_registration_number,
+        "email": s.user.email,
+        "country": s.reg_country,
+        "status": s.status.value,
+        "url": url_for("admin.verification_detail", supplier_id=s.id),
+    } for s in suppliers], truncated=truncated)
+
+
 @admin.route("/verification/<int:supplier_id>", methods=["GET", "POST"])
 @login_required
+@role_required('admin')
 def verification_detail(supplier_id):
     supplier = Supplier.query.get_or_404(supplier_id)
+    if not can_view_supplier_documents(current_user, supplier):
+        abort(404)
     form = VerificationActionForm()
 
     if form.validate_on_submit():
-        if form.approve.data:
-            supplier.status = SupplierStatus.APPROVED
-            flash(f"{supplier.business_name or 'Supplier'} approved.", "success")
-        elif form.needs_more_info.data:
-            supplier.status = SupplierStatus.NEEDS_MORE_INFO
-            flash(f"{supplier.business_name or 'Supplier'} marked as needs more info.", "warning")
-        elif form.reject.data:
-            supplier.status = SupplierStatus.REJECTED
-            flash(f"{supplier.business_name or 'Supplier'} rejected.", "danger")
-        db.session.commit()
+        action = next((a for a in REVIEW_ACTIONS if form[a].data), None)
+        if action is None or current_user.admin is None:
+            abort(400)
+        changed, skipped = bulk_review_action(current_user.admin, admin_country_scope(current_user),
+                                              action, [supplier.id], form.note.data)
+        name = supplier.business_name or 'Supplier'
+        if changed:
+            flash(f"{name}: {REVIEW_MESSAGES[action]}.", REVIEW_CATEGORIES[action])
+        else:
+            flash(f"{name} not changed: {skipped[supplier.id]}.", "warning")
         return redirect(url_for("admin.verification_queue"))
 
     return render_template("admin/verification_detail.html", supplier=supplier, form=form)
 
 
+@admin.route("/verification/bulk", methods=["POST"])
+@login_required
+@role_required('admin')
+def verification_bulk():
+    """
+    Decide many suppliers at once: form fields `action`, `supplier_ids` (repeated)
+    and `note`. Answers JSON {"changed": [...], "skipped": {id: reason}} to
+    clients that ask for it, else flashes a summary and goes back to the queue.
+    """
+    form = VerificationActionForm()
+    action = request.form.get("action")
+    back = url_for("admin.verification_queue", **{k: v for k in ("q", "status", "country", "after")
+                                                  if (v := request.form.get(k))})
+    if not form.validate_on_submit() or current_user.admin is None:
+        abort(400)
+    if action not in REVIEW_ACTIONS:
+        flash("Choose an action.", "warning")
+        return redirect(back)
+    try:
+        ids = [int(sid) for sid in request.form.getlist("supplier_ids")]
+    except ValueError:
+        abort(400)
+
+    changed, skipped = bulk_review_action(current_user.admin, admin_country_scope(current_user),
+                                          action, ids, form.note.data)
+    if request.accept_mimetypes.best == "application/json":
+        return jsonify(changed=changed, skipped={str(k): v for k, v in skipped.items()})
+
+    if not ids:
+        flash("Select at least one supplier.", "warning")
+    if changed:
+        flash(f"{len(changed)} supplier(s): {REVIEW_MESSAGES[action]}.", REVIEW_CATEGORIES[action])
+    if skipped:
+        reasons = {}
+        for reason in skipped.values():
+            reasons[reason] = reasons.get(reason, 0) + 1
+        flash(f"{len(skipped)} skipped: " + ", ".join(f"{n} {r}" for r, n in reasons.items()), "warning")
+    return redirect(back)
+
+
 
 # @admin.route("/verification_queue")
 # @login_required
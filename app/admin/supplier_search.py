@@ -0,0 +1,163 @@
+# app/admin/supplier_search.py
+"""
+Supplier lookup for admins: business name, registration number, email.
+
+`supplier_fts` is an FTS5 table with the trigram tokenizer, one row per
+supplier (rowid = supplier.id) holding those three fields, email lowercased.
+Trigram MATCH finds any substring of three characters or more without a
+table scan. Triggers on supplier and user keep it in sync.
+
+A full registration number or email address takes the fast path first:
+equality on the unique registration number index and on ix_user_email_lower.
+Typeahead runs under ADMIN_LOOKUP_BUDGET_MS. Past the budget it answers with
+what it has so far and says the list was truncated.
+"""
+from flask import current_app
+from sqlalchemy import column, event, func, literal_column, or_, select, table, text
+from sqlalchemy.orm import contains_eager
+
+from app.extensions import db
+from app.models import Supplier, User
+from app.sqlite_utils import is_sqlite, query_deadline, QueryBudgetExceeded
+
+FTS_TABLE = "supplier_fts"
+MIN_TERM = 3   # shortest substring the trigram index can answer
+LOOKUP_LIMIT = 10
+
+_fts = table(FTS_TABLE, column("rowid"))
+
+_ROW = """coalesce({r}.business_name, ''), coalesce({r}.company_registration_number, ''),
+            coalesce((SELECT lower(email) FROM "user" WHERE id = {r}.user_id), '')"""
+
+SUPPLIER_SEARCH_DDL = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS supplier_fts USING fts5(
+        business_name, registration_number, email,
+        tokenize='trigram'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS supplier_fts_ai AFTER INSERT ON supplier
+    BEGIN
+        INSERT INTO supplier_fts(rowid, business_name, registration_number, email)
+        VALUES (new.id, {_ROW.format(r='new')});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS supplier_fts_au
+    AFTER UPDATE OF business_name, company_registration_number, user_id ON supplier
+    BEGIN
+        DELETE FROM supplier_fts WHERE rowid = old.id;
+        INSERT INTO supplier_fts(rowid, business_name, registration_number, email)
+        VALUES (new.id, {_ROW.format(r='new')});
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS supplier_fts_ad AFTER DELETE ON supplier
+    BEGIN
+        DELETE FROM supplier_fts WHERE rowid = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS supplier_fts_user_au AFTER UPDATE OF email ON "user"
+    BEGIN
+        UPDATE supplier_fts SET email = lower(new.email)
+        WHERE rowid IN (SELECT id FROM supplier WHERE user_id = new.id);
+    END
+    """,
+)
+
+
+@event.listens_for(db.metadata, "after_create")
+def install_supplier_search(target, connection, **kw):
+    if not is_sqlite(connection):
+        return
+    for ddl in SUPPLIER_SEARCH_DDL:
+        connection.execute(text(ddl))
+
+
+def rebuild_supplier_search() -> int:
+    """Re-index every supplier. Returns the row count."""
+    conn = db.session.connection()
+    for ddl in SUPPLIER_SEARCH_DDL:
+        conn.execute(text(ddl))
+    conn.execute(text(f"DELETE FROM {FTS_TABLE}"))
+    result = conn.execute(text(
+        f"INSERT INTO {FTS_TABLE}(rowid, business_name, registration_number, email) "
+        f"SELECT s.id, {_ROW.format(r='s')} FROM supplier s"
+    ))
+    conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')"))
+    db.session.commit()
+    return result.rowcount
+
+
+def _exact_ids(term: str):
+    """Suppliers whose registration number or email is exactly `term`; index lookups only."""
+    conds = [Supplier.company_registration_number.in_({term, term.upper()})]
+    if "@" in term:
+        conds.append(Supplier.user_id.in_(select(User.id).where(func.lower(User.email) == term.lower())))
+    return select(Supplier.id).where(or_(*conds))
+
+
+def _match_ids(term: str):
+    """Trigram substring match, best first; None when the term is too short for the index."""
+    if len(term) < MIN_TERM or not is_sqlite():
+        return None
+    phrase = '"' + term.replace('"', '""') + '"'
+    fts = literal_column(FTS_TABLE)   # MATCH against the table name searches every column
+    return (select(_fts.c.rowid.label("id"))
+            .where(fts.op("MATCH")(phrase))
+            .order_by(func.bm25(fts, 10.0, 5.0, 5.0)))
+
+
+def search_filter(term: str):
+    """WHERE clause for Supplier queries (with User joined): exact hits plus substring matches."""
+    term = (term or "").strip()
+    matches = _match_ids(term)
+    if matches is not None:
+        return or_(Supplier.id.in_(_exact_ids(term)), Supplier.id.in_(matches.order_by(None)))
+    like = f"%{term}%"
+    # too short for trigrams (or not SQLite): the old scan
+    return or_(Supplier.business_name.ilike(like), Supplier.company_registration_number.ilike(like),
+               User.email.ilike(like))
+
+
+def lookup_suppliers(term: str, scope_country=None, limit: int = LOOKUP_LIMIT, budget_ms=None):
+    """
+    Typeahead: ([Supplier, ...], truncated). Exact registration number / email
+    hits come first, then substring matches by relevance.
+    """
+    term = (term or "").strip()
+    if not term:
+        return [], False
+    if budget_ms is None:
+        budget_ms = current_app.config.get("ADMIN_LOOKUP_BUDGET_MS", 100)
+
+    def load(ids_stmt):
+        q = (Supplier.query.join(User, User.id == Supplier.user_id)
+             .options(contains_eager(Supplier.user))
+             .filter(Supplier.id.in_(ids_stmt)))
+        if scope_country:
+            q = q.filter(Supplier.reg_country == scope_country)
+        return q.limit(limit).all()
+
+    found, truncated = [], False
+    try:
+        with query_deadline(budget_ms):
+            found = load(_exact_ids(term))
+            matches = _match_ids(term)
+            if matches is not None and len(found) < limit:
+                if scope_country:
+                    # `+ 0` keeps the IN list from being handed to FTS5 as rowid lookups,
+                    # which probes the index once per supplier in the country
+                    matches = matches.where((_fts.c.rowid + 0).in_(
+                        select(Supplier.id).where(Supplier.reg_country == scope_country)))
+                seen = {s.id for s in found}
+                ranked = [sid for (sid,) in db.session.execute(matches.limit(limit + len(found)))
+                          if sid not in seen][:limit - len(found)]
+                by_id = {s.id: s for s in load(select(Supplier.id).where(Supplier.id.in_(ranked)))}
+                found += [by_id[sid] for sid in ranked if sid in by_id]
+    except QueryBudgetExceeded:
+        current_app.logger.warning("supplier lookup for %r cut short: over %s ms budget", term, budget_ms)
+        truncated = True
+    return found, truncated
@@ -0,0 +1,56 @@
+# app/admin/verification.py
+"""
+The supplier verification queue.
+
+Only suppliers that have submitted are in it. Pages are keyset-paginated on
+(submitted_at, id), newest first. ix_supplier_queue serves the status filter
+and the sort, and ix_supplier_country_queue does the same for one country.
+The status/country summary is a single GROUP BY over the latter index, so
+it costs the same whatever the page shows.
+"""
+from sqlalchemy import func
+from sqlalchemy.orm import contains_eager
+
+from app.extensions import db
+from app.models import Supplier, SupplierStatus, User
+from .supplier_search import search_filter
+
+PENDING = (SupplierStatus.SUBMITTED, SupplierStatus.UNDER_REVIEW)
+QUEUE_KEYS = [(Supplier.submitted_at, True), (Supplier.id, True)]
+
+
+def queue_query(scope_country=None, status=None, country=None, search=""):
+    """
+    Suppliers in the queue with their User loaded in the same statement.
+    `scope_country` restricts country admins; `status` None means pending.
+    """
+    q = (Supplier.query
+         .join(User, User.id == Supplier.user_id)
+         .options(contains_eager(Supplier.user))
+         .filter(Supplier.submitted_at.isnot(None)))
+    if scope_country:
+        q = q.filter(Supplier.reg_country == scope_country)
+    elif country:
+        q = q.filter(Supplier.reg_country == country)
+    q = q.filter(Supplier.status == status) if status else q.filter(Supplier.status.in_(PENDING))
+    if search:
+        q = q.filter(search_filter(search))
+    return q
+
+
+def queue_summary(scope_country=None) -> dict:
+    """
+    {"status": {status value: n}, "country": {code: n pending}, "pending": n}
+    for everything the admin can see, from one aggregate query.
+    """
+    q = (db.session.query(Supplier.status, Supplier.reg_country, func.count())
+         .filter(Supplier.submitted_at.isnot(None)))
+    if scope_country:
+        q = q.filter(Supplier.reg_country == scope_country)
+    by_status, by_country, pending = {}, {}, 0
+    for status, country, n in q.group_by(Supplier.reg_country, Supplier.status):
+        by_status[status.value] = by_status.get(status.value, 0) + n
+        if status in PENDING:
+            pending += n
+            by_country[country or ""] = by_country.get(country or "", 0) + n
+    return {"status": by_status, "country": dict(sorted(by_country.items())), "pending": pending}
@@ -1,15 +1,41 @@
 # app/catalog/cart_utils.py
-from flask import session
+from flask import session, g
+from flask_login import current_user, user_logged_in, user_logged_out
 from decimal import Decimal
-from ..models import Product
+from ..models import Product, CatalogListing
+from .store import get_cart_store, new_cart_id
 
-CART_KEY = "cart"  # { "product_id": quantity }
+CART_ID_KEY = "cart_id"   # the only cart state kept in the cookie
+LEGACY_CART_KEY = "cart"  # old sessions: the whole { "product_id": quantity } dict
+
+def _current_user_id():
+    return current_user.id if current_user.is_authenticated else None
 
 def get_cart():
-    return session.get(CART_KEY, {})
+    # loaded at most once per request; set_cart keeps this copy current
+    if "cart" not in g:
+        cart_id = session.get(CART_ID_KEY)
+        if cart_id is None and current_user.is_authenticated:
+            # remembered login on a new browser: pick the saved cart back up
+            cart_id = get_cart_store().cart_id_for_user(current_user.id)
+            if cart_id:
+                session[CART_ID_KEY] = cart_id
+        g.cart = get_cart_store().load(cart_id) if cart_id else {}
+        if LEGACY_CART_KEY in session:
+            legacy = session.pop(LEGACY_CART_KEY) or {}
+            for pid, qty in legacy.items():
+                g.cart[pid] = g.cart.get(pid, 0) + int(qty)
+            set_cart(g.cart)
+    return g.cart
 
 def set_cart(cart):
-    session[CART_KEY] = cart
+    g.cart = cart
+    cart_id = session.get(CART_ID_KEY)
+    if cart_id is None:
+        if not cart:
+            return
+        cart_id = session[CART_ID_KEY] = new_cart_id()
+    get_cart_store().save(cart_id, cart, user_id=_current_user_id())
 
 def add_to_cart(product_id: int, qty: int):
     cart = get_cart()
@@ -37,6 +63,66 @@ def clear_cart():
 def cart_count():
     return sum(get_cart().values())
 
+CART_OPS = ("add", "set", "remove")
+
+def apply_cart_ops(ops):
+    """
+    Apply many cart changes with one product lookup and one cart write.
+
+    `ops` is a list of {"op": "add"|"set"|"remove", "product_id": int, "qty": int}.
+    Quantities below a product's MOQ are raised to it; anything that isn't
+    buyable or would exceed stock is skipped. "set" with qty <= 0 removes.
+    Returns (cart, errors) with errors as [{"index", "product_id", "error"}].
+    """
+    parsed, errors = [], []
+    for i, op in enumerate(ops):
+        try:
+            kind = op["op"]
+            pid = int(op["product_id"])
+            qty = int(op.get("qty", 0)) if kind != "remove" else 0
+        except (KeyError, TypeError, ValueError):
+            errors.append({"index": i, "product_id": None, "error": "malformed"})
+            continue
+        if kind not in CART_OPS:
+            errors.append({"index": i, "product_id": pid, "error": "unknown op"})
+            continue
+        if kind == "add" and qty <= 0:
+            errors.append({"index": i, "product_id": pid, "error": "bad quantity"})
+            continue
+        parsed.append((i, kind, pid, qty))
+
+    # only what's still buyable -- one IN query against the listing table
+    wanted = {pid for _i, kind, pid, qty in parsed if kind == "add" or (kind == "set" and qty > 0)}
+    listed = {}
+    if wanted:
+        rows = (CatalogListing.query
+                .with_entities(CatalogListing.product_id, CatalogListing.moq, CatalogListing.stock)
+                .filter(CatalogListing.product_id.in_(wanted))
+                .all())
+        listed = {row.product_id: row for row in rows}
+
+    cart = dict(get_cart())
+    for i, kind, pid, qty in parsed:
+        key = str(pid)
+        if kind == "remove" or (kind == "set" and qty <= 0):
+            cart.pop(key, None)
+            continue
+        product = listed.get(pid)
+        if product is None:
+            errors.append({"index": i, "product_id": pid, "error": "not available"})
+            continue
+        new_qty = cart.get(key, 0) + qty if kind == "add" else qty
+        new_qty = max(new_qty, product.moq or 1)
+        if product.stock is not None and product.stock >= 0 and new_qty > product.stock:
+            errors.append({"index": i, "product_id": pid, "error": "exceeds stock"})
+            continue
+        cart[key] = new_qty
+
+    if cart != get_cart():
+        set_cart(cart)
+    errors.sort(key=lambda e: e["index"])
+    return cart, errors
+
 def cart_items_with_products():
     """
     Returns (items, totals) where:
@@ -63,3 +149,29 @@ def cart_items_with_products():
         items.append({"product": p, "qty": int(qty), "line_total": line_total})
 
     return items, {"subtotal": subtotal}
+
+
+@user_logged_in.connect
+def _merge_cart_on_login(app, user):
+    """Fold the anonymous cart into the user's saved cart and switch the session to it."""
+    store = get_cart_store()
+    anon_id = session.get(CART_ID_KEY)
+    user_cart_id = store.cart_id_for_user(user.id)
+    if user_cart_id is None:
+        if anon_id:
+            store.save(anon_id, store.load(anon_id), user_id=user.id)
+        return
+    if anon_id and anon_id != user_cart_id:
+        merged = store.load(user_cart_id)
+        for pid, qty in store.load(anon_id).items():
+            merged[pid] = merged.get(pid, 0) + int(qty)
+        store.save(user_cart_id, merged)
+        store.delete(anon_id)
+    session[CART_ID_KEY] = user_cart_id
+    g.pop("cart", None)
+
+@user_logged_out.connect
+def _forget_cart_on_logout(app, user):
+    # the cart stays saved against the user; this browser starts empty
+    session.pop(CART_ID_KEY, None)
+    g.pop("cart", None)
@@ -0,0 +1,15 @@
+# app/cart/commands.py
+from datetime import timedelta
+
+import click
+
+from . import cart
+from .store import get_cart_store
+
+
+@cart.cli.command("prune")
+@click.option("--days", default=30, show_default=True, help="Drop anonymous carts idle this long.")
+def prune(days):
+    """Delete abandoned anonymous carts (flask cart prune)."""
+    count = get_cart_store().prune(timedelta(days=days))
+    click.echo(f"Pruned {count} carts.")
@@ -1,4 +1,4 @@
-from flask import render_template, flash, abort, request, redirect, url_for
+from flask import render_template, flash, abort, request, redirect, url_for, jsonify, current_app
 from . import cart #this imports that main blueprint from __init__.py
 
 from app.extensions import db
@@ -7,7 +7,7 @@ from app.models import Product, ProductStatus, Supplier, SupplierStatus
 from flask_login import login_required, current_user
 
 from .form import AddToCartForm
-from .cart_utils import add_to_cart, cart_items_with_products, update_qty, remove_item, clear_cart
+from .cart_utils import add_to_cart, cart_items_with_products, update_qty, remove_item, clear_cart, apply_cart_ops
 
 from sqlalchemy import or_, and_, func
 
@@ -19,32 +19,50 @@ def view():
     if request.method == "POST":
         action = request.form.get("action")
         if action == "update":
-            # Expect multiple qty fields named: qty-<product_id>
-            for k, v in request.form.items():
-                if k.startswith("qty-"):
-                    try:
-                        pid = int(k.split("-", 1)[1])
-                        qty = int(v or 0)
-                        update_qty(pid, qty)
-                    except ValueError:
-                        continue
-            flash("Cart updated.", "success")
-            return redirect(url_for("catalog.cart"))
+            # Expect multiple qty fields named: qty-<product_id>; applied in one batch
+            ops = [{"op": "set", "product_id": k.split("-", 1)[1], "qty": v or 0}
+                   for k, v in request.form.items() if k.startswith("qty-")]
+            _cart, errors = apply_cart_ops(ops)
+            if errors:
+                flash(f"Cart updated; {len(errors)} line(s) could not be changed.", "warning")
+            else:
+                flash("Cart updated.", "success")
+            return redirect(url_for("cart.view"))
         elif action == "remove":
             pid = request.form.get("product_id")
             if pid and pid.isdigit():
                 remove_item(int(pid))
                 flash("Item removed.", "success")
-            return redirect(url_for("catalog.cart"))
+            return redirect(url_for("cart.view"))
         elif action == "clear":
             clear_cart()
             flash("Cart cleared.", "success")
-            return redirect(url_for("cart.cart"))
+            return redirect(url_for("cart.view"))
 
     items, totals = cart_items_with_products()
     return render_template("cart/cart.html", items=items, totals=totals)
 
 
+@cart.route("/batch", methods=["POST"])
+def batch():
+    """
+    JSON: {"ops": [{"op": "add"|"set"|"remove", "product_id": 12, "qty": 50}, ...]}
+    Applies every op in one pass and returns the resulting cart.
+    """
+    payload = request.get_json(silent=True) if request.is_json else None
+    ops = payload.get("ops") if isinstance(payload, dict) else None
+    if not isinstance(ops, list):
+        return jsonify(error="expected a JSON body with an \"ops\" list"), 400
+    if len(ops) > current_app.config.get("CART_BATCH_MAX_OPS", 1000):
+        return jsonify(error="too many ops"), 413
+
+    items, errors = apply_cart_ops(ops)
+    return jsonify(
+        items=items,
+        count=sum(items.values()),
+        errors=errors,
+    )
+
 
 # COUNTRY_NAMES = {
 #     "MY": "Malaysia", "SG": "Singapore", "TH": "Thailand", "ID": "Indonesia",
@@ -0,0 +1,94 @@
+# app/cart/store.py
+"""
+Where cart contents live. cart_utils only ever talks to a CartStore; the
+session cookie carries nothing but the cart id.
+
+Pick the backend with config CART_STORE (default "sql"). A backend maps a cart
+id to a {"<product_id>": qty} dict and knows which cart belongs to a user.
+"""
+import json
+import secrets
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+from app.extensions import db
+from app.models import Cart
+
+
+def new_cart_id() -> str:
+    return secrets.token_urlsafe(16)
+
+
+def encode_items(items: dict) -> str:
+    return json.dumps({str(pid): int(qty) for pid, qty in items.items()}, separators=(",", ":"))
+
+
+def decode_items(raw) -> dict:
+    return json.loads(raw) if raw else {}
+
+
+class CartStore:
+    """Interface every backend implements."""
+
+    def load(self, cart_id: str) -> dict:
+        raise NotImplementedError
+
+    def save(self, cart_id: str, items: dict, user_id=None):
+        raise NotImplementedError
+
+    def delete(self, cart_id: str):
+        raise NotImplementedError
+
+    def cart_id_for_user(self, user_id):
+        """Id of the user's saved cart, or None."""
+        raise NotImplementedError
+
+    def prune(self, older_than: timedelta) -> int:
+        """Drop anonymous carts untouched for `older_than`. Returns how many."""
+        raise NotImplementedError
+
+
+class SQLCartStore(CartStore):
+    """One `cart` row per cart, items as compact JSON."""
+
+    def load(self, cart_id):
+        cart = db.session.get(Cart, cart_id)
+        return decode_items(cart.items) if cart else {}
+
+    def save(self, cart_id, items, user_id=None):
+        cart = db.session.get(Cart, cart_id)
+        if cart is None:
+            cart = Cart(id=cart_id)
+            db.session.add(cart)
+        cart.items = encode_items(items)
+        if user_id is not None:
+            cart.user_id = user_id
+        db.session.commit()
+
+    def delete(self, cart_id):
+        db.session.execute(db.delete(Cart).where(Cart.id == cart_id))
+        db.session.commit()
+
+    def cart_id_for_user(self, user_id):
+        return db.session.execute(db.select(Cart.id).where(Cart.user_id == user_id)).scalar()
+
+    def prune(self, older_than):
+        cutoff = datetime.utcnow() - older_than
+        result = db.session.execute(
+            db.delete(Cart).where(Cart.user_id.is_(None), Cart.updated_at < cutoff)
+        )
+        db.session.commit()
+        return result.rowcount
+
+
+CART_STORES = {
+    "sql": SQLCartStore,
+}
+
+
+def get_cart_store() -> CartStore:
+    ext = current_app.extensions
+    if "cart_store" not in ext:
+        ext["cart_store"] = CART_STORES[current_app.config.get("CART_STORE", "sql")]()
+    return ext["cart_store"]
@@ -2,4 +2,4 @@ from flask import Blueprint
 
 catalog = Blueprint('catalog', __name__, template_folder='templates')
 
-from . import routes
\ No newline at end of file
+from . import routes, commands
\ No newline at end of file
@@ -0,0 +1,31 @@
+# app/catalog/commands.py
+import click
+
+from . import catalog
+from .search_index import rebuild_search_index
+from .listing import rebuild_listing
+from .facets import rebuild_facet_rollup
+from .snapshots import rebuild_all_snapshots
+from .routes import COUNTRY_NAMES
+
+
+@catalog.cli.command("rebuild-search")
+def rebuild_search():
+    """Rebuild the product full-text search index (flask catalog rebuild-search)."""
+    count = rebuild_search_index()
+    click.echo(f"Indexed {count} products.")
+
+
+@catalog.cli.command("rebuild-listing")
+def rebuild_listing_command():
+    """Recompute the catalog_listing read model and its facet rollup (flask catalog rebuild-listing)."""
+    count = rebuild_listing()
+    combos = rebuild_facet_rollup()
+    click.echo(f"Listed {count} buyable products ({combos} facet combinations).")
+
+
+@catalog.cli.command("rebuild-snapshots")
+def rebuild_snapshots():
+    """Recompute every country landing-page snapshot (flask catalog rebuild-snapshots)."""
+    count = rebuild_all_snapshots(list(COUNTRY_NAMES))
+    click.echo(f"Rebuilt {count} country snapshots.")
@@ -0,0 +1,164 @@
+# app/catalog/export.py
+"""
+Catalog export and delta feed for partners mirroring the LIVE catalog.
+
+Full export: every row of catalog_listing, streamed in primary-key order.
+Delta: every product whose `updated_at` is past the caller's position,
+ordered by (updated_at, id) on ix_product_updated. A product that is still
+listed is sent in full; one that has left the listing (unpublished, archived,
+soft-deleted, supplier no longer approved) is sent as a tombstone. Tombstones
+can name products the partner never received; ignore those.
+
+Positions are opaque cursors over (updated_at, id), compared on the raw
+stored value like keyset_paginate does. Rows touched in the last
+EXPORT_SETTLE_SECONDS are held back until the next sync. updated_at only has
+one-second resolution, and a slow transaction can commit a timestamp a little
+behind the ones already exported, so those rows wait rather than getting
+skipped. Every export ends at that settle point, so its closing cursor is
+known before the first row is sent. That lets CSV carry it in a header.
+
+Supplier changes that move products in or out of the listing don't touch
+their products, so a trigger bumps product.updated_at for them.
+"""
+import csv
+import io
+import json
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import and_, event, or_, select, text, type_coerce
+from sqlalchemy.types import NullType
+
+from app.extensions import db
+from app.models import CatalogListing, Product
+from app.pagination import decode_cursor, encode_cursor
+from app.sqlite_utils import is_sqlite
+
+EXPORT_FORMATS = ("ndjson", "csv")
+EXPORT_FIELDS = (
+    "id", "slug", "name", "short_desc", "category", "subcategory", "country_of_origin",
+    "country", "price", "currency", "moq", "stock", "incoterms", "main_image_path",
+    "supplier_id", "supplier_name", "updated_at",
+)
+CSV_FIELDS = ("op",) + EXPORT_FIELDS
+# rows fetched from the cursor at a time; also how often NDJSON reports its position
+FETCH_SIZE = 1000
+STORED_FORMAT = "%Y-%m-%d %H:%M:%S"   # how sqlite's CURRENT_TIMESTAMP writes them
+
+SUPPLIER_TOUCH_DDL = """
+    CREATE TRIGGER IF NOT EXISTS product_touch_supplier_au
+    AFTER UPDATE OF status, business_name, country_code, reg_country ON supplier
+    WHEN old.status IS NOT new.status OR old.business_name IS NOT new.business_name
+      OR old.country_code IS NOT new.country_code OR old.reg_country IS NOT new.reg_country
+    BEGIN
+        UPDATE product SET updated_at = CURRENT_TIMESTAMP WHERE supplier_id = new.id;
+    END
+"""
+
+
+@event.listens_for(db.metadata, "after_create")
+def install_export_triggers(target, connection, **kw):
+    if not is_sqlite(connection):
+        return
+    connection.execute(text(SUPPLIER_TOUCH_DDL))
+
+
+class BadPosition(ValueError):
+    pass
+
+
+def _stored(dt: datetime) -> str:
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt.strftime(STORED_FORMAT)
+
+
+def settle_point(settle_seconds: int) -> str:
+    return _stored(datetime.utcnow() - timedelta(seconds=settle_seconds))
+
+
+def parse_position(since=None, cursor=None):
+    """(updated_at, id) to resume after, None for a full export. Raises BadPosition."""
+    if cursor:
+        values = decode_cursor(cursor)
+        if not (values and len(values) == 2 and isinstance(values[0], str) and isinstance(values[1], int)):
+            raise BadPosition("invalid cursor")
+        return values
+    if since:
+        try:
+            return [_stored(datetime.fromisoformat(since.strip().replace("Z", "+00:00"))), 0]
+        except ValueError:
+            raise BadPosition("since must be an ISO 8601 timestamp")
+    return None
+
+
+def _record(row, changed) -> dict:
+    return {
+        "id": row.product_id, "slug": row.slug, "name": row.name, "short_desc": row.short_desc,
+        "category": row.category, "subcategory": row.subcategory,
+        "country_of_origin": row.country_of_origin, "country": row.effective_country,
+        "price": str(row.price), "currency": row.currency, "moq": row.moq, "stock": row.stock,
+        "incoterms": row.incoterms, "main_image_path": row.main_image_path,
+        "supplier_id": row.supplier_id, "supplier_name": row.supplier_name,
+        "updated_at": changed,
+    }
+
+
+def export_records(position, upto: str):
+    """
+    Yield (op, record, (updated_at, id) or None) in cursor order; op is
+    "upsert" or "delete". Plain rows, fetched FETCH_SIZE at a time.
+    """
+    listing = CatalogListing.__table__
+    if position is None:
+        stmt = (select(listing, type_coerce(listing.c.updated_at, NullType()).label("changed"))
+                .order_by(listing.c.product_id))
+        for row in db.session.execute(stmt.execution_options(yield_per=FETCH_SIZE)):
+            yield "upsert", _record(row, row.changed), None
+        return
+
+    changed = type_coerce(Product.updated_at, NullType())
+    after_ts, after_id = position
+    stmt = (
+        select(Product.id.label("pid"), changed.label("changed"), listing)
+        .select_from(Product.__table__)
+        .outerjoin(listing, listing.c.product_id == Product.id)
+        .where(or_(changed > after_ts, and_(changed == after_ts, Product.id > after_id)),
+               changed < upto)
+        .order_by(changed, Product.id)
+    )
+    for row in db.session.execute(stmt.execution_options(yield_per=FETCH_SIZE)):
+        pos = (row.changed, row.pid)
+        if row.product_id is None:
+            yield "delete", {"id": row.pid, "deleted": True, "updated_at": row.changed}, pos
+        else:
+            yield "upsert", _record(row, row.changed), pos
+
+
+def closing_cursor(upto: str) -> str:
+    """Where the next sync resumes once this export has been read to the end."""
+    return encode_cursor([upto, 0])
+
+
+def ndjson_lines(position, upto: str):
+    """NDJSON body: one record per line, a {"cursor": ...} line every FETCH_SIZE rows, and one last."""
+    n = 0
+    for op, record, pos in export_records(position, upto):
+        yield json.dumps(record, separators=(",", ":"), default=str) + "\n"
+        n += 1
+        if pos is not None and n % FETCH_SIZE == 0:
+            yield json.dumps({"cursor": encode_cursor(list(pos))}) + "\n"
+    yield json.dumps({"cursor": closing_cursor(upto), "count": n, "done": True}) + "\n"
+
+
+def csv_lines(position, upto: str):
+    """CSV body with an `op` column (upsert / delete); the closing cursor goes in a header."""
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=CSV_FIELDS, extrasaction="ignore")
+    writer.writeheader()
+    for op, record, _pos in export_records(position, upto):
+        writer.writerow(dict(record, op=op))
+        if buf.tell() > 64 * 1024:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+    yield buf.getvalue()
@@ -0,0 +1,247 @@
+# app/catalog/facets.py
+"""
+Facet counts for the search page, always from a single statement.
+
+Two sources:
+
+* `catalog_facet_rollup` -- one counter per combination of facet values, kept
+  by triggers on catalog_listing. Any filter set made only of facet filters
+  (country, category, price band, incoterms, MOQ band) is answered from here
+  without touching the listing rows.
+* otherwise (text query, free min/max price) the filtered listing rows go in a
+  CTE -- SQLite materializes a CTE that is referenced more than once, so the
+  set is scanned a single time -- and each facet is a GROUP BY over it.
+
+Either way the statement runs under FACET_BUDGET_MS; if it blows the budget
+the page renders without facets rather than slowly.
+"""
+from flask import current_app
+from sqlalchemy import and_, case, event, func, literal, or_, select, text, union_all
+
+from app.cache import TTLCache
+from app.extensions import db
+from app.models import CatalogListing, CatalogFacetRollup
+from app.sqlite_utils import is_sqlite, query_deadline, QueryBudgetExceeded
+
+# (key, label, lower bound inclusive, upper bound exclusive)
+PRICE_BANDS = (
+    ("0-10", "Under 10", None, 10),
+    ("10-50", "10 – 50", 10, 50),
+    ("50-100", "50 – 100", 50, 100),
+    ("100-500", "100 – 500", 100, 500),
+    ("500+", "500 and up", 500, None),
+)
+MOQ_BANDS = (
+    ("1", "No minimum", None, 2),
+    ("2-10", "2 – 10", 2, 11),
+    ("11-100", "11 – 100", 11, 101),
+    ("101+", "Over 100", 101, None),
+)
+
+# facet name -> search query-string parameter it sets
+FACETS = {
+    "country": "country",
+    "category": "category",
+    "subcategory": "category",   # search's category filter matches either column
+    "price_band": "price_band",
+    "incoterms": "incoterms",
+    "moq_band": "moq_band",
+}
+FACET_LIMIT = 15
+FACET_TTL_SECONDS = 30
+
+_facet_cache = TTLCache(ttl=FACET_TTL_SECONDS, maxsize=2048)
+
+
+def _band_bounds(column, lo, hi):
+    conds = []
+    if lo is not None:
+        conds.append(column >= lo)
+    if hi is not None:
+        conds.append(column < hi)
+    return and_(*conds)
+
+
+def _band_case(column, bands):
+    return case(*[(_band_bounds(column, lo, hi), key) for key, _label, lo, hi in bands], else_=None)
+
+
+def _band_case_sql(column: str, bands) -> str:
+    """Same CASE as _band_case, as raw SQL for the triggers."""
+    whens = []
+    for key, _label, lo, hi in bands:
+        conds = []
+        if lo is not None:
+            conds.append(f"{column} >= {lo}")
+        if hi is not None:
+            conds.append(f"{column} < {hi}")
+        whens.append(f"WHEN {' AND '.join(conds)} THEN '{key}'")
+    return f"CASE {' '.join(whens)} ELSE '' END"
+
+
+def band_filter(column, bands, key):
+    """WHERE clause for one band key (same edges as its facet), or None for an unknown key."""
+    for band_key, _label, lo, hi in bands:
+        if band_key == key:
+            return _band_bounds(column, lo, hi)
+    return None
+
+
+def price_band_filter(key):
+    return band_filter(CatalogListing.price, PRICE_BANDS, key)
+
+
+def moq_band_filter(key):
+    return band_filter(func.coalesce(CatalogListing.moq, 1), MOQ_BANDS, key)
+
+
+_BAND_LABELS = {
+    "price_band": {key: label for key, label, _lo, _hi in PRICE_BANDS},
+    "moq_band": {key: label for key, label, _lo, _hi in MOQ_BANDS},
+}
+
+
+# --- rollup maintenance -----------------------------------------------------
+
+def _rollup_key_sql(row: str) -> str:
+    return (
+        f"coalesce({row}.effective_country, ''), coalesce({row}.category, ''), "
+        f"coalesce({row}.subcategory, ''), {_band_case_sql(row + '.price', PRICE_BANDS)}, "
+        f"coalesce({row}.incoterms, ''), {_band_case_sql(f'coalesce({row}.moq, 1)', MOQ_BANDS)}"
+    )
+
+
+ROLLUP_DIMS = "effective_country, category, subcategory, price_band, incoterms, moq_band"
+
+FACET_ROLLUP_DDL = (
+    f"""
+    CREATE TRIGGER IF NOT EXISTS catalog_facet_rollup_ai AFTER INSERT ON catalog_listing
+    BEGIN
+        INSERT INTO catalog_facet_rollup ({ROLLUP_DIMS}, n)
+        VALUES ({_rollup_key_sql('new')}, 1)
+        ON CONFLICT ({ROLLUP_DIMS}) DO UPDATE SET n = n + 1;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS catalog_facet_rollup_ad AFTER DELETE ON catalog_listing
+    BEGIN
+        UPDATE catalog_facet_rollup SET n = n - 1
+        WHERE ({ROLLUP_DIMS}) = ({_rollup_key_sql('old')});
+        DELETE FROM catalog_facet_rollup
+        WHERE ({ROLLUP_DIMS}) = ({_rollup_key_sql('old')}) AND n <= 0;
+    END
+    """,
+)
+
+
+@event.listens_for(db.metadata, "after_create")
+def install_facet_rollup(target, connection, **kw):
+    if not is_sqlite(connection):
+        return
+    for ddl in FACET_ROLLUP_DDL:
+        connection.execute(text(ddl))
+
+
+def rebuild_facet_rollup() -> int:
+    """Recount the rollup from catalog_listing. Returns the number of combinations."""
+    conn = db.session.connection()
+    conn.execute(text("DELETE FROM catalog_facet_rollup"))
+    result = conn.execute(text(
+        f"INSERT INTO catalog_facet_rollup ({ROLLUP_DIMS}, n) "
+        f"SELECT {_rollup_key_sql('l')}, count(*) FROM catalog_listing l GROUP BY 1, 2, 3, 4, 5, 6"
+    ))
+    db.session.commit()
+    return result.rowcount
+
+
+# --- counting ----------------------------------------------------------------
+
+def _facet_columns():
+    return [
+        CatalogListing.effective_country.label("country"),
+        CatalogListing.category.label("category"),
+        CatalogListing.subcategory.label("subcategory"),
+        _band_case(CatalogListing.price, PRICE_BANDS).label("price_band"),
+        CatalogListing.incoterms.label("incoterms"),
+        _band_case(func.coalesce(CatalogListing.moq, 1), MOQ_BANDS).label("moq_band"),
+    ]
+
+
+def facet_statement(query):
+    """UNION ALL of one GROUP BY per facet over a CTE of `query`'s rows."""
+    rows = query.order_by(None).with_entities(*_facet_columns()).cte("facet_rows")
+    parts = [
+        select(literal(name).label("facet"), rows.c[name].label("value"), func.count().label("n"))
+        .where(rows.c[name].is_not(None))
+        .group_by(rows.c[name])
+        for name in FACETS
+    ]
+    return union_all(*parts)
+
+
+def rollup_statement(filters: dict):
+    """
+    Same result shape as facet_statement, summed from the rollup.
+    `filters` may hold country, category, price_band, incoterms, moq_band.
+    """
+    r = CatalogFacetRollup
+    conds = [r.n > 0]
+    if filters.get("country"):
+        conds.append(r.effective_country == filters["country"])
+    if filters.get("category"):
+        conds.append(or_(r.category == filters["category"], r.subcategory == filters["category"]))
+    for name in ("price_band", "incoterms", "moq_band"):
+        if filters.get(name):
+            conds.append(getattr(r, name) == filters[name])
+
+    columns = {
+        "country": r.effective_country, "category": r.category, "subcategory": r.subcategory,
+        "price_band": r.price_band, "incoterms": r.incoterms, "moq_band": r.moq_band,
+    }
+    parts = [
+        select(literal(name).label("facet"), columns[name].label("value"), func.sum(r.n).label("n"))
+        .where(*conds, columns[name] != "")
+        .group_by(columns[name])
+        for name in FACETS
+    ]
+    return union_all(*parts)
+
+
+def _compute(stmt, budget_ms):
+    try:
+        with query_deadline(budget_ms):
+            rows = db.session.execute(stmt).all()
+    except QueryBudgetExceeded:
+        current_app.logger.warning("facet counts skipped: over %s ms budget", budget_ms)
+        return {}
+
+    facets = {name: [] for name in FACETS}
+    for facet, value, n in rows:
+        label = _BAND_LABELS.get(facet, {}).get(value, value)
+        facets[facet].append({"value": value, "label": label, "count": n})
+    for name, values in facets.items():
+        if name in _BAND_LABELS:
+            order = list(_BAND_LABELS[name])
+            values.sort(key=lambda v: order.index(v["value"]))
+        else:
+            values.sort(key=lambda v: (-v["count"], v["value"]))
+            del values[FACET_LIMIT:]
+    return facets
+
+
+def facet_counts(query, rollup_filters=None, cache_key=None, budget_ms=None):
+    """
+    {facet: [{"value", "label", "count"}, ...]} for the rows of `query`, a
+    CatalogListing query with the current filters applied.
+
+    Pass `rollup_filters` (the facet filters in effect) when those are the ONLY
+    filters on `query`; the counts then come from the rollup table. Returns an
+    empty dict when the statement ran over budget. Cached per `cache_key`.
+    """
+    if budget_ms is None:
+        budget_ms = current_app.config.get("FACET_BUDGET_MS", 150)
+    use_rollup = rollup_filters is not None and is_sqlite()
+    stmt = rollup_statement(rollup_filters) if use_rollup else facet_statement(query)
+    if cache_key is None:
+        return _compute(stmt, budget_ms)
+    return _facet_cache.get_or_set(cache_key, lambda: _compute(stmt, budget_ms))
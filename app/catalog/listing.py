@@ -0,0 +1,76 @@
+# app/catalog/listing.py
+"""
+Maintenance of the `catalog_listing` read model (models.CatalogListing).
+
+A product is listed while it is LIVE, not soft-deleted and its supplier is
+APPROVED. Triggers on `product` and `supplier` delete the affected rows and
+re-insert whatever is still buyable, so ORM writes and bulk UPDATEs both keep
+the table current. Enums are stored by name, hence 'LIVE' / 'APPROVED'.
+"""
+from sqlalchemy import event, text
+
+from app.extensions import db
+from app.sqlite_utils import is_sqlite
+
+LISTING_COLUMNS = (
+    "product_id, supplier_id, name, short_desc, slug, category, subcategory, "
+    "country_of_origin, effective_country, price, currency, moq, stock, incoterms, "
+    "main_image_path, created_at, updated_at, supplier_name, supplier_country_code"
+)
+
+LISTING_SELECT = """
+    SELECT p.id, p.supplier_id, p.name, p.short_desc, p.slug, p.category, p.subcategory,
+           p.country_of_origin,
+           upper(coalesce(nullif(p.country_of_origin, ''), nullif(s.country_code, ''), nullif(s.reg_country, ''))),
+           p.price, p.currency, p.moq, p.stock, p.incoterms,
+           p.main_image_path, p.created_at, p.updated_at, s.business_name, s.country_code
+    FROM product p JOIN supplier s ON s.id = p.supplier_id
+    WHERE coalesce(p.is_deleted, 0) = 0 AND p.status = 'LIVE' AND s.status = 'APPROVED'
+"""
+
+LISTING_TRIGGERS_DDL = (
+    f"""
+    CREATE TRIGGER IF NOT EXISTS catalog_listing_product_ai AFTER INSERT ON product
+    BEGIN
+        INSERT INTO catalog_listing ({LISTING_COLUMNS}) {LISTING_SELECT} AND p.id = new.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS catalog_listing_product_au AFTER UPDATE ON product
+    BEGIN
+        DELETE FROM catalog_listing WHERE product_id = old.id;
+        INSERT INTO catalog_listing ({LISTING_COLUMNS}) {LISTING_SELECT} AND p.id = new.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS catalog_listing_product_ad AFTER DELETE ON product
+    BEGIN
+        DELETE FROM catalog_listing WHERE product_id = old.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS catalog_listing_supplier_au
+    AFTER UPDATE OF status, business_name, country_code, reg_country ON supplier
+    BEGIN
+        DELETE FROM catalog_listing WHERE supplier_id = old.id;
+        INSERT INTO catalog_listing ({LISTING_COLUMNS}) {LISTING_SELECT} AND s.id = new.id;
+    END
+    """,
+)
+
+
+@event.listens_for(db.metadata, "after_create")
+def install_listing_triggers(target, connection, **kw):
+    if not is_sqlite(connection):
+        return
+    for ddl in LISTING_TRIGGERS_DDL:
+        connection.execute(text(ddl))
+
+
+def rebuild_listing() -> int:
+    """Recompute the whole read model from product + supplier. Returns the row count."""
+    conn = db.session.connection()
+    conn.execute(text("DELETE FROM catalog_listing"))
+    result = conn.execute(text(f"INSERT INTO catalog_listing ({LISTING_COLUMNS}) {LISTING_SELECT}"))
+    db.session.commit()
+    return result.rowcount
@@ -1,12 +1,19 @@
-from flask import render_template, flash, abort, request, redirect, url_for
+from flask import render_template, flash, abort, request, redirect, url_for, current_app, jsonify
+from flask import Response, stream_with_context
 from . import catalog #this imports that main blueprint from __init__.py
 
 from app.extensions import db
 
-from app.models import Product, ProductStatus, Supplier, SupplierStatus
+from app.models import Product, ProductStatus, Supplier, SupplierStatus, CatalogListing
 from flask_login import login_required, current_user
 
 from .form import AddToCartForm
+from .search_index import apply_text_search
+from .facets import facet_counts, price_band_filter, moq_band_filter, FACETS
+from .snapshots import get_country_snapshot
+from .export import EXPORT_FORMATS, BadPosition, parse_position, settle_point, closing_cursor, ndjson_lines, csv_lines
+from app.pagination import keyset_paginate, cached_count
+from app.page_cache import cached_page, product_version
 from app.cart.cart_utils import add_to_cart, cart_items_with_products, update_qty, remove_item, clear_cart
 
 from sqlalchemy import or_, and_, func
@@ -20,64 +27,58 @@ def search():
     category = (request.args.get("category") or "").strip()
     min_price = request.args.get("min_price", type=float)
     max_price = request.args.get("max_price", type=float)
+    price_band = (request.args.get("price_band") or "").strip()
+    moq_band = (request.args.get("moq_band") or "").strip()
+    incoterms = (request.args.get("incoterms") or "").strip().upper()
     sort = (request.args.get("sort") or "").strip().lower()
-    page = request.args.get("page", 1, type=int)
+    after = request.args.get("after")
+    before = request.args.get("before")
     per_page = 20
 
-    # base query: LIVE, not deleted, supplier APPROVED
-    qry = (
-        Product.query
-        .join(Supplier, Supplier.id == Product.supplier_id)
-        .filter(
-            Product.is_deleted.is_(False),
-            Product.status == ProductStatus.LIVE,
-            Supplier.status == SupplierStatus.APPROVED
-        )
-    )
+    # base query: the listing table only holds buyable products
+    # (LIVE, not deleted, supplier APPROVED), see listing.py
+    qry = CatalogListing.query
 
-    # text search
+    # text search (FTS5 index, see search_index.py)
+    rank = None
     if q:
-        like = f"%{q}%"
-        qry = qry.filter(or_(
-            Product.name.ilike(like),
-            Product.short_desc.ilike(like),
-            Product.description.ilike(like),
-        ))
+        qry, rank = apply_text_search(qry, q, id_column=CatalogListing.product_id)
 
     # filters
     if country:
-        qry = qry.filter(
-            or_(
-                Product.country_of_origin == country,
-                Supplier.country_code == country,     # optional fallback
-                Supplier.reg_country == country       # optional fallback
-            )
-        )
+        qry = qry.filter(CatalogListing.effective_country == country)
 
     if category:
         qry = qry.filter(or_(
-            Product.category == category,
-            Product.subcategory == category
+            CatalogListing.category == category,
+            CatalogListing.subcategory == category
         ))
 
     if min_price is not None:
-        qry = qry.filter(Product.price >= min_price)
+        qry = qry.filter(CatalogListing.price >= min_price)
     if max_price is not None:
-        qry = qry.filter(Product.price <= max_price)
-
-    # sorting
-    if sort == "newest":
-        qry = qry.order_by(Product.created_at.desc())
+        qry = qry.filter(CatalogListing.price <= max_price)
+
+    # facet filters (band edges match the facet counts, see facets.py)
+    if price_band and price_band_filter(price_band) is not None:
+        qry = qry.filter(price_band_filter(price_band))
+    if moq_band and moq_band_filter(moq_band) is not None:
+        qry = qry.filter(moq_band_filter(moq_band))
+    if incoterms:
+        qry = qry.filter(CatalogListing.incoterms == incoterms)
+
+    # sorting -- relevance is the default whenever there is a text query.
+    # Every sort ends in the id so the keyset cursor is unique.
+    if rank is not None and sort in ("", "relevance"):
+        keys = [(rank, False), (CatalogListing.product_id, True)]
     elif sort == "price_asc":
-        qry = qry.order_by(Product.price.asc())
+        keys = [(CatalogListing.price, False), (CatalogListing.product_id, False)]
     elif sort == "price_desc":
-        qry = qry.order_by(Product.price.desc())
+        keys = [(CatalogListing.price, True), (CatalogListing.product_id, True)]
     elif sort == "name":
-        qry = qry.order_by(Product.name.asc())
+        keys = [(CatalogListing.name, False), (CatalogListing.product_id, False)]
     else:
-        qry = qry.order_by(Product.created_at.desc())  # sensible default
-
-    products = qry.paginate(page=page, per_page=per_page, error_out=False)
+        keys = [(CatalogListing.created_at, True), (CatalogListing.product_id, True)]  # newest / sensible default
 
     current_filters = {
         "q": q,
@@ -85,17 +86,39 @@ def search():
         "category": category,
         "min_price": "" if min_price is None else min_price,
         "max_price": "" if max_price is None else max_price,
+        "price_band": price_band,
+        "moq_band": moq_band,
+        "incoterms": incoterms,
         "sort": sort,
     }
 
+    filter_key = tuple(v for k, v in current_filters.items() if k != "sort")
+    total = cached_count(qry, ("catalog.search",) + filter_key)
+    products = keyset_paginate(qry, keys, after=after, before=before, per_page=per_page, total=total)
+
+    # facet counts for the whole filtered set (one statement, cached per filter set)
+    facet_filters = {"country": country, "category": category, "incoterms": incoterms,
+                     "price_band": price_band if price_band_filter(price_band) is not None else "",
+                     "moq_band": moq_band if moq_band_filter(moq_band) is not None else ""}
+    rollup_ok = not q and min_price is None and max_price is None
+    facets = facet_counts(qry, rollup_filters=facet_filters if rollup_ok else None,
+                          cache_key=("catalog.search",) + filter_key)
+    for name, values in facets.items():
+        param = FACETS[name]
+        for v in values:
+            v["active"] = current_filters.get(param) == v["value"]
+            v["href"] = url_for("catalog.search", **dict(current_filters, **{param: "" if v["active"] else v["value"]}))
+
     return render_template(
         "catalog/search_results.html",
         products=products,
+        facets=facets,
         current_filters=current_filters,
     )
 
 
 @catalog.route("/product/<int:product_id>", methods=["GET", "POST"])
+@cached_page(version=product_version)
 def product_detail(product_id):
     product = Product.query.filter_by(id=product_id, is_deleted=False).first_or_404()
 
@@ -144,66 +167,68 @@ def normalize_cc(code: str) -> str:
     return (code or "").strip().upper()
 
 @catalog.route("/c/<country_code>")
+@cached_page()
 def country(country_code):
     cc = normalize_cc(country_code)
     name = COUNTRY_NAMES.get(cc)
     if not name:
         abort(404)
 
-    # Featured products (LIVE only)
-    featured = (Product.query
-        .filter(Product.country_of_origin == cc,
-                Product.status == ProductStatus.LIVE,
-                Product.is_deleted == False)
-        .order_by(Product.created_at.desc())
-        .limit(12).all())
-
-    # Category counts (for quick nav)
-    cat_counts = (Product.query
-        .with_entities(Product.category, func.count(Product.id))
-        .filter(Product.country_of_origin == cc,
-                Product.status == ProductStatus.LIVE,
-                Product.is_deleted == False)
-        .group_by(Product.category)
-        .order_by(func.count(Product.id).desc())
-        .limit(12)
-        .all())
-
-    # Not strictly needed, but nice: “featured suppliers”
-    suppliers = (Supplier.query
-        .join(Product, Product.supplier_id == Supplier.id)
-        .filter(Product.country_of_origin == cc,
-                Product.status == ProductStatus.LIVE,
-                Product.is_deleted == False)
-        .distinct()
-        .limit(8).all())
+    # featured products, category counts, featured suppliers -- one PK lookup unless stale
+    snapshot = get_country_snapshot(cc)
 
     return render_template(
         "catalog/country.html",
         cc=cc, country_name=name,
-        featured_products=featured,
-        category_counts=cat_counts,
-        suppliers=suppliers
+        featured_products=snapshot["featured_products"],
+        category_counts=snapshot["category_counts"],
+        suppliers=snapshot["suppliers"]
     )
 
 @catalog.route("/c/<country_code>/category/<category>")
+@cached_page()
 def country_category(country_code, category):
     cc = normalize_cc(country_code)
     name = COUNTRY_NAMES.get(cc)
     if not name:
         abort(404)
 
-    page = request.args.get("page", 1, type=int)
-    q = (Product.query
-         .filter(Product.country_of_origin == cc,
-                 Product.category == category,
-                 Product.status == ProductStatus.LIVE,
-                 Product.is_deleted == False)
-         .order_by(Product.created_at.desc()))
-    products = q.paginate(page=page, per_page=24, error_out=False)
+    q = CatalogListing.query.filter(CatalogListing.effective_country == cc,
+                                    CatalogListing.category == category)
+    products = keyset_paginate(
+        q, [(CatalogListing.created_at, True), (CatalogListing.product_id, True)],
+        after=request.args.get("after"), before=request.args.get("before"), per_page=24,
+        total=cached_count(q, ("catalog.country_category", cc, category)),
+    )
 
     return render_template(
         "catalog/country_category.html",
         cc=cc, country_name=name, category=category,
         products=products
     )
+
+
+@catalog.route("/export")
+def export():
+    """
+    Stream the LIVE catalog as NDJSON (default) or CSV (?format=csv).
+    ?since=<ISO timestamp> or ?cursor=<token from a previous export> turns it
+    into a delta with tombstones; see export.py.
+    """
+    fmt = (request.args.get("format") or "ndjson").lower()
+    if fmt not in EXPORT_FORMATS:
+        return jsonify(error=f"format must be one of {', '.join(EXPORT_FORMATS)}"), 400
+    try:
+        position = parse_position(request.args.get("since"), request.args.get("cursor"))
+    except BadPosition as e:
+        return jsonify(error=str(e)), 400
+
+    upto = settle_point(current_app.config.get("EXPORT_SETTLE_SECONDS", 5))
+    if fmt == "csv":
+        body, mimetype = csv_lines(position, upto), "text/csv"
+    else:
+        body, mimetype = ndjson_lines(position, upto), "application/x-ndjson"
+    return Response(stream_with_context(body), mimetype=mimetype, headers={
+        "X-Export-Cursor": closing_cursor(upto),
+        "Cache-Control": "no-store",
+    })
@@ -0,0 +1,127 @@
+# app/catalog/search_index.py
+"""SQLite FTS5 index over Product.name / short_desc / description.
+
+The index is an external-content FTS5 table (it stores only the tokens, the
+text itself stays in `product`). Triggers keep it in sync on insert, update
+and soft delete, so every write path -- ORM or bulk UPDATE -- is covered.
+"""
+import re
+
+from sqlalchemy import event, func, literal_column, or_, select, table, column, text
+
+from app.extensions import db
+from app.models import Product
+from app.sqlite_utils import is_sqlite
+
+FTS_TABLE = "product_fts"
+
+# column weights for bm25(): a hit in the name counts far more than one buried in the description
+BM25_WEIGHTS = (10.0, 4.0, 1.0)
+
+SEARCH_INDEX_DDL = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS product_fts USING fts5(
+        name, short_desc, description,
+        content='product', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS product_fts_ai AFTER INSERT ON product
+    WHEN coalesce(new.is_deleted, 0) = 0
+    BEGIN
+        INSERT INTO product_fts(rowid, name, short_desc, description)
+        VALUES (new.id, new.name, new.short_desc, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS product_fts_ad AFTER DELETE ON product
+    WHEN coalesce(old.is_deleted, 0) = 0
+    BEGIN
+        INSERT INTO product_fts(product_fts, rowid, name, short_desc, description)
+        VALUES ('delete', old.id, old.name, old.short_desc, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS product_fts_au
+    AFTER UPDATE OF name, short_desc, description, is_deleted ON product
+    BEGIN
+        INSERT INTO product_fts(product_fts, rowid, name, short_desc, description)
+        SELECT 'delete', old.id, old.name, old.short_desc, old.description
+        WHERE coalesce(old.is_deleted, 0) = 0;
+        INSERT INTO product_fts(rowid, name, short_desc, description)
+        SELECT new.id, new.name, new.short_desc, new.description
+        WHERE coalesce(new.is_deleted, 0) = 0;
+    END
+    """,
+)
+
+product_fts = table(FTS_TABLE, column("rowid"))
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+@event.listens_for(db.metadata, "after_create")
+def install_search_index(target, connection, **kw):
+    """Create the FTS table + triggers after db.create_all() (migrations do the same)."""
+    if not is_sqlite(connection):
+        return
+    for ddl in SEARCH_INDEX_DDL:
+        connection.execute(text(ddl))
+
+
+def match_expression(q: str):
+    """
+    Turn free text into a safe FTS5 query: every word becomes a quoted prefix
+    term, all terms must match. Returns None when there is nothing to search.
+    """
+    tokens = _TOKEN_RE.findall(q or "")
+    if not tokens:
+        return None
+    return " ".join(f'"{t}"*' for t in tokens)
+
+
+def ilike_filter(q: str):
+    """The old LIKE scan; still used when the database isn't SQLite."""
+    like = f"%{q}%"
+    return or_(
+        Product.name.ilike(like),
+        Product.short_desc.ilike(like),
+        Product.description.ilike(like),
+    )
+
+
+def apply_text_search(qry, q: str, id_column=Product.id):
+    """
+    Restrict `qry` to rows matching `q`.
+    Returns (query, rank) -- rank is a bm25() expression (lower = better) or None.
+    """
+    if not is_sqlite():
+        return qry.filter(id_column.in_(select(Product.id).where(ilike_filter(q)))), None
+
+    expr = match_expression(q)
+    if expr is None:
+        return qry, None
+
+    rank = func.bm25(literal_column(FTS_TABLE), *BM25_WEIGHTS)
+    qry = (qry
+           .join(product_fts, product_fts.c.rowid == id_column)
+           .filter(literal_column(FTS_TABLE).op("MATCH")(expr)))
+    return qry, rank
+
+
+def rebuild_search_index() -> int:
+    """Drop every token and re-index all non-deleted products. Returns the row count."""
+    conn = db.session.connection()
+    for ddl in SEARCH_INDEX_DDL:
+        conn.execute(text(ddl))
+    conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('delete-all')"))
+    result = conn.execute(text(
+        f"INSERT INTO {FTS_TABLE}(rowid, name, short_desc, description) "
+        "SELECT id, name, short_desc, description FROM product "
+        "WHERE coalesce(is_deleted, 0) = 0"
+    ))
+    conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')"))
+    db.session.commit()
+    return result.rowcount
@@ -0,0 +1,102 @@
+# app/catalog/slugs.py
+"""
+Product.slug allocation.
+
+Taken slugs for a base are read with one range query on the unique slug
+index (`base`, `base-2`, `base-3`, ...) and the next suffix is max + 1, so a
+popular name costs one round trip instead of one per existing copy.
+Numeric suffixes only count once the bare base is taken: `coffee-2024` may
+be an unrelated "Coffee 2024", and must not push a new "Coffee" past a free
+`coffee`.
+Allocation is still only a guess under concurrency: save_with_unique_slug
+inserts inside a savepoint and re-allocates if another writer won the race.
+"""
+import re
+
+from sqlalchemy import and_, or_, select
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db
+from app.models import Product
+
+SLUG_MAX = 220
+# leave room for "-<n>" within the column width
+BASE_MAX = SLUG_MAX - 10
+DEFAULT_BASE = "product"
+# bases per query -- keeps the OR chain well under SQLite's expression depth limit
+_CHUNK = 200
+
+
+def slugify(text: str) -> str:
+    text = re.sub(r"[^a-zA-Z0-9\- ]+", "", text or "").strip().lower()
+    text = re.sub(r"\s+", "-", text)
+    text = re.sub(r"-+", "-", text)
+    return text[:SLUG_MAX] or None
+
+
+def _base(base) -> str:
+    return (base or DEFAULT_BASE)[:BASE_MAX].strip("-") or DEFAULT_BASE
+
+
+def _taken_slugs(bases):
+    """
+    (slugs in the table equal to a base or of the form `base-...`,
+     {base: highest numeric suffix in use, 1 if none}).
+    """
+    taken, highest = set(), {b: 1 for b in bases}
+    bases = list(bases)
+    for i in range(0, len(bases), _CHUNK):
+        chunk = bases[i:i + _CHUNK]
+        # `base-...` sorts between "base-" and "base." ('.' follows '-' in ASCII)
+        conds = [Product.slug.in_(chunk)] + [
+            and_(Product.slug > f"{b}-", Product.slug < f"{b}.") for b in chunk
+        ]
+        for (slug,) in db.session.execute(select(Product.slug).where(or_(*conds))):
+            taken.add(slug)
+            prefix, _, n = slug.rpartition("-")
+            if n.isdigit() and prefix in highest:
+                highest[prefix] = max(highest[prefix], int(n))
+    return taken, highest
+
+
+def allocate_slugs(bases) -> list:
+    """
+    One free slug per entry of `bases` (slugified names, None allowed), unique
+    against the table and each other. One query per 200 distinct bases.
+    """
+    bases = [_base(b) for b in bases]
+    # `taken` grows with every slug handed out, so "coffee-2" made for one
+    # "coffee" can't be handed out again to a row whose base is "coffee-2"
+    taken, highest = _taken_slugs(set(bases))
+    slugs = []
+    for b in bases:
+        slug = b
+        if slug in taken:
+            n = highest[b] + 1
+            while f"{b}-{n}" in taken:
+                n += 1
+            highest[b] = n
+            slug = f"{b}-{n}"
+        taken.add(slug)
+        slugs.append(slug)
+    return slugs
+
+
+def allocate_slug(base) -> str:
+    return allocate_slugs([base])[0]
+
+
+def save_with_unique_slug(product, base, attempts: int = 5):
+    """
+    Give `product` a free slug and flush it. If a concurrent insert took the
+    slug first, roll back to the savepoint and try the next one.
+    """
+    for attempt in range(attempts):
+        product.slug = allocate_slug(base)
+        try:
+            with db.session.begin_nested():
+                db.session.add(product)
+            return product
+        except IntegrityError as e:
+            if "slug" not in str(e.orig) or attempt == attempts - 1:
+                raise
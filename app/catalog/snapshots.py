@@ -0,0 +1,158 @@
+# app/catalog/snapshots.py
+"""
+Per-country landing page snapshots (models.CountrySnapshot).
+
+The country page used to run three queries per hit even though its content
+only changes when something in that country is published or edited. Now:
+
+* the featured products, category counts and featured suppliers are stored
+  as one JSON payload per country;
+* triggers mark a country stale (and bump its version) whenever a listing in
+  it appears, disappears or its supplier is edited;
+* each worker keeps the decoded payload in memory keyed by version, so a hit
+  costs one primary-key lookup on country_snapshot and nothing else;
+* a stale country is rebuilt by the next request that sees it.
+"""
+import json
+import threading
+from decimal import Decimal
+
+from sqlalchemy import event, func, select, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app.extensions import db
+from app.models import CatalogListing, CountrySnapshot, Supplier
+from app.sqlite_utils import is_sqlite
+
+FEATURED_LIMIT = 12
+CATEGORY_LIMIT = 12
+SUPPLIER_LIMIT = 8
+
+SNAPSHOT_TRIGGERS_DDL = (
+    """
+    CREATE TRIGGER IF NOT EXISTS country_snapshot_listing_ai AFTER INSERT ON catalog_listing
+    BEGIN
+        UPDATE country_snapshot SET is_stale = 1, version = version + 1
+        WHERE country_code = new.effective_country;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS country_snapshot_listing_ad AFTER DELETE ON catalog_listing
+    BEGIN
+        UPDATE country_snapshot SET is_stale = 1, version = version + 1
+        WHERE country_code = old.effective_country;
+    END
+    """,
+    # supplier cards show fields the listing table doesn't carry
+    """
+    CREATE TRIGGER IF NOT EXISTS country_snapshot_supplier_au
+    AFTER UPDATE OF business_name, nature_of_business ON supplier
+    BEGIN
+        UPDATE country_snapshot SET is_stale = 1, version = version + 1
+        WHERE country_code IN (SELECT DISTINCT effective_country FROM catalog_listing
+                               WHERE supplier_id = new.id);
+    END
+    """,
+)
+
+# country_code -> (version, payload) for this worker
+_memory = {}
+_memory_lock = threading.Lock()
+
+
+@event.listens_for(db.metadata, "after_create")
+def install_snapshot_triggers(target, connection, **kw):
+    if not is_sqlite(connection):
+        return
+    for ddl in SNAPSHOT_TRIGGERS_DDL:
+        connection.execute(text(ddl))
+
+
+def _build_payload(cc: str) -> dict:
+    featured = (CatalogListing.query
+        .filter(CatalogListing.effective_country == cc)
+        .order_by(CatalogListing.created_at.desc(), CatalogListing.product_id.desc())
+        .limit(FEATURED_LIMIT).all())
+
+    cat_counts = (db.session.query(CatalogListing.category, func.count(CatalogListing.product_id))
+        .filter(CatalogListing.effective_country == cc)
+        .group_by(CatalogListing.category)
+        .order_by(func.count(CatalogListing.product_id).desc())
+        .limit(CATEGORY_LIMIT)
+        .all())
+
+    supplier_ids = (select(CatalogListing.supplier_id)
+        .where(CatalogListing.effective_country == cc)
+        .distinct()
+        .limit(SUPPLIER_LIMIT))
+    suppliers = Supplier.query.filter(Supplier.id.in_(supplier_ids.scalar_subquery())).all()
+
+    return {
+        "featured_products": [
+            {"id": p.product_id, "name": p.name, "main_image_path": p.main_image_path,
+             "currency": p.currency, "price": str(p.price), "supplier_name": p.supplier_name}
+            for p in featured
+        ],
+        "category_counts": [[cat, n] for cat, n in cat_counts],
+        "suppliers": [
+            {"id": s.id, "business_name": s.business_name, "nature_of_business": s.nature_of_business}
+            for s in suppliers
+        ],
+    }
+
+
+def _decode(raw: str) -> dict:
+    payload = json.loads(raw)
+    for p in payload["featured_products"]:
+        p["price"] = Decimal(p["price"])
+    return payload
+
+
+def rebuild_country_snapshot(cc: str, seen_version: int = 0) -> dict:
+    """
+    Recompute one country and store it. The row only goes back to "fresh" if
+    nobody invalidated it again while we were building (version unchanged).
+    """
+    payload = _build_payload(cc)
+    raw = json.dumps(payload, separators=(",", ":"))
+    stmt = sqlite_insert(CountrySnapshot).values(
+        country_code=cc, payload=raw, version=seen_version, is_stale=False, built_at=func.now())
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[CountrySnapshot.country_code],
+        set_={"payload": raw, "is_stale": False, "built_at": func.now()},
+        where=CountrySnapshot.version == seen_version,
+    )
+    db.session.execute(stmt)
+    db.session.commit()
+    return _decode(raw)
+
+
+def get_country_snapshot(cc: str) -> dict:
+    """Landing page content for `cc`; never touches the product tables unless stale."""
+    row = db.session.execute(
+        select(CountrySnapshot.version, CountrySnapshot.is_stale)
+        .where(CountrySnapshot.country_code == cc)
+    ).first()
+
+    if row is None or row.is_stale:
+        return rebuild_country_snapshot(cc, row.version if row else 0)
+
+    with _memory_lock:
+        cached = _memory.get(cc)
+    if cached and cached[0] == row.version:
+        return cached[1]
+
+    raw = db.session.execute(
+        select(CountrySnapshot.payload).where(CountrySnapshot.country_code == cc)
+    ).scalar_one()
+    payload = _decode(raw)
+    with _memory_lock:
+        _memory[cc] = (row.version, payload)
+    return payload
+
+
+def rebuild_all_snapshots(country_codes) -> int:
+    for cc in country_codes:
+        row = db.session.get(CountrySnapshot, cc)
+        rebuild_country_snapshot(cc, row.version if row else 0)
+    return len(country_codes)
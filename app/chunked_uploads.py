@@ -0,0 +1,145 @@
+# app/chunked_uploads.py
+"""
+Resumable, chunked uploads that never go through form parsing.
+
+1. start_upload(): the client declares size and sha256. The final storage key
+   is fixed right away: the blob key in "cas" mode, or a fresh uuid key.
+   The bytes are still required when that blob already exists, since knowing
+   a digest isn't proof of having the file.
+2. append_chunk(): raw request bodies, each sent with the offset it starts
+   at, are appended to `<key>.<upload id>.part` next to the final file. The
+   length of the .part file *is* the offset, so resuming (upload_offset)
+   needs no bookkeeping and chunks cost no database writes.
+3. Once the last byte is in, the .part file is hashed. It is renamed into
+   place if the digest matches (replacing an identical blob if there is
+   one), and discarded otherwise.
+
+Forms then submit the returned key; claim_upload() checks that the key
+belongs to a finished upload of the same user.
+"""
+import fcntl
+import hashlib
+import os
+import uuid
+from datetime import datetime
+
+from flask import current_app
+
+from app.extensions import db
+from app.models import UploadSession
+from app.uploads import register_blob
+from storage_keys import blob_key
+from storage_local import key_to_local_path
+
+READ_CHUNK = 1024 * 1024
+
+
+class UploadError(Exception):
+    """Message is safe to show the client; `status` is the HTTP status to answer with."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def _part_path(upload: UploadSession):
+    # per session: in "cas" mode two people may be sending the same file at once
+    return key_to_local_path(f"{upload.key}.{upload.id}.part")
+
+
+def upload_offset(upload: UploadSession) -> int:
+    if upload.completed_at:
+        return upload.size_bytes
+    try:
+        return _part_path(upload).stat().st_size
+    except FileNotFoundError:
+        return 0
+
+
+def upload_state(upload: UploadSession) -> dict:
+    state = {"upload_id": upload.id, "offset": upload_offset(upload), "size": upload.size_bytes,
+             "chunk_size": current_app.config.get("UPLOAD_CHUNK_BYTES", 4 * 1024 * 1024),
+             "complete": upload.completed_at is not None}
+    if upload.completed_at:
+        state["key"] = upload.key
+    return state
+
+
+def start_upload(user_id: int, filename: str, size: int, checksum: str, content_type: str, uuid_key: str):
+    """New UploadSession (committed). `uuid_key` is the key to use outside "cas" mode."""
+    if not isinstance(checksum, str) or len(checksum) != 64 \
+            or any(c not in "0123456789abcdef" for c in checksum.lower()):
+        raise UploadError("sha256 must be 64 hex digits")
+    checksum = checksum.lower()
+    if not isinstance(filename, (str, type(None))) or not isinstance(content_type, (str, type(None))):
+        raise UploadError("filename and content_type must be strings")
+    if not isinstance(size, int) or isinstance(size, bool) or size <= 0:
+        raise UploadError("size must be a positive integer")
+    if size > current_app.config.get("UPLOAD_MAX_BYTES", 25 * 1024 * 1024):
+        raise UploadError("file too large", 413)
+
+    cas = current_app.config.get("UPLOAD_STORAGE", "cas") == "cas"
+    upload = UploadSession(id=uuid.uuid4().hex, user_id=user_id, key=blob_key(checksum) if cas else uuid_key,
+                           filename=(filename or "")[:255] or None, content_type=(content_type or "")[:100] or None,
+                           size_bytes=size, checksum=checksum)
+    db.session.add(upload)
+    db.session.commit()
+    return upload
+
+
+def append_chunk(upload: UploadSession, offset: int, stream) -> int:
+    """Append the request body at `offset`; finishes the upload on the last byte. Returns the new offset."""
+    if upload.completed_at:
+        raise UploadError("upload already complete", 409)
+    path = _part_path(upload)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "ab") as out:
+        try:
+            fcntl.flock(out, fcntl.LOCK_EX | fcntl.LOCK_NB)   # one writer per upload
+        except BlockingIOError:
+            raise UploadError("another chunk of this upload is in flight", 409)
+        current = out.seek(0, os.SEEK_END)
+        if offset != current:
+            raise UploadError(f"offset mismatch: have {current} bytes", 409)
+        remaining = upload.size_bytes - current
+        while True:
+            chunk = stream.read(min(READ_CHUNK, remaining + 1))
+            if not chunk:
+                break
+            if len(chunk) > remaining:
+                out.truncate(current)
+                raise UploadError("more bytes than declared", 413)
+            out.write(chunk)
+            current += len(chunk)
+            remaining -= len(chunk)
+        out.flush()
+        if current == upload.size_bytes:
+            _finish(upload)   # still holding the lock
+    return current
+
+
+def _finish(upload: UploadSession):
+    path = _part_path(upload)
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(READ_CHUNK):
+            digest.update(chunk)
+    if digest.hexdigest() != upload.checksum:
+        path.unlink(missing_ok=True)
+        raise UploadError("checksum mismatch; start the upload again", 422)
+    os.replace(path, key_to_local_path(upload.key))
+    if current_app.config.get("UPLOAD_STORAGE", "cas") == "cas":
+        register_blob(upload.checksum, upload.size_bytes)
+    upload.completed_at = datetime.utcnow()
+    db.session.commit()
+
+
+def claim_upload(user_id: int, key: str):
+    """The finished UploadSession for `key` started by `user_id`, or None."""
+    if not key:
+        return None
+    return (UploadSession.query
+            .filter(UploadSession.user_id == user_id, UploadSession.key == key,
+                    UploadSession.completed_at.isnot(None))
+            .order_by(UploadSession.completed_at.desc())
+            .first())
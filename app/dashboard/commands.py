@@ -0,0 +1,97 @@
+# app/dashboard/commands.py
+import hashlib
+import json
+import secrets
+
+import time
+from datetime import timedelta
+
+import click
+from flask import current_app
+
+from . import dashboard
+from app.extensions import db
+from app.models import ApiToken, Supplier
+from .product_import import import_products, detect_format, IMPORT_FORMATS, DEFAULT_CHUNK_SIZE
+from app.media import pending_image_ids, process_image
+from app.upload_gc import collect_garbage, prune_upload_sessions, DEFAULT_BATCH_SIZE
+
+
+@dashboard.cli.command("import-products")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--supplier-id", type=int, required=True, help="Supplier the products belong to.")
+@click.option("--format", "fmt", type=click.Choice(IMPORT_FORMATS), help="Defaults to the file extension.")
+@click.option("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, show_default=True)
+def import_products_command(path, supplier_id, fmt, chunk_size):
+    """Bulk-import products as drafts (flask dashboard import-products FILE --supplier-id N).
+
+    Writes the report (rejected rows, progress, summary) to stdout as JSON lines.
+    """
+    if db.session.get(Supplier, supplier_id) is None:
+        raise click.BadParameter(f"no supplier with id {supplier_id}", param_hint="--supplier-id")
+    with open(path, "rb") as stream:
+        for record in import_products(supplier_id, stream, fmt or detect_format(path), chunk_size):
+            click.echo(json.dumps(record))
+
+
+@dashboard.cli.command("create-api-token")
+@click.option("--supplier-id", type=int, required=True)
+@click.option("--label", default="", help="What the token is for, e.g. the ERP's name.")
+def create_api_token(supplier_id, label):
+    """Issue a Bearer token for a supplier's integrations. The token is printed once."""
+    if db.session.get(Supplier, supplier_id) is None:
+        raise click.BadParameter(f"no supplier with id {supplier_id}", param_hint="--supplier-id")
+    token = secrets.token_urlsafe(32)
+    db.session.add(ApiToken(supplier_id=supplier_id, label=label or None,
+                            token_hash=hashlib.sha256(token.encode()).hexdigest()))
+    db.session.commit()
+    click.echo(token)
+
+
+@dashboard.cli.command("process-images")
+@click.option("--watch", is_flag=True, help="Keep polling for new uploads instead of exiting when done.")
+@click.option("--interval", type=float, default=2.0, show_default=True, help="Seconds between polls with --watch.")
+def process_images(watch, interval):
+    """Generate resized variants for pending product images (flask dashboard process-images)."""
+    done = errors = 0
+    while True:
+        after_id = 0
+        while ids := pending_image_ids(after_id):
+            for image_id in ids:
+                try:
+                    status = process_image(image_id)
+                    done += 1
+                except Exception as e:
+                    # left pending for the next run
+                    db.session.rollback()
+                    errors += 1
+                    status = f"error ({e})"
+                click.echo(f"image {image_id}: {status}")
+            after_id = ids[-1]
+        if not watch:
+            break
+        time.sleep(interval)
+    click.echo(f"Processed {done} images, {errors} errors.")
+
+
+@dashboard.cli.command("gc-uploads")
+@click.option("--dry-run", is_flag=True, help="Report what would be quarantined, restored or deleted; change nothing.")
+@click.option("--grace-hours", type=float, help="Defaults to UPLOAD_GC_GRACE_HOURS.")
+@click.option("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, show_default=True)
+@click.option("--quiet", is_flag=True, help="Only print the summary.")
+def gc_uploads(dry_run, grace_hours, batch_size, quiet):
+    """Quarantine, then delete, stored files nothing points to (flask dashboard gc-uploads)."""
+    if grace_hours is None:
+        grace_hours = current_app.config.get("UPLOAD_GC_GRACE_HOURS", 24)
+    grace = timedelta(hours=grace_hours)
+    sessions = prune_upload_sessions(grace, dry_run=dry_run)
+
+    totals = {"quarantine": [0, 0], "restore": [0, 0], "delete": [0, 0]}
+    for action, key, size in collect_garbage(grace, dry_run=dry_run, batch_size=batch_size):
+        totals[action][0] += 1
+        totals[action][1] += size
+        if not quiet:
+            click.echo(f"{'would ' if dry_run else ''}{action} {key} ({size} bytes)")
+    click.echo(("Dry run: " if dry_run else "")
+               + ", ".join(f"{action} {n} files ({size} bytes)" for action, (n, size) in totals.items())
+               + f"; {sessions} expired upload sessions.")
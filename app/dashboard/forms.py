@@ -1,6 +1,7 @@
 from flask_wtf import FlaskForm
 
-from wtforms import StringField, SubmitField, FileField, DecimalField, IntegerField, TextAreaField, SelectField
+from flask_wtf.file import FileRequired, FileAllowed
+from wtforms import StringField, SubmitField, FileField, DecimalField, IntegerField, TextAreaField, SelectField, HiddenField
 from wtforms.validators import DataRequired, Optional, Length, Email, NumberRange
 
 from decimal import Decimal
@@ -70,6 +71,10 @@ class SupplierVerificationForm(FlaskForm):
     registration_cert = FileField('Registration Certificate', validators=[Optional()])
     bank_verification_doc = FileField('Bank Verification Document', validators=[Optional()])
     director_id_doc = FileField('Director ID Document', validators=[Optional()])
+    # storage keys of files already sent through the chunked upload endpoint (filled in by JS)
+    registration_cert_upload = HiddenField()
+    bank_verification_doc_upload = HiddenField()
+    director_id_doc_upload = HiddenField()
 
     submit = SubmitField('Submit Verification')
 
@@ -100,12 +105,17 @@ class AddProductForm(FlaskForm):
     lead_time_days = IntegerField("Lead Time (days)", validators=[Optional(), NumberRange(min=0)])
     incoterms = SelectField("Incoterms", choices=INCOTERMS, default="")
 
-    # # One main image
-    # main_image = FileField(
-    #     "Main Image",
-    #     validators=[FileAllowed(["jpg", "jpeg", "png", "webp"], "Images only (jpg, png, webp).")]
-    # )
+    # One main image (resized in the background, see app/media.py)
+    main_image = FileField(
+        "Main Image",
+        validators=[Optional(), FileAllowed(["jpg", "jpeg", "png", "webp"], "Images only (jpg, png, webp).")]
+    )
 
     # Actions
     save_draft = SubmitField("Save as Draft")
     publish = SubmitField("Publish")
+
+
+class ProductImportForm(FlaskForm):
+    file = FileField("CSV or JSONL file", validators=[FileRequired()])
+    submit = SubmitField("Import")
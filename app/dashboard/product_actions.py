@@ -0,0 +1,84 @@
+# app/dashboard/product_actions.py
+"""
+Bulk publish / unpublish / archive / delete / restore for a supplier's products.
+
+Each action is one UPDATE guarded by supplier_id and by the state the product
+must be in for the action to make sense; RETURNING tells us which ids it
+touched. Whatever didn't match is looked up once more to say why it was
+skipped.
+"""
+from sqlalchemy import func, select, update
+
+from app.extensions import db
+from app.models import Product, ProductStatus
+
+# action -> (extra WHERE conditions, values to set)
+BULK_ACTIONS = {
+    "publish": (
+        (Product.is_deleted == False, Product.status != ProductStatus.LIVE),  # noqa: E712
+        {"status": ProductStatus.LIVE},
+    ),
+    "unpublish": (
+        (Product.is_deleted == False, Product.status == ProductStatus.LIVE),  # noqa: E712
+        {"status": ProductStatus.DRAFT},
+    ),
+    "archive": (
+        (Product.is_deleted == False, Product.status != ProductStatus.ARCHIVED),  # noqa: E712
+        {"status": ProductStatus.ARCHIVED},
+    ),
+    "delete": (
+        (Product.is_deleted == False,),  # noqa: E712
+        {"is_deleted": True},
+    ),
+    # restored products come back as drafts, never straight onto the storefront
+    "restore": (
+        (Product.is_deleted == True,),  # noqa: E712
+        {"is_deleted": False, "status": ProductStatus.DRAFT},
+    ),
+}
+MAX_IDS = 1000
+
+
+def _skip_reason(action: str, row) -> str:
+    if row is None:
+        return "not found"
+    if action == "restore":
+        return "not deleted"
+    if row.is_deleted:
+        return "deleted"
+    return f"already {row.status.value}"
+
+
+def bulk_product_action(supplier_id: int, action: str, product_ids, can_publish: bool):
+    """
+    Apply `action` to the given products of `supplier_id` and commit.
+    Returns (changed ids, {skipped id: reason}); ids past MAX_IDS are skipped unchanged.
+    """
+    ids = list(dict.fromkeys(int(pid) for pid in product_ids))
+    # past MAX_IDS nothing is touched, but each id still gets an outcome
+    ids, over_limit = ids[:MAX_IDS], {pid: "over the batch limit" for pid in ids[MAX_IDS:]}
+    if not ids:
+        return [], over_limit
+    if action == "publish" and not can_publish:
+        return [], {**{pid: "supplier not verified" for pid in ids}, **over_limit}
+
+    conditions, values = BULK_ACTIONS[action]
+    changed = db.session.execute(
+        update(Product)
+        .where(Product.supplier_id == supplier_id, Product.id.in_(ids), *conditions)
+        .values(**values, updated_at=func.now())
+        .returning(Product.id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+    db.session.commit()
+
+    missed = [pid for pid in ids if pid not in set(changed)]
+    skipped = {}
+    if missed:
+        rows = {row.id: row for row in db.session.execute(
+            select(Product.id, Product.status, Product.is_deleted)
+            .where(Product.supplier_id == supplier_id, Product.id.in_(missed))
+        )}
+        skipped = {pid: _skip_reason(action, rows.get(pid)) for pid in missed}
+    skipped.update(over_limit)
+    return changed, skipped
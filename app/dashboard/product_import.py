@@ -0,0 +1,167 @@
+# app/dashboard/product_import.py
+"""
+Bulk product import from CSV or JSONL, for suppliers with big catalogs.
+
+Rows are read one at a time, checked with AddProductForm itself (same rules
+as the add-product page), buffered into chunks and written with one
+executemany INSERT + commit per chunk; slugs for a chunk come from a single
+allocate_slugs call. Only the current chunk is ever held in memory.
+
+import_products() is a generator of report records so both the HTTP endpoint
+and the CLI can stream them out as they happen:
+
+    {"line": 7, "errors": {"price": ["Enter a price"]}}     one per rejected row
+                                                             (also per row of a chunk
+                                                             that could not be written)
+    {"imported": 1000, "failed": 3}                          after every chunk
+    {"done": true, "imported": 99812, "failed": 188}         last record
+"""
+import csv
+import io
+import json
+
+from sqlalchemy import insert
+from flask import current_app
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from werkzeug.datastructures import MultiDict
+
+from app.catalog.slugs import allocate_slugs, slugify
+from app.extensions import db
+from app.models import Product, ProductStatus
+from .forms import AddProductForm
+
+IMPORT_FIELDS = (
+    "name", "short_desc", "description", "category", "subcategory", "hs_code",
+    "country_of_origin", "price", "currency", "moq", "stock", "lead_time_days", "incoterms",
+)
+IMPORT_FORMATS = ("csv", "jsonl")
+DEFAULT_CHUNK_SIZE = 1000
+SLUG_RETRIES = 3
+
+
+def detect_format(filename: str) -> str:
+    return "jsonl" if (filename or "").lower().endswith((".jsonl", ".ndjson", ".json")) else "csv"
+
+
+def iter_rows(stream, fmt: str):
+    """Yield (line_no, row dict or None, error or None) from a binary stream."""
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        for row in reader:
+            yield reader.line_num, row, None
+        return
+    for line_no, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield line_no, None, f"invalid JSON: {e}"
+            continue
+        if not isinstance(row, dict):
+            yield line_no, None, "expected a JSON object"
+            continue
+        yield line_no, row, None
+
+
+def row_form():
+    """One AddProductForm to validate every row with; binding its fields is the costly part."""
+    return AddProductForm(formdata=None, meta={"csrf": False})
+
+
+def validate_row(row: dict, form=None):
+    """Run the row through AddProductForm. Returns (values for INSERT, None) or (None, errors)."""
+    data = MultiDict({
+        k: str(row[k]).strip() for k in IMPORT_FIELDS
+        if row.get(k) is not None and str(row[k]).strip() != ""
+    })
+    form = form or row_form()
+    form.process(formdata=data)
+    if not form.validate():
+        return None, form.errors
+    return {
+        "name": form.name.data,
+        "short_desc": form.short_desc.data or None,
+        "description": form.description.data or None,
+        "category": form.category.data or None,
+        "subcategory": form.subcategory.data or None,
+        "hs_code": form.hs_code.data or None,
+        "country_of_origin": (form.country_of_origin.data or "").upper() or None,
+        "price": form.price.data,
+        "currency": form.currency.data,
+        "moq": form.moq.data or 1,
+        "stock": form.stock.data or 0,
+        "lead_time_days": form.lead_time_days.data,
+        "incoterms": form.incoterms.data or None,
+    }, None
+
+
+def _insert_chunk(supplier_id: int, values: list):
+    """executemany INSERT for one chunk; re-allocates slugs if a concurrent insert took one."""
+    for attempt in range(SLUG_RETRIES):
+        slugs = allocate_slugs([slugify(v["name"]) for v in values])
+        rows = [dict(v, supplier_id=supplier_id, slug=slug, status=ProductStatus.DRAFT, is_deleted=False)
+                for v, slug in zip(values, slugs)]
+        try:
+            # Core insert: one cursor.executemany (the ORM path splits rows on NULL patterns)
+            db.session.execute(insert(Product.__table__), rows)
+            db.session.commit()
+            return
+        except IntegrityError as e:
+            db.session.rollback()
+            if "slug" not in str(e.orig) or attempt == SLUG_RETRIES - 1:
+                raise
+
+
+def _write_chunk(supplier_id: int, chunk: list):
+    """
+    Insert a chunk of (line_no, values). Returns the per-row error records if
+    it had to be rolled back, else []: one bad chunk must not end the import.
+    """
+    try:
+        _insert_chunk(supplier_id, [values for _line_no, values in chunk])
+        return []
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        current_app.logger.warning("product import: chunk of %s rows for supplier %s not saved: %s",
+                                   len(chunk), supplier_id, e)
+        reason = ("could not allocate a unique slug" if isinstance(e, IntegrityError) and "slug" in str(e.orig)
+                  else "could not be saved")
+        return [{"line": line_no, "errors": {"row": [reason]}} for line_no, _values in chunk]
+
+
+def import_products(supplier_id: int, stream, fmt: str = "csv", chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """Import every valid row as a DRAFT product of `supplier_id`, yielding report records."""
+    imported = failed = 0
+    chunk = []
+    form = row_form()
+    try:
+        for line_no, row, error in iter_rows(stream, fmt):
+            if error is None:
+                values, errors = validate_row(row, form)
+            else:
+                values, errors = None, {"row": [error]}
+            if errors:
+                failed += 1
+                yield {"line": line_no, "errors": errors}
+                continue
+
+            chunk.append((line_no, values))
+            if len(chunk) >= chunk_size:
+                rejected = _write_chunk(supplier_id, chunk)
+                yield from rejected
+                imported += len(chunk) - len(rejected)
+                failed += len(rejected)
+                chunk = []
+                yield {"imported": imported, "failed": failed}
+    except (UnicodeDecodeError, csv.Error) as e:
+        # unreadable from here on: keep what was parsed so far, report where it stopped
+        yield {"line": None, "errors": {"file": [str(e)]}}
+
+    if chunk:
+        rejected = _write_chunk(supplier_id, chunk)
+        yield from rejected
+        imported += len(chunk) - len(rejected)
+        failed += len(rejected)
+    yield {"done": True, "imported": imported, "failed": failed}
@@ -0,0 +1,196 @@
+# app/dashboard/product_sync.py
+"""
+Bulk stock / price sync for supplier ERPs.
+
+A batch is a list of {"product_id" | "slug", "stock"?, "price"?}. It costs:
+
+* one SELECT resolving ids/slugs to the caller's own, non-deleted products,
+  which also reads their current stock and price;
+* one UPDATE per 500 changed products, setting stock and price through CASE
+  expressions and guarded by supplier_id.
+
+Items whose values already match are reported "unchanged" and not written, so
+an ERP pushing its whole catalog every few minutes doesn't churn the triggers
+behind search, listings and the page cache.
+
+Idempotency: a client may send an Idempotency-Key. The first response for a
+key is stored with the batch and replayed for any retry with the same body;
+reusing a key for a different body is rejected.
+"""
+import hashlib
+import json
+from datetime import datetime, timedelta
+from decimal import Decimal, InvalidOperation
+
+from sqlalchemy import case, func, or_, select, update
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db
+from app.models import IdempotencyKey, Product
+
+UPDATE_CHUNK = 500
+IDEMPOTENCY_TTL = timedelta(hours=24)
+PRICE_MAX = Decimal("99999999.99")
+CENT = Decimal("0.01")
+
+
+class IdempotencyConflict(Exception):
+    """The key was already used for a different request body."""
+
+
+def _integer(value, field: str) -> int:
+    """A whole number from JSON: int, integral float or digit string. No bools, no truncating."""
+    if isinstance(value, bool):
+        raise ValueError(f"{field} must be an integer")
+    if isinstance(value, float):
+        if not value.is_integer():
+            raise ValueError(f"{field} must be an integer")
+        return int(value)
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and value.strip().lstrip("-").isdigit():
+        return int(value)
+    raise ValueError(f"{field} must be an integer")
+
+
+def _parse_item(item):
+    """(ref, stock, price) or raises ValueError with a message for the client."""
+    if not isinstance(item, dict):
+        raise ValueError("expected an object")
+    if item.get("product_id") is not None:
+        ref = ("id", _integer(item["product_id"], "product_id"))
+    elif item.get("slug"):
+        ref = ("slug", str(item["slug"]))
+    else:
+        raise ValueError("product_id or slug is required")
+
+    stock = price = None
+    if item.get("stock") is not None:
+        stock = _integer(item["stock"], "stock")
+        if stock < 0:
+            raise ValueError("stock must be >= 0")
+    if item.get("price") is not None:
+        if isinstance(item["price"], bool):
+            raise ValueError("price must be a number")
+        try:
+            price = Decimal(str(item["price"]))
+        except InvalidOperation:
+            raise ValueError("price must be a number")
+        if not price.is_finite():
+            raise ValueError("price must be a number")
+        # bounds before quantize: 1e30 can't be quantized to cents at all
+        if price <= 0:
+            raise ValueError("price must be > 0")
+        if price > PRICE_MAX:
+            raise ValueError(f"price must be <= {PRICE_MAX}")
+        price = price.quantize(CENT)
+        if price <= 0:
+            raise ValueError("price must be > 0")
+    if stock is None and price is None:
+        raise ValueError("nothing to update: send stock and/or price")
+    return ref, stock, price
+
+
+def _resolve(supplier_id: int, refs):
+    ids = {v for kind, v in refs if kind == "id"}
+    slugs = {v for kind, v in refs if kind == "slug"}
+    rows = db.session.execute(
+        select(Product.id, Product.slug, Product.stock, Product.price)
+        .where(Product.supplier_id == supplier_id,
+               Product.is_deleted == False,  # noqa: E712
+               or_(Product.id.in_(ids), Product.slug.in_(slugs)))
+    ).all()
+    by_ref = {}
+    for row in rows:
+        by_ref[("id", row.id)] = row
+        if row.slug:
+            by_ref[("slug", row.slug)] = row
+    return by_ref
+
+
+def apply_stock_price_updates(supplier_id: int, items) -> list:
+    """
+    Apply a batch for one supplier; the caller commits (together with the
+    idempotency record, see remember). Returns one result dict per item, in order.
+    """
+    results = [None] * len(items)
+    parsed = []
+    for i, item in enumerate(items):
+        try:
+            parsed.append((i,) + _parse_item(item))
+        except (ValueError, TypeError) as e:
+            results[i] = {"index": i, "status": "invalid", "error": str(e)}
+
+    current = _resolve(supplier_id, [ref for _i, ref, _s, _p in parsed]) if parsed else {}
+
+    changes = {}   # product id -> {"stock": .., "price": ..}; later items win
+    for i, ref, stock, price in parsed:
+        row = current.get(ref)
+        if row is None:
+            results[i] = {"index": i, "status": "not_found"}
+            continue
+        target = changes.setdefault(row.id, {"stock": row.stock, "price": row.price})
+        if stock is not None:
+            target["stock"] = stock
+        if price is not None:
+            target["price"] = price
+        results[i] = {"index": i, "product_id": row.id, "status": "pending"}
+
+    unchanged = {
+        row.id for row in current.values()
+        if row.id in changes and changes[row.id] == {"stock": row.stock, "price": row.price}
+    }
+    dirty = [pid for pid in changes if pid not in unchanged]
+    for start in range(0, len(dirty), UPDATE_CHUNK):
+        chunk = dirty[start:start + UPDATE_CHUNK]
+        db.session.execute(
+            update(Product)
+            .where(Product.supplier_id == supplier_id, Product.id.in_(chunk))
+            .values(
+                stock=case({pid: changes[pid]["stock"] for pid in chunk}, value=Product.id, else_=Product.stock),
+                price=case({pid: changes[pid]["price"] for pid in chunk}, value=Product.id, else_=Product.price),
+                updated_at=func.now(),
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    for result in results:
+        if result["status"] == "pending":
+            result["status"] = "unchanged" if result["product_id"] in unchanged else "updated"
+    return results
+
+
+# --- idempotency --------------------------------------------------------------
+
+def request_fingerprint(payload) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def replay(supplier_id: int, key: str, fingerprint: str):
+    """(body, status) stored for this key, None if unused. Raises IdempotencyConflict on a body mismatch."""
+    stored = db.session.get(IdempotencyKey, (supplier_id, key))
+    if stored is None:
+        return None
+    if stored.request_hash != fingerprint:
+        raise IdempotencyConflict(key)
+    return json.loads(stored.response), stored.status_code
+
+
+def remember(supplier_id: int, key: str, fingerprint: str, body, status: int = 200):
+    """
+    Store the response for `key` and commit it in the same transaction as the
+    updates. If a concurrent retry committed the key first, our updates are
+    rolled back and its stored response is returned instead.
+    """
+    db.session.execute(
+        db.delete(IdempotencyKey).where(IdempotencyKey.supplier_id == supplier_id,
+                                        IdempotencyKey.created_at < datetime.utcnow() - IDEMPOTENCY_TTL)
+    )
+    db.session.add(IdempotencyKey(supplier_id=supplier_id, key=key, request_hash=fingerprint,
+                                  response=json.dumps(body, default=str), status_code=status))
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return replay(supplier_id, key, fingerprint)
+    return body, status
@@ -1,27 +1,46 @@
-from flask import render_template, redirect, url_for, abort, flash, request
+from flask import render_template, redirect, url_for, abort, flash, request, jsonify
 from flask_login import login_required, current_user
 from . import dashboard
 from .forms import CustomerProfileForm, SupplierVerificationForm, AddProductForm
-from app.models import Customer, Supplier, Product, SupplierStatus, SupplierDocument
+from app.models import Customer, Supplier, Product, ProductImage, SupplierStatus, SupplierDocument, UploadSession
 from app.extensions import db
+from app.catalog.slugs import slugify, save_with_unique_slug
 
-from storage_keys import supplier_doc_key
-from storage_local import key_to_local_path, save_local
+from app.uploads import store_upload, StoredUpload
+from app.chunked_uploads import (UploadError, start_upload, append_chunk, upload_state, claim_upload)
+from app.media import enqueue_variants
+from app.files import serve_upload
+from app.security import can_view_supplier_documents
+
+from storage_keys import supplier_doc_key, product_media_key, is_blob_key
+from storage_local import key_to_local_path
 
 from pycountry import countries
 from flask import current_app
 from werkzeug.utils import secure_filename
+import mimetypes
 import os
 
+SUPPLIER_DOC_KINDS = ("registration_cert", "bank_verification_doc", "director_id_doc")
+
+
 def upsert_supplier_doc(supplier_id: int, kind: str, file_storage, *, delete_old_local=False):
     """Create or replace a SupplierDocument for this supplier+kind."""
     if not (file_storage and file_storage.filename):
         return None
 
-    # 1) generate a storage key and save bytes (dev: local; prod: S3 done client-side)
-    key = supplier_doc_key(supplier_id, kind, file_storage.filename)
-    save_local(file_storage, key)  # in prod you'd skip this because browser uploaded to S3
+    # 1) save bytes (dev: local, deduplicated by content; prod: S3 done client-side)
+    stored = store_upload(file_storage, supplier_doc_key(supplier_id, kind, file_storage.filename))
+    return _set_supplier_doc(supplier_id, kind, stored, file_storage.mimetype, delete_old_local=delete_old_local)
+
+
+def attach_uploaded_doc(supplier_id: int, kind: str, upload, *, delete_old_local=False):
+    """Same as upsert_supplier_doc, for a file that arrived through the chunked upload endpoint."""
+    stored = StoredUpload(upload.key, upload.checksum if is_blob_key(upload.key) else None, upload.size_bytes)
+    return _set_supplier_doc(supplier_id, kind, stored, upload.content_type, delete_old_local=delete_old_local)
 
+
+def _set_supplier_doc(supplier_id: int, kind: str, stored, content_type, *, delete_old_local=False):
     # 2) upsert the DB row
     doc = SupplierDocument.query.filter_by(supplier_id=supplier_id, kind=kind).first()
     old_key = doc.key if doc else None
@@ -30,26 +49,112 @@ def upsert_supplier_doc(supplier_id: int, kind: str, file_storage, *, delete_old
         doc = SupplierDocument(
             supplier_id=supplier_id,
             kind=kind,
-            key=key,
-            content_type=file_storage.mimetype,
-            size_bytes=getattr(file_storage, "content_length", None),
+            key=stored.key,
+            content_type=content_type,
+            size_bytes=stored.size_bytes,
+            checksum=stored.checksum,
         )
         db.session.add(doc)
     else:
-        doc.key = key
-        doc.content_type = file_storage.mimetype
-        doc.size_bytes = getattr(file_storage, "content_length", None)
-
-    # 3) optional: delete old local file to avoid orphans (dev only)
-    if delete_old_local and old_key and old_key != key:
+        doc.key = stored.key
+        doc.content_type = content_type
+        doc.size_bytes = stored.size_bytes
+        doc.checksum = stored.checksum
+
+    # 3) optional: delete old local file to avoid orphans (dev only);
+    #    content-addressed blobs may be shared and are released via ref_count instead
+    if delete_old_local and old_key and old_key != stored.key and not is_blob_key(old_key):
         try:
             key_to_local_path(old_key).unlink(missing_ok=True)
-        except Exception:
-            pass
+        except OSError as e:
+            # left for `flask dashboard gc-uploads`
+            current_app.logger.warning("could not remove replaced upload %s: %s", old_key, e)
 
     return doc
 
 
+def add_product_image(product, file_storage):
+    """Store an uploaded product image and queue its variants. Caller commits, then enqueue_variants."""
+    if not (file_storage and file_storage.filename):
+        return None
+    stored = store_upload(file_storage, product_media_key(product.supplier_id, product.id, file_storage.filename))
+    image = ProductImage(product_id=product.id, path=stored.key, checksum=stored.checksum,
+                         sort_order=0, variants_status="pending")
+    db.session.add(image)
+    db.session.flush()
+    return image
+
+
+def _own_upload(upload_id):
+    if current_user.role != "supplier":
+        abort(403)
+    upload = db.session.get(UploadSession, upload_id)
+    if upload is None or upload.user_id != current_user.id:
+        abort(404)
+    return upload
+
+
+@dashboard.route("/uploads", methods=["POST"])
+@login_required
+def upload_start():
+    """
+    Begin a resumable upload. JSON: {"kind", "filename", "size", "sha256", "content_type"}.
+    Then PATCH /uploads/<id> with raw chunks and an Upload-Offset header; the
+    last one returns the storage key to submit with the form.
+    """
+    if current_user.role != "supplier":
+        abort(403)
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return jsonify(error="expected a JSON object"), 400
+    kind = payload.get("kind")
+    if kind not in SUPPLIER_DOC_KINDS:
+        return jsonify(error="unknown document kind"), 400
+    filename = payload.get("filename")
+    try:
+        upload = start_upload(current_user.id, filename, payload.get("size"),
+                              payload.get("sha256"), payload.get("content_type"),
+                              supplier_doc_key(current_user.supplier.id, kind,
+                                               filename if isinstance(filename, str) else ""))
+    except UploadError as e:
+        return jsonify(error=str(e)), e.status
+    return jsonify(upload_state(upload)), 201
+
+
+@dashboard.route("/uploads/<upload_id>", methods=["GET"])
+@login_required
+def upload_status(upload_id):
+    """Where to resume from."""
+    return jsonify(upload_state(_own_upload(upload_id)))
+
+
+@dashboard.route("/uploads/<upload_id>", methods=["PATCH"])
+@login_required
+def upload_chunk(upload_id):
+    upload = _own_upload(upload_id)
+    offset = request.headers.get("Upload-Offset", type=int)
+    if offset is None:
+        return jsonify(error="Upload-Offset header required"), 400
+    try:
+        # raw body straight from the socket: no form parsing, nothing buffered
+        append_chunk(upload, offset, request.stream)
+    except UploadError as e:
+        return jsonify(error=str(e), **upload_state(upload)), e.status
+    return jsonify(upload_state(upload))
+
+
+@dashboard.route("/documents/<int:doc_id>")
+@login_required
+def supplier_document(doc_id):
+    """A verification document, for its supplier and the admins who review it."""
+    doc = SupplierDocument.query.get_or_404(doc_id)
+    if not can_view_supplier_documents(current_user, doc.supplier):
+        abort(404)   # don't confirm the document exists
+    ext = os.path.splitext(doc.key)[1] or (mimetypes.guess_extension(doc.content_type or "") or "")
+    return serve_upload(doc.key, mimetype=doc.content_type, checksum=doc.checksum,
+                        download_name=f"{doc.kind}{ext}", private=True)
+
+
 @dashboard.route('/')
 @login_required
 def user_dashboard():
@@ -199,7 +304,15 @@ def supplier_verification():
         }
 
         for kind, f in files.items():
-            if f and f.filename:
+            # keys of files already sent through /dashboard/uploads take precedence
+            uploaded_key = getattr(supplier_verification_form, f"{kind}_upload").data
+            if uploaded_key:
+                upload = claim_upload(current_user.id, uploaded_key)
+                if upload is None:
+                    flash(f"The {kind.replace('_', ' ')} upload was not found; please attach it again.", "warning")
+                    continue
+                attach_uploaded_doc(supplier.id, kind, upload, delete_old_local=True)
+            elif f and f.filename:
                 upsert_supplier_doc(supplier.id, kind, f, delete_old_local=True)
 
         db.session.commit()
@@ -221,29 +334,25 @@ from flask_login import login_required, current_user
 from . import dashboard
 from ..extensions import db
 from ..models import Product, ProductStatus
-from .forms import AddProductForm
+from ..pagination import keyset_paginate, cached_count, forget_count
+from .forms import AddProductForm, ProductImportForm
+from .product_import import import_products, detect_format
+from .product_sync import (apply_stock_price_updates, request_fingerprint, replay, remember,
+                           IdempotencyConflict)
+from .product_actions import BULK_ACTIONS, bulk_product_action
+from app.security import supplier_api_required
+from flask import Response, stream_with_context, jsonify, g
 from werkzeug.utils import secure_filename
-import re, os
-
-def _slugify(text: str) -> str:
-    text = re.sub(r"[^a-zA-Z0-9\- ]+", "", text).strip().lower()
-    text = re.sub(r"\s+", "-", text)
-    text = re.sub(r"-+", "-", text)
-    return text[:220] or None
-
-def _unique_slug(base: str) -> str:
-    """Generate a unique slug for Product.slug."""
-    slug = base
-    if not slug:
-        slug = "product"
-    original = slug
-    i = 2
-    while Product.query.filter_by(slug=slug).first():
-        slug = f"{original}-{i}"
-        i += 1
-    return slug
+import json, os
 
 
+def _product_count_key(supplier_id: int, deleted: bool = False):
+    return ("dashboard.supplier_products", supplier_id, deleted)
+
+def _forget_product_counts(supplier_id: int):
+    forget_count(_product_count_key(supplier_id))
+    forget_count(_product_count_key(supplier_id, deleted=True))
+
 @dashboard.route("/supplier/products/add", methods=["GET", "POST"])
 @login_required
 def add_product():
@@ -274,13 +383,13 @@ def add_product():
             is_deleted=False,
         )
 
-        # slug
-        base_slug = _slugify(form.name.data)
-        product.slug = _unique_slug(base_slug)
-
-        # Upload to database
-        db.session.add(product)
+        # Upload to database (slug allocated + inserted under a savepoint, retried on a clash)
+        save_with_unique_slug(product, slugify(form.name.data))
+        image = add_product_image(product, form.main_image.data)
         db.session.commit()
+        forget_count(_product_count_key(product.supplier_id))
+        if image is not None:
+            enqueue_variants(image.id)   # resized off the request path; becomes the main image when ready
 
         # Optional: if Publish pressed, check requirements & mark LIVE
         if form.publish.data:
@@ -359,12 +468,112 @@ def add_product():
 def supplier_products():
     if current_user.role != "supplier":
         abort(403)
-    page = request.args.get("page", 1, type=int)
-    q = (Product.query
-         .filter_by(supplier_id=current_user.supplier.id, is_deleted=False)
-         .order_by(Product.created_at.desc()))
-    products = q.paginate(page=page, per_page=10, error_out=False)
-    return render_template("dashboard/supplier/products.html", products=products)
+    supplier_id = current_user.supplier.id
+    deleted = request.args.get("deleted") == "1"   # trash view, for restoring
+    q = Product.query.filter_by(supplier_id=supplier_id, is_deleted=deleted)
+    products = keyset_paginate(
+        q, [(Product.created_at, True), (Product.id, True)],
+        after=request.args.get("after"), before=request.args.get("before"), per_page=10,
+        total=cached_count(q, _product_count_key(supplier_id, deleted)),
+    )
+    return render_template("dashboard/supplier/products.html", products=products, deleted=deleted)
+
+@dashboard.route("/supplier/products/import", methods=["GET", "POST"])
+@login_required
+def supplier_products_import():
+    if current_user.role != "supplier":
+        abort(403)
+    form = ProductImportForm()
+    if form.validate_on_submit():
+        upload = form.file.data
+        supplier_id = current_user.supplier.id
+
+        def report():
+            # NDJSON: one line per rejected row, progress per chunk, a summary last.
+            # The status line is already sent, so failures have to end up in the body.
+            try:
+                for record in import_products(supplier_id, upload.stream, detect_format(upload.filename)):
+                    yield json.dumps(record) + "\n"
+            except Exception:
+                current_app.logger.exception("product import for supplier %s failed", supplier_id)
+                yield json.dumps({"done": False, "error": "import stopped by a server error"}) + "\n"
+            finally:
+                forget_count(_product_count_key(supplier_id))
+
+        return Response(stream_with_context(report()), mimetype="application/x-ndjson")
+    return render_template("dashboard/supplier/import_products.html", form=form)
+
+@dashboard.route("/supplier/products/sync", methods=["POST"])
+@supplier_api_required
+def supplier_products_sync():
+    """
+    JSON: {"items": [{"product_id": 12, "stock": 40, "price": "9.90"}, {"slug": "...", "stock": 0}, ...]}
+    Optional header Idempotency-Key makes retries safe. Auth: API token or supplier session.
+    """
+    payload = request.get_json(silent=True)
+    items = payload.get("items") if isinstance(payload, dict) else None
+    if not isinstance(items, list):
+        return jsonify(error="expected a JSON body with an \"items\" list"), 400
+    if len(items) > current_app.config.get("PRODUCT_SYNC_MAX_ITEMS", 5000):
+        return jsonify(error="too many items"), 413
+
+    key = (request.headers.get("Idempotency-Key") or "").strip()[:100]
+    fingerprint = request_fingerprint(payload)
+    try:
+        if key:
+            stored = replay(g.supplier_id, key, fingerprint)
+            if stored:
+                body, status = stored
+                return jsonify(body), status, {"Idempotent-Replayed": "true"}
+
+        results = apply_stock_price_updates(g.supplier_id, items)
+        counts = {}
+        for r in results:
+            counts[r["status"]] = counts.get(r["status"], 0) + 1
+        body = {"results": results, "counts": counts}
+
+        if key:
+            body, status = remember(g.supplier_id, key, fingerprint, body)
+        else:
+            db.session.commit()
+            status = 200
+    except IdempotencyConflict:
+        return jsonify(error="Idempotency-Key was already used for a different request"), 422
+    return jsonify(body), status
+
+@dashboard.route("/supplier/products/bulk", methods=["POST"])
+@login_required
+def supplier_products_bulk():
+    if current_user.role != "supplier":
+        abort(403)
+    action = request.form.get("action")
+    back = url_for("dashboard.supplier_products", after=request.form.get("after") or None,
+                   deleted=request.form.get("deleted") or None)
+    if action not in BULK_ACTIONS:
+        flash("Choose an action.", "warning")
+        return redirect(back)
+    try:
+        ids = [int(pid) for pid in request.form.getlist("product_ids")]
+    except ValueError:
+        abort(400)
+    if not ids:
+        flash("Select at least one product.", "warning")
+        return redirect(back)
+
+    supplier = current_user.supplier
+    changed, skipped = bulk_product_action(supplier.id, action, ids,
+                                           can_publish=supplier.status == SupplierStatus.APPROVED)
+    if action in ("delete", "restore") and changed:
+        _forget_product_counts(supplier.id)
+
+    if changed:
+        flash(f"{action.capitalize()}: {len(changed)} product(s) updated.", "success")
+    if skipped:
+        reasons = {}
+        for reason in skipped.values():
+            reasons[reason] = reasons.get(reason, 0) + 1
+        flash(f"{len(skipped)} skipped: " + ", ".join(f"{n} {r}" for r, n in reasons.items()), "warning")
+    return redirect(back)
 
 @dashboard.route("/supplier/products/<int:product_id>/toggle", methods=["POST"])
 @login_required
@@ -390,7 +599,7 @@ def supplier_product_toggle(product_id):
             flash("Product published.", "success")
 
     db.session.commit()
-    return redirect(url_for("dashboard.supplier_products", page=request.args.get("page", 1)))
+    return redirect(url_for("dashboard.supplier_products", after=request.args.get("after")))
 
 @dashboard.route("/supplier/products/<int:product_id>/delete", methods=["POST"])
 @login_required
@@ -402,8 +611,9 @@ def supplier_product_delete(product_id):
                                 is_deleted=False).first_or_404()
     p.is_deleted = True
     db.session.commit()
+    _forget_product_counts(p.supplier_id)
     flash("Product deleted.", "success")
-    return redirect(url_for("dashboard.supplier_products", page=request.args.get("page", 1)))
+    return redirect(url_for("dashboard.supplier_products", after=request.args.get("after")))
 
 
 
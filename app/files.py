@@ -0,0 +1,86 @@
+# app/files.py
+"""
+Serving stored uploads (instance/uploads, see storage_local.key_to_local_path).
+
+Views decide who may see a file; serve_upload only moves the bytes. It
+uses werkzeug's send_file, which streams through the server's
+wsgi.file_wrapper (sendfile under gunicorn) and answers Range, If-Range and
+If-None-Match. ETags are strong: the sha256 for content-addressed blobs, the
+uuid for one-off keys. Content under either kind of key never changes, so
+those responses are cacheable for a year and marked immutable.
+
+UPLOAD_SERVE picks who sends the bytes:
+  "app"        -- this process
+  "x-accel"    -- nginx: an empty response with X-Accel-Redirect to
+                  UPLOAD_ACCEL_PREFIX + key (an `internal` location aliased
+                  to instance/uploads)
+  "x-sendfile" -- Apache / lighttpd: X-Sendfile with the absolute path
+"""
+import mimetypes
+import posixpath
+from urllib.parse import quote
+
+from flask import abort, current_app, request
+from werkzeug.utils import send_file
+
+from storage_keys import is_blob_key
+from storage_local import key_to_local_path
+
+YEAR = 365 * 24 * 3600
+# anything else is sent as an attachment, so an uploaded .html can't run on our origin
+INLINE_TYPES = {"application/pdf", "image/jpeg", "image/png", "image/webp", "image/gif"}
+
+
+def strong_etag(key: str, checksum: str = None):
+    """The content's identity if the key implies one, else None (fall back to mtime/size)."""
+    if checksum:
+        return checksum
+    name = posixpath.basename(key)
+    if is_blob_key(key) or key.startswith("suppliers/"):
+        return posixpath.splitext(name)[0]   # digest or uuid4 hex
+    return None
+
+
+def serve_upload(key: str, *, mimetype: str = None, checksum: str = None, download_name: str = None,
+                 private: bool = True, max_age: int = None):
+    """
+    Response for the stored file at `key`. `private` files are only cached by
+    the browser. Without `max_age`, immutable keys get a year and others none.
+    """
+    path = key_to_local_path(key)
+    if not path.is_file():
+        abort(404)
+    mimetype = mimetype or mimetypes.guess_type(download_name or key)[0] or "application/octet-stream"
+    etag = strong_etag(key, checksum)
+    mode = current_app.config.get("UPLOAD_SERVE", "app")
+
+    if mode == "x-accel":
+        rv = current_app.response_class(mimetype=mimetype)
+        rv.headers["X-Accel-Redirect"] = current_app.config.get("UPLOAD_ACCEL_PREFIX", "/_uploads/") + quote(key)
+        if mimetype not in INLINE_TYPES:
+            rv.headers.set("Content-Disposition", "attachment",
+                           filename=download_name or posixpath.basename(key))
+        if etag:
+            rv.set_etag(etag)
+            rv = rv.make_conditional(request)   # 304 here; Range is left to the proxy
+    else:
+        rv = send_file(path, request.environ, mimetype=mimetype, download_name=download_name,
+                       as_attachment=mimetype not in INLINE_TYPES, conditional=True,
+                       etag=etag or True, use_x_sendfile=mode == "x-sendfile",
+                       response_class=current_app.response_class)
+        # werkzeug only says so on a 206; PDF viewers look for it on the first 200
+        rv.accept_ranges = "bytes"
+
+    if max_age is None:
+        max_age = YEAR if etag else 0
+    rv.cache_control.no_cache = None if max_age else True
+    rv.cache_control.max_age = max_age
+    rv.cache_control.public = None if private else True
+    rv.cache_control.private = True if private else None
+    if etag and max_age >= YEAR:
+        rv.cache_control.immutable = True
+    rv.expires = None
+    if private:
+        rv.vary.add("Cookie")
+    rv.headers["X-Content-Type-Options"] = "nosniff"
+    return rv
@@ -1,10 +1,13 @@
-from flask import render_template
+from flask import render_template, abort
 from app.models import Product, ProductStatus
+from app.files import serve_upload
+from app.page_cache import cached_page
 from . import main #this imports that main blueprint from __init__.py
 
 
 @main.route('/')
 @main.route('/home')
+@cached_page()
 def index():
     # Do some stuff
 
@@ -26,4 +29,13 @@ def index():
     {'slug':'coffee-tea','name':'Coffee & Tea','emoji':'☕'},
     ]
     featured_products = Product.query.filter_by(status=ProductStatus.LIVE).order_by(Product.created_at.desc()).limit(8).all()
-    return render_template('main/index.html', countries=countries, categories=categories, featured_products=featured_products)
\ No newline at end of file
+    return render_template('main/index.html', countries=countries, categories=categories, featured_products=featured_products)
+
+
+@main.route('/media/<path:key>')
+def media(key):
+    # resized product images only (app/media.py); originals and documents aren't public
+    # (variant keys are reused if the pipeline settings change, so no year-long immutable caching)
+    if not key.startswith("variants/") or ".." in key.split("/"):
+        abort(404)
+    return serve_upload(key, private=False, max_age=86400)
@@ -0,0 +1,195 @@
+# app/media.py
+"""
+Product image variants.
+
+An uploaded product image is stored as-is and queued: its ProductImage row
+starts out variants_status="pending". Off the request path, each original
+is decoded once and resized to fixed widths (VARIANTS), largest first, each
+step from the previous one. Every size is written as WebP and JPEG. For
+JPEG sources the decoder is asked to downscale while decoding (draft mode),
+so a 24 MP photo never gets fully decoded just to make a 1200px copy.
+
+Variant keys come from the source key (storage_keys.variant_key). A
+template can therefore build variant URLs from Product.main_image_path alone,
+and generating the same original twice rewrites the same files.
+main_image_path is filled in only once the variants exist, so every storage
+key it holds is safe to render that way. Small originals are never upscaled,
+so the srcset `w` descriptors come from the widths recorded in
+ProductImage.variants (one indexed lookup per key, then cached), and a
+variant no wider than the one below it is left out.
+
+Where the work runs (IMAGE_PIPELINE):
+  "thread" -- a small in-process pool, kicked right after the upload commits
+  "worker" -- nothing in-process; run `flask dashboard process-images --watch`
+Either way, anything still pending is picked up by the command.
+"""
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app, url_for
+from sqlalchemy import select
+
+from app.cache import TTLCache
+from app.extensions import db
+from app.models import Product, ProductImage
+from storage_keys import is_storage_key, variant_key
+from storage_local import key_to_local_path, save_image_local
+
+# (name, width in px), largest first: each is resized from the one before
+VARIANTS = (("detail", 1200), ("card", 400), ("thumb", 160))
+FORMATS = (("webp", "WEBP", {"quality": 80, "method": 4}),
+           ("jpeg", "JPEG", {"quality": 82, "optimize": True, "progressive": True}))
+# the `sizes` attribute per slot the image is shown in
+SIZES = {
+    "thumb": "64px",
+    "card": "(min-width: 992px) 25vw, (min-width: 576px) 50vw, 100vw",
+    "detail": "(min-width: 768px) 40vw, 100vw",
+}
+MAX_PIXELS = 50_000_000
+
+_executor = None
+# source key -> {variant name: real width}; a key's variants never change
+_widths = TTLCache(ttl=3600, maxsize=8192)
+
+
+class ImageRejected(Exception):
+    pass
+
+
+def _open(path):
+    """(decoded image, full-size (width, height) as displayed)."""
+    from PIL import Image, ImageOps   # optional dependency: only the pipeline needs it
+
+    Image.MAX_IMAGE_PIXELS = MAX_PIXELS
+    try:
+        im = Image.open(path)
+        width, height = im.size
+        if im.getexif().get(0x0112) in (5, 6, 7, 8):   # EXIF orientation: rotated by 90 degrees
+            width, height = height, width
+        # JPEG: decode at 1/2, 1/4 or 1/8 scale while staying at least as wide as the largest variant
+        im.draft("RGB", (VARIANTS[0][1], 1))
+        im = ImageOps.exif_transpose(im)
+        im.load()
+    except (OSError, Image.DecompressionBombError, SyntaxError, ValueError) as e:
+        raise ImageRejected(str(e) or "not an image")
+    # RGB or RGBA from here on: palette / CMYK / 16-bit modes can't be resampled or saved as WebP
+    has_alpha = im.mode in ("RGBA", "LA", "PA") or (im.mode == "P" and "transparency" in im.info)
+    return im.convert("RGBA" if has_alpha else "RGB"), (width, height)
+
+
+def _flatten(im):
+    """JPEG has no alpha: composite onto white."""
+    from PIL import Image
+
+    if im.mode != "RGBA":
+        return im
+    background = Image.new("RGB", im.size, (255, 255, 255))
+    background.paste(im, mask=im.getchannel("A"))
+    return background
+
+
+def generate_variants(source_key: str) -> dict:
+    """Write every variant of `source_key`; returns the `variants` mapping to record."""
+    from PIL import Image
+
+    im, original_size = _open(key_to_local_path(source_key))
+    variants = {}
+    for name, width in VARIANTS:
+        if im.width > width:   # never upscale: small originals keep their size
+            im = im.resize((width, max(1, round(im.height * width / im.width))), Image.LANCZOS)
+        flat = _flatten(im)
+        entry = {"width": im.width, "height": im.height}
+        for ext, fmt, options in FORMATS:
+            key = variant_key(source_key, name, ext)
+            save_image_local(im if ext == "webp" else flat, key, fmt, **options)
+            entry[ext] = key
+        variants[name] = entry
+    return {"size": original_size, "variants": variants}
+
+
+def process_image(image_id: int) -> str:
+    """Generate variants for one ProductImage and record them. Returns the new status."""
+    image = db.session.get(ProductImage, image_id)
+    if image is None or image.variants_status != "pending":
+        return image.variants_status if image else "missing"
+    try:
+        result = generate_variants(image.path)
+    except ImageRejected as e:
+        current_app.logger.warning("product image %s rejected: %s", image_id, e)
+        image.variants_status = "failed"
+        db.session.commit()
+        return image.variants_status
+
+    image.width, image.height = result["size"]
+    image.variants = json.dumps(result["variants"], separators=(",", ":"))
+    image.variants_status = "ready"
+    # the first ready image becomes the product's main image
+    product = db.session.get(Product, image.product_id)
+    if product is not None and not product.main_image_path:
+        product.main_image_path = image.path
+    db.session.commit()
+    return image.variants_status
+
+
+def pending_image_ids(after_id: int = 0, limit: int = 100) -> list:
+    return db.session.execute(
+        select(ProductImage.id)
+        .where(ProductImage.variants_status == "pending", ProductImage.id > after_id)
+        .order_by(ProductImage.id).limit(limit)
+    ).scalars().all()
+
+
+def _run(app, image_id):
+    with app.app_context():
+        try:
+            process_image(image_id)
+        except Exception:
+            # stays pending; the process-images command will retry it
+            app.logger.exception("variant generation failed for product image %s", image_id)
+            db.session.rollback()
+
+
+def enqueue_variants(image_id: int):
+    """Call after the ProductImage row is committed."""
+    global _executor
+    if current_app.config.get("IMAGE_PIPELINE", "thread") != "thread":
+        return
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=current_app.config.get("IMAGE_PIPELINE_WORKERS", 2),
+                                       thread_name_prefix="image-variants")
+    _executor.submit(_run, current_app._get_current_object(), image_id)
+
+
+# --- templates -----------------------------------------------------------------
+
+def image_url(path: str, variant: str = "card", ext: str = "jpeg") -> str:
+    if not is_storage_key(path):
+        return url_for("static", filename="uploads/products/" + path)
+    return url_for("main.media", key=variant_key(path, variant, ext))
+
+
+def variant_widths(path: str) -> dict:
+    """{variant name: width in px} as generated for `path`; {} if nothing is recorded."""
+    widths = _widths.get(path)
+    if widths is None:
+        rows = db.session.execute(
+            select(ProductImage.variants_status, ProductImage.variants).where(ProductImage.path == path)
+        ).all()
+        raw = next((variants for status, variants in rows if status == "ready" and variants), None)
+        recorded = json.loads(raw) if raw else {}
+        widths = {name: recorded[name]["width"] for name, _width in VARIANTS if name in recorded}
+        _widths.set(path, widths, ttl=None if widths else 60)   # not ready yet: look again soon
+    return widths
+
+
+def image_srcset(path: str, ext: str = "jpeg") -> str:
+    """srcset over the real variant widths; the browser picks the smallest that fits `sizes`."""
+    widths = variant_widths(path)
+    candidates, widest = [], 0
+    for name, nominal in reversed(VARIANTS):
+        width = widths.get(name, nominal)
+        if width <= widest:   # not upscaled: same pixels as the smaller variant
+            continue
+        candidates.append(f"{image_url(path, name, ext)} {width}w")
+        widest = width
+    return ", ".join(candidates)
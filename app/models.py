@@ -10,6 +10,10 @@ class User(UserMixin, db.Model):
     email = db.Column(db.String(120), unique=True, nullable=False)
     password_hash = db.Column(db.String(128), nullable=False)
     role = db.Column(db.String(20), nullable=False)  # 'customer' or 'supplier' or 'admin'
+    created_at = db.Column(db.DateTime, default=db.func.current_timestamp())  # NULL for accounts older than the column
+
+    # case-insensitive exact lookups (admin supplier search, app/admin/supplier_search.py)
+    __table_args__ = (db.Index("ix_user_email_lower", db.func.lower(email)),)
 
     def set_password(self, password):
         self.password_hash = generate_password_hash(password)
@@ -145,6 +149,12 @@ class Supplier(db.Model):
     user = db.relationship('User', backref=db.backref('supplier', uselist=False))
     reviewer = db.relationship('Admin', backref=db.backref('reviewed_suppliers', lazy=True))
 
+    # verification queue (app/admin/verification.py): filter + newest-first sort, overall and per country
+    __table_args__ = (
+        db.Index("ix_supplier_queue", "status", "submitted_at", "id"),
+        db.Index("ix_supplier_country_queue", "reg_country", "status", "submitted_at", "id"),
+    )
+
     # Test if supplier can list products -- i.e. if Status = APPROVED
     @property
     def can_list_products(self) -> bool:
@@ -164,6 +174,7 @@ class SupplierDocument(db.Model):
     key = db.Column(db.String(512), nullable=False)  # e.g. "suppliers/42/documents/registration_cert/uuid.pdf"
     content_type = db.Column(db.String(100))
     size_bytes = db.Column(db.Integer)
+    checksum = db.Column(db.String(64))  # sha256 hex; set when stored content-addressed (upload_blob.digest)
 
     created_at = db.Column(db.DateTime, server_default=db.func.now())
 
@@ -178,6 +189,34 @@ class SupplierDocument(db.Model):
     )
 
 
+# A resumable upload (app/chunked_uploads.py). Bytes go to a .part file next
+# to `key`, whose length is the resume offset, and are renamed to `key` once
+# the sha256 matches.
+class UploadSession(db.Model):
+    __tablename__ = "upload_session"
+
+    id = db.Column(db.String(32), primary_key=True)   # uuid4 hex, the client's handle
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id", ondelete="CASCADE"), nullable=False, index=True)
+    key = db.Column(db.String(512), nullable=False)   # where the file ends up
+    filename = db.Column(db.String(255))
+    content_type = db.Column(db.String(100))
+    size_bytes = db.Column(db.Integer, nullable=False)
+    checksum = db.Column(db.String(64), nullable=False)  # sha256 hex the client declared
+    created_at = db.Column(db.DateTime, server_default=db.func.now(), index=True)
+    completed_at = db.Column(db.DateTime)
+
+
+# One stored file per distinct content (app/uploads.py). ref_count is kept by
+# triggers on the tables that point at blobs; 0 means nothing uses it any more.
+class UploadBlob(db.Model):
+    __tablename__ = "upload_blob"
+
+    digest = db.Column(db.String(64), primary_key=True)  # sha256 hex, also the storage key
+    size_bytes = db.Column(db.Integer, nullable=False)
+    ref_count = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, server_default=db.func.now())
+
+
 
 
 # Product-related models
@@ -230,16 +269,162 @@ class Product(db.Model):
     # Relationships
     supplier = db.relationship("Supplier", backref=db.backref("products", lazy="dynamic"))
 
+    __table_args__ = (
+        # delta feed order, see app/catalog/export.py
+        db.Index("ix_product_updated", "updated_at", "id"),
+    )
+
 class ProductImage(db.Model):
     __tablename__ = "product_image"
 
     id = db.Column(db.Integer, primary_key=True)
     product_id = db.Column(db.Integer, db.ForeignKey("product.id"), nullable=False)
-    path = db.Column(db.String(255), nullable=False)     # e.g. "uploads/products/xyz.jpg"
+    path = db.Column(db.String(255), nullable=False, index=True)   # storage key (older rows: "uploads/products/xyz.jpg")
     alt_text = db.Column(db.String(200))
     sort_order = db.Column(db.Integer, default=0)
+    checksum = db.Column(db.String(64))                  # sha256 hex when content-addressed (upload_blob.digest)
+
+    # resized copies, written off the request path (app/media.py)
+    width = db.Column(db.Integer)
+    height = db.Column(db.Integer)
+    variants = db.Column(db.Text)   # JSON: {"card": {"width": 400, "height": 300, "webp": key, "jpeg": key}, ...}
+    variants_status = db.Column(db.String(10), nullable=False, default="pending", server_default="pending", index=True)  # pending / ready / failed
 
     product = db.relationship("Product", backref=db.backref(
         "images", cascade="all, delete-orphan", order_by="ProductImage.sort_order"
     ))
 
+
+
+# Read model for the public catalog -- one row per buyable product
+# (LIVE, not deleted, supplier APPROVED). Maintained by SQLite triggers,
+# see app/catalog/listing.py. Never write to it from application code.
+class CatalogListing(db.Model):
+    __tablename__ = "catalog_listing"
+
+    product_id = db.Column(db.Integer, db.ForeignKey("product.id", ondelete="CASCADE"), primary_key=True)
+    supplier_id = db.Column(db.Integer, nullable=False, index=True)
+
+    name = db.Column(db.String(200), nullable=False)
+    short_desc = db.Column(db.String(300))
+    slug = db.Column(db.String(220))
+    category = db.Column(db.String(120))
+    subcategory = db.Column(db.String(120))
+    country_of_origin = db.Column(db.String(2))
+    # product origin, else supplier country_code, else supplier reg_country
+    effective_country = db.Column(db.String(2))
+
+    price = db.Column(db.Numeric(10, 2), nullable=False)
+    currency = db.Column(db.String(3))
+    moq = db.Column(db.Integer)
+    stock = db.Column(db.Integer)
+    incoterms = db.Column(db.String(20))
+    main_image_path = db.Column(db.String(255))
+
+    created_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime)
+
+    # denormalized supplier fields
+    supplier_name = db.Column(db.String(255))
+    supplier_country_code = db.Column(db.String(2))
+
+    # templates link with p.id, same as for Product
+    id = db.synonym("product_id")
+
+    __table_args__ = (
+        # one index per public sort, with and without the country/category prefix
+        db.Index("ix_listing_created", "created_at", "product_id"),
+        db.Index("ix_listing_price", "price", "product_id"),
+        db.Index("ix_listing_name", "name", "product_id"),
+        db.Index("ix_listing_country_created", "effective_country", "created_at", "product_id"),
+        db.Index("ix_listing_country_price", "effective_country", "price", "product_id"),
+        db.Index("ix_listing_country_category_created", "effective_country", "category", "created_at", "product_id"),
+        db.Index("ix_listing_category_created", "category", "created_at", "product_id"),
+        db.Index("ix_listing_subcategory_created", "subcategory", "created_at", "product_id"),
+    )
+
+
+# Facet counts per combination of facet values, kept by triggers on
+# catalog_listing (app/catalog/facets.py). NULL facet values are stored as ''.
+class CatalogFacetRollup(db.Model):
+    __tablename__ = "catalog_facet_rollup"
+
+    effective_country = db.Column(db.String(2), primary_key=True)
+    category = db.Column(db.String(120), primary_key=True)
+    subcategory = db.Column(db.String(120), primary_key=True)
+    price_band = db.Column(db.String(20), primary_key=True)
+    incoterms = db.Column(db.String(20), primary_key=True)
+    moq_band = db.Column(db.String(20), primary_key=True)
+
+    n = db.Column(db.Integer, nullable=False, default=0)
+
+
+# Precomputed content of the /catalog/c/<cc> landing page (app/catalog/snapshots.py).
+# Triggers on catalog_listing bump `version` and set `is_stale` when anything
+# in that country changes; the next visit rebuilds just that country.
+class CountrySnapshot(db.Model):
+    __tablename__ = "country_snapshot"
+
+    country_code = db.Column(db.String(2), primary_key=True)
+    payload = db.Column(db.Text, nullable=False)          # JSON
+    version = db.Column(db.Integer, nullable=False, default=0)
+    is_stale = db.Column(db.Boolean, nullable=False, default=False)
+    built_at = db.Column(db.DateTime, server_default=db.func.now())
+
+
+# Admin dashboard counters, kept by triggers on supplier, product and user
+# (app/admin/metrics.py). `day` is '' for counts of current state.
+class AdminMetric(db.Model):
+    __tablename__ = "admin_metric"
+
+    metric = db.Column(db.String(30), primary_key=True)
+    dim1 = db.Column(db.String(120), primary_key=True)
+    dim2 = db.Column(db.String(120), primary_key=True)
+    day = db.Column(db.String(10), primary_key=True)   # YYYY-MM-DD
+    n = db.Column(db.Integer, nullable=False, default=0)
+
+
+# Monotonic counters bumped by triggers; the page cache (app/page_cache.py)
+# keys anonymous pages on the "catalog" counter.
+class ContentVersion(db.Model):
+    __tablename__ = "content_version"
+
+    name = db.Column(db.String(40), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+
+# Server-side cart (app/cart/store.py). The session cookie only carries `id`.
+class Cart(db.Model):
+    __tablename__ = "cart"
+
+    id = db.Column(db.String(32), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete="CASCADE"), unique=True, nullable=True)
+    items = db.Column(db.Text, nullable=False, default="{}")   # compact JSON {"<product_id>": qty}
+    updated_at = db.Column(db.DateTime, server_default=db.func.now(), onupdate=db.func.now(), index=True)
+
+
+# Bearer tokens for supplier integrations (ERP stock/price sync). Only the
+# SHA-256 of the token is stored; the token itself is shown once on creation.
+class ApiToken(db.Model):
+    __tablename__ = "api_token"
+
+    id = db.Column(db.Integer, primary_key=True)
+    supplier_id = db.Column(db.Integer, db.ForeignKey("supplier.id", ondelete="CASCADE"), nullable=False, index=True)
+    token_hash = db.Column(db.String(64), unique=True, nullable=False)
+    label = db.Column(db.String(100))
+    created_at = db.Column(db.DateTime, server_default=db.func.now())
+    last_used_at = db.Column(db.DateTime)
+
+    supplier = db.relationship("Supplier", backref=db.backref("api_tokens", lazy="dynamic"))
+
+
+# Responses of idempotent API calls, replayed when a client retries with the same key.
+class IdempotencyKey(db.Model):
+    __tablename__ = "idempotency_key"
+
+    supplier_id = db.Column(db.Integer, db.ForeignKey("supplier.id", ondelete="CASCADE"), primary_key=True)
+    key = db.Column(db.String(100), primary_key=True)
+    request_hash = db.Column(db.String(64), nullable=False)
+    response = db.Column(db.Text, nullable=False)   # JSON body
+    status_code = db.Column(db.Integer, nullable=False, default=200)
+    created_at = db.Column(db.DateTime, server_default=db.func.now(), index=True)
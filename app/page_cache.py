@@ -0,0 +1,174 @@
+# app/page_cache.py
+"""
+Full-page cache for the public catalog pages (home, country, country category,
+product detail).
+
+Anonymous visitors with an empty cart all get the same HTML, so it is rendered
+once per (URL, content version) and kept in memory. Logged-in users, anyone
+with something in their cart and responses carrying flash messages skip the
+cache entirely.
+
+Versions:
+
+* most pages use the "catalog" counter in content_version, bumped by triggers
+  on every product write and every supplier status / name change;
+* a product page uses that product's updated_at plus its supplier's status,
+  so stock syncs on other products don't evict it.
+
+Every cached response gets a strong ETag and `Cache-Control: no-cache`, so the
+browser revalidates each time and gets a 304 while nothing changed.
+
+The add-to-cart form carries a per-session CSRF token: the stored body holds
+a placeholder that is filled in per request, and the ETag also covers the
+session's token and the half-lifetime window it was signed in, so a 304 never
+hands back a page whose token is about to expire.
+"""
+import hashlib
+import time
+from datetime import datetime, timedelta
+from functools import wraps
+
+from flask import current_app, g, make_response, request, session
+from flask_login import current_user
+from flask_wtf.csrf import generate_csrf
+from sqlalchemy import event, select, text
+
+from app.cache import TTLCache
+from app.cart.cart_utils import cart_count
+from app.extensions import db
+from app.models import ContentVersion, Product, Supplier
+from app.sqlite_utils import is_sqlite
+
+CSRF_PLACEHOLDER = "__page_cache_csrf_token__"
+
+CONTENT_VERSION_DDL = (
+    """
+    CREATE TRIGGER IF NOT EXISTS content_version_product_ai AFTER INSERT ON product
+    BEGIN
+        INSERT INTO content_version (name, version) VALUES ('catalog', 1)
+        ON CONFLICT (name) DO UPDATE SET version = version + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS content_version_product_au AFTER UPDATE ON product
+    BEGIN
+        INSERT INTO content_version (name, version) VALUES ('catalog', 1)
+        ON CONFLICT (name) DO UPDATE SET version = version + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS content_version_product_ad AFTER DELETE ON product
+    BEGIN
+        INSERT INTO content_version (name, version) VALUES ('catalog', 1)
+        ON CONFLICT (name) DO UPDATE SET version = version + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS content_version_supplier_au
+    AFTER UPDATE OF status, business_name ON supplier
+    BEGIN
+        INSERT INTO content_version (name, version) VALUES ('catalog', 1)
+        ON CONFLICT (name) DO UPDATE SET version = version + 1;
+    END
+    """,
+)
+
+_pages = TTLCache(ttl=300, maxsize=2048)
+
+
+@event.listens_for(db.metadata, "after_create")
+def install_content_version_triggers(target, connection, **kw):
+    if not is_sqlite(connection):
+        return
+    for ddl in CONTENT_VERSION_DDL:
+        connection.execute(text(ddl))
+
+
+def is_cacheable_request() -> bool:
+    if request.method not in ("GET", "HEAD"):
+        return False
+    if current_user.is_authenticated:
+        return False
+    if session.get("_flashes"):
+        return False
+    return not cart_count()
+
+
+def catalog_version(*args, **kwargs):
+    return db.session.execute(
+        select(ContentVersion.version).where(ContentVersion.name == "catalog")
+    ).scalar() or 0
+
+
+def product_version(product_id, **kwargs):
+    """(updated_at, supplier status, supplier name) for one product, or None to skip caching."""
+    row = db.session.execute(
+        select(Product.updated_at, Supplier.status, Supplier.business_name)
+        .join(Supplier, Supplier.id == Product.supplier_id)
+        .where(Product.id == product_id)
+    ).first()
+    if row is None or row.updated_at is None:
+        return None
+    # updated_at has one-second resolution: a second write in the same second
+    # would leave the version unchanged, so don't cache until it has settled
+    if row.updated_at >= datetime.utcnow().replace(microsecond=0) - timedelta(seconds=1):
+        return None
+    return (row.updated_at.isoformat(), row.status.name, row.business_name)
+
+
+def _csrf_window() -> int:
+    limit = current_app.config.get("WTF_CSRF_TIME_LIMIT", 3600)
+    return int(time.time() // (limit / 2)) if limit else 0
+
+
+def _store(key, response):
+    body = response.get_data(as_text=True)
+    token = g.get(current_app.config.get("WTF_CSRF_FIELD_NAME", "csrf_token"))
+    if token:
+        body = body.replace(token, CSRF_PLACEHOLDER)
+    entry = (body, response.mimetype, hashlib.sha1(body.encode()).hexdigest())
+    _pages.set(key, entry, ttl=current_app.config.get("PAGE_CACHE_SECONDS", 300))
+    return entry
+
+
+def _serve(entry):
+    body, mimetype, etag = entry
+    if CSRF_PLACEHOLDER in body:
+        token = generate_csrf()
+        raw = session.get(current_app.config.get("WTF_CSRF_FIELD_NAME", "csrf_token"), "")
+        etag += "-" + hashlib.sha1(f"{raw}:{_csrf_window()}".encode()).hexdigest()[:16]
+        body = body.replace(CSRF_PLACEHOLDER, token)
+
+    response = make_response(body)
+    response.mimetype = mimetype
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    response.vary.add("Cookie")
+    return response.make_conditional(request)
+
+
+def cached_page(version=catalog_version):
+    """
+    Serve the view from the page cache for anonymous, empty-cart visitors.
+    `version(**view_args)` returns the content version the page depends on,
+    or None to render this request without caching.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not current_app.config.get("PAGE_CACHE_ENABLED", True) or not is_cacheable_request():
+                return view(*args, **kwargs)
+            v = version(*args, **kwargs)
+            if v is None:
+                return view(*args, **kwargs)
+
+            key = (request.full_path, v)
+            entry = _pages.get(key)
+            if entry is None:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200 or response.direct_passthrough or session.get("_flashes"):
+                    return response
+                entry = _store(key, response)
+            return _serve(entry)
+        return wrapper
+    return decorator
@@ -0,0 +1,125 @@
+# app/pagination.py
+"""
+Keyset ("seek") pagination.
+
+Instead of OFFSET + COUNT(*) every page is fetched with
+`WHERE (sort_key, id) > (last_seen) ORDER BY sort_key, id LIMIT n`, so page 500
+costs the same as page 1. Positions travel as opaque `after=` / `before=`
+tokens; totals come from a short-lived per-process cache.
+"""
+import base64
+import binascii
+import json
+
+from sqlalchemy import and_, or_, type_coerce
+from sqlalchemy.types import NullType
+
+from app.cache import TTLCache
+
+COUNT_TTL_SECONDS = 60
+
+_count_cache = TTLCache(ttl=COUNT_TTL_SECONDS, maxsize=4096)
+
+
+def encode_cursor(values) -> str:
+    raw = json.dumps(list(values), separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+_CURSOR_SCALARS = (str, int, float, type(None))
+
+
+def decode_cursor(token, length: int = None):
+    """
+    Returns the list of key values, or None for a missing/garbled token --
+    including one that isn't a flat list of `length` scalars, since the
+    values are bound straight into the seek filter.
+    """
+    if not token:
+        return None
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, binascii.Error, UnicodeError):
+        return None
+    if not isinstance(values, list) or not all(isinstance(v, _CURSOR_SCALARS) for v in values):
+        return None
+    if length is not None and len(values) != length:
+        return None
+    return values
+
+
+class KeysetPage:
+    """Quacks enough like Flask-SQLAlchemy's Pagination for our templates."""
+
+    def __init__(self, items, per_page, next_cursor=None, prev_cursor=None, total=None):
+        self.items = items
+        self.per_page = per_page
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+        self.total = total          # cached, may lag behind by COUNT_TTL_SECONDS
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self) -> bool:
+        return self.prev_cursor is not None
+
+    def __iter__(self):
+        return iter(self.items)
+
+
+def _seek_filter(keys, values, forward: bool):
+    """(k0, k1, ...) strictly past `values` in the direction of travel."""
+    clauses = []
+    for i, (expr, descending) in enumerate(keys):
+        go_lower = descending == forward
+        step = expr < values[i] if go_lower else expr > values[i]
+        clauses.append(and_(*[keys[j][0] == values[j] for j in range(i)], step))
+    return or_(*clauses)
+
+
+def keyset_paginate(query, keys, after=None, before=None, per_page=20, total=None):
+    """
+    Page through `query` ordered by `keys`, a list of (column_or_expression, descending)
+    pairs whose last entry must be unique (normally the primary key).
+
+    Any ORDER BY already on `query` is replaced. Returns a KeysetPage.
+    """
+    # compare raw stored values: sqlite keeps server-default timestamps without
+    # microseconds, so binding a datetime would never be "equal" to them
+    keys = [(type_coerce(expr, NullType()), descending) for expr, descending in keys]
+
+    values = decode_cursor(before, len(keys)) or decode_cursor(after, len(keys))
+    forward = not (before and values is not None)
+
+    q = query.add_columns(*[expr.label(f"_seek_{i}") for i, (expr, _) in enumerate(keys)])
+    if values is not None:
+        q = q.filter(_seek_filter(keys, values, forward))
+    ordering = [expr.desc() if descending == forward else expr.asc() for expr, descending in keys]
+    rows = q.order_by(None).order_by(*ordering).limit(per_page + 1).all()
+
+    more = len(rows) > per_page
+    rows = rows[:per_page]
+    if not forward:
+        rows.reverse()
+
+    if forward:
+        has_next, has_prev = more, values is not None
+    else:
+        has_next, has_prev = True, more
+
+    next_cursor = encode_cursor(rows[-1][1:]) if rows and has_next else None
+    prev_cursor = encode_cursor(rows[0][1:]) if rows and has_prev else None
+    return KeysetPage([row[0] for row in rows], per_page, next_cursor, prev_cursor, total)
+
+
+def cached_count(query, cache_key, ttl: float = None) -> int:
+    """COUNT(*) of `query`, remembered per process for `ttl` seconds under `cache_key`."""
+    return _count_cache.get_or_set(cache_key, lambda: query.order_by(None).count(), ttl)
+
+
+def forget_count(cache_key):
+    _count_cache.pop(cache_key)
@@ -0,0 +1,101 @@
+# app/principal.py
+"""
+Cached identity for flask-login's user_loader.
+
+A logged-in request used to cost one query for the user plus one per role
+profile touched (current_user.customer / .supplier / .admin). Now the user and
+all three profiles come back from one joined query, and a plain-value copy is
+kept per worker for PRINCIPAL_TTL_SECONDS.
+
+The copy is tagged with the "principals" counter in content_version. Triggers
+bump it on any write to user, customer, supplier or admin, so a role change,
+supplier approval or admin re-scoping made by any worker invalidates every
+cached principal. A cached request costs that one primary-key lookup; the
+objects are rebuilt and merged into the session without SQL.
+"""
+from flask import current_app
+from sqlalchemy import event, select, text
+from sqlalchemy.orm import joinedload, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.cache import TTLCache
+from app.extensions import db
+from app.models import Admin, ContentVersion, Customer, Supplier, User
+from app.sqlite_utils import is_sqlite
+
+PROFILES = (("customer", Customer), ("supplier", Supplier), ("admin", Admin))
+
+PRINCIPAL_TABLES = ("user", "customer", "supplier", "admin")
+
+PRINCIPAL_VERSION_DDL = tuple(
+    f"""
+    CREATE TRIGGER IF NOT EXISTS content_version_{table}_principal_{suffix} AFTER {action} ON "{table}"
+    BEGIN
+        INSERT INTO content_version (name, version) VALUES ('principals', 1)
+        ON CONFLICT (name) DO UPDATE SET version = version + 1;
+    END
+    """
+    for table in PRINCIPAL_TABLES
+    for suffix, action in (("ai", "INSERT"), ("au", "UPDATE"), ("ad", "DELETE"))
+)
+
+_principals = TTLCache(ttl=60, maxsize=4096)
+
+
+@event.listens_for(db.metadata, "after_create")
+def install_principal_triggers(target, connection, **kw):
+    if not is_sqlite(connection):
+        return
+    for ddl in PRINCIPAL_VERSION_DDL:
+        connection.execute(text(ddl))
+
+
+def _columns(obj) -> dict:
+    return {attr.key: getattr(obj, attr.key) for attr in db.inspect(obj).mapper.column_attrs}
+
+
+def _snapshot(user) -> dict:
+    return {
+        "user": _columns(user),
+        **{rel: (_columns(getattr(user, rel)) if getattr(user, rel) is not None else None)
+           for rel, _model in PROFILES},
+    }
+
+
+def _detached(model, values):
+    obj = model(**values)
+    make_transient_to_detached(obj)
+    return obj
+
+
+def _rebuild(snapshot):
+    """Turn a snapshot back into a session-bound User with its profiles loaded, without SQL."""
+    user = _detached(User, snapshot["user"])
+    for rel, model in PROFILES:
+        values = snapshot[rel]
+        set_committed_value(user, rel, _detached(model, values) if values else None)
+    return db.session.merge(user, load=False)
+
+
+def principal_version() -> int:
+    return db.session.execute(
+        select(ContentVersion.version).where(ContentVersion.name == "principals")
+    ).scalar() or 0
+
+
+def load_principal(user_id: int):
+    version = principal_version()
+    cached = _principals.get(user_id)
+    if cached and cached[0] == version:
+        return _rebuild(cached[1])
+
+    user = (User.query
+            .options(*(joinedload(getattr(User, rel)) for rel, _model in PROFILES))
+            .filter(User.id == user_id)
+            .first())
+    if user is None:
+        _principals.pop(user_id)
+        return None
+    _principals.set(user_id, (version, _snapshot(user)),
+                    ttl=current_app.config.get("PRINCIPAL_TTL_SECONDS", 60))
+    return user
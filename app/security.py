@@ -1,7 +1,11 @@
+import hashlib
 from functools import wraps
-from flask import abort
+from flask import abort, g, jsonify, request
 from flask_login import current_user, login_required
 
+from app.extensions import db
+from app.models import ApiToken
+
 def role_required(*roles):
     """Usage: @role_required('absolute_admin', 'country_admin')"""
     allowed = set(roles)
@@ -17,3 +21,55 @@ def role_required(*roles):
         return decorated_function
 
     return decorator
+
+
+def _api_token_supplier_id():
+    """Supplier id for a valid `Authorization: Bearer <token>` header, else None."""
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token.strip():
+        return None
+    api_token = ApiToken.query.filter_by(
+        token_hash=hashlib.sha256(token.strip().encode()).hexdigest()).first()
+    if api_token is None:
+        return None
+    api_token.last_used_at = db.func.now()
+    return api_token.supplier_id
+
+
+def supplier_api_required(f):
+    """
+    JSON endpoints for suppliers: accepts an API token (Bearer) or a logged-in
+    supplier session, and puts the supplier's id in g.supplier_id.
+    Session callers must send JSON, which a cross-site form can't.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        supplier_id = _api_token_supplier_id()
+        if supplier_id is None and current_user.is_authenticated and current_user.role == "supplier" \
+                and current_user.supplier is not None and request.is_json:
+            supplier_id = current_user.supplier.id
+        if supplier_id is None:
+            return jsonify(error="authentication required"), 401
+        g.supplier_id = supplier_id
+        return f(*args, **kwargs)
+    return decorated_function
+
+
+def admin_country_scope(user):
+    """The country code a country admin is limited to; None for everyone else."""
+    if user.role == "admin" and user.admin is not None \
+            and user.admin.admin_type == "country" and user.admin.country_code:
+        return user.admin.country_code.upper()
+    return None
+
+
+def can_view_supplier_documents(user, supplier) -> bool:
+    """The supplier itself, global admins, and country admins for the supplier's country."""
+    if not user.is_authenticated:
+        return False
+    if user.role == "supplier":
+        return user.supplier is not None and user.supplier.id == supplier.id
+    if user.role != "admin" or user.admin is None:
+        return False
+    scope = admin_country_scope(user)
+    return scope is None or (supplier.reg_country or "").upper() == scope
@@ -0,0 +1,80 @@
+# app/sqlite_utils.py
+"""Small helpers for the SQLite-specific bits (FTS5, triggers, query budgets, pragmas)."""
+import os
+import time
+import weakref
+from contextlib import contextmanager
+
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+
+from app.extensions import db
+
+# how many SQLite VM instructions between deadline checks
+_PROGRESS_STEPS = 1000
+
+
+def is_sqlite(bind=None) -> bool:
+    bind = bind if bind is not None else db.engine
+    return bind.dialect.name == "sqlite"
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+@contextmanager
+def query_deadline(budget_ms):
+    """
+    Abort any statement on the session's connection that runs past `budget_ms`
+    and raise QueryBudgetExceeded instead. Only read queries should run inside
+    this -- an interrupted write rolls back the whole transaction.
+    No-op when the budget is falsy or the database isn't SQLite.
+    """
+    conn = db.session.connection()
+    if not budget_ms or not is_sqlite(conn):
+        yield
+        return
+
+    raw = conn.connection.driver_connection
+    deadline = time.monotonic() + budget_ms / 1000.0
+    raw.set_progress_handler(lambda: 1 if time.monotonic() > deadline else 0, _PROGRESS_STEPS)
+    try:
+        yield
+    except OperationalError as e:
+        if "interrupted" in str(e.orig):
+            raise QueryBudgetExceeded(f"query exceeded {budget_ms} ms") from e
+        raise
+    finally:
+        raw.set_progress_handler(None, 0)
+
+
+def init_app(app):
+    """
+    Apply SQLITE_PRAGMAS to every connection the app's engine opens, and make
+    a forked child drop the pooled connections it inherited instead of sharing
+    the parent's file handles and locks. Nothing to do for other databases.
+    """
+    with app.app_context():
+        engine = db.engine
+    if not is_sqlite(engine):
+        return
+
+    pragmas = dict(app.config.get("SQLITE_PRAGMAS") or {})
+    if pragmas:
+        @event.listens_for(engine, "connect")
+        def apply_pragmas(dbapi_conn, _record):
+            cursor = dbapi_conn.cursor()
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name} = {value}")
+            cursor.close()
+
+    if hasattr(os, "register_at_fork"):
+        ref = weakref.ref(engine)
+
+        def drop_inherited_connections():
+            # close=False: the parent still owns those connections
+            if ref() is not None:
+                ref().dispose(close=False)
+
+        os.register_at_fork(after_in_child=drop_inherited_connections)
@@ -0,0 +1,70 @@
+# app/template_globals.py
+"""
+Globals every template can use: the country menu, the cart badge, the footer
+year, product image URLs.
+
+They're registered once as Jinja globals rather than through a context
+processor, so nothing runs per render_template. Per-request values are
+LocalProxy objects: computed the first time a template touches them and
+memoized in `g` for the rest of the request.
+"""
+from collections import namedtuple
+from datetime import datetime
+
+from flask import g
+from werkzeug.local import LocalProxy
+
+Country = namedtuple("Country", "code name")
+
+COUNTRIES = (
+    Country("MY", "Malaysia"),
+    Country("SG", "Singapore"),
+    Country("TH", "Thailand"),
+    Country("ID", "Indonesia"),
+    Country("PH", "Philippines"),
+    Country("VN", "Vietnam"),
+    Country("KH", "Cambodia"),
+    Country("LA", "Laos"),
+    Country("MM", "Myanmar"),
+    Country("BN", "Brunei"),
+    Country("TL", "Timor-Leste"),
+)
+
+
+def request_global(name, fn):
+    """A proxy for fn() that runs at most once per request, on first use."""
+    key = f"_global_{name}"
+
+    def resolve():
+        if key not in g:
+            setattr(g, key, fn())
+        return getattr(g, key)
+
+    return LocalProxy(resolve)
+
+
+def _cart_count():
+    from app.cart.cart_utils import cart_count
+    return cart_count()
+
+
+cart_count = request_global("cart_count", _cart_count)
+current_year = request_global("current_year", lambda: datetime.utcnow().year)
+
+
+def init_app(app):
+    from app.media import SIZES, image_srcset, image_url
+    from storage_keys import is_storage_key
+
+    app.jinja_env.globals.update(
+        COUNTRIES=COUNTRIES,
+        cart_count=cart_count,
+        cart_items_count=cart_count,   # older templates use this name
+        current_year=current_year,
+        has_cart="cart" in app.blueprints,
+        # product images, see templates/_product_image.html
+        IMAGE_SIZES=SIZES,
+        image_srcset=image_srcset,
+        image_url=image_url,
+        is_storage_key=is_storage_key,
+    )
@@ -0,0 +1,241 @@
+# app/upload_gc.py
+"""
+Garbage collection for instance/uploads.
+
+Files end up unreferenced when a transaction fails after the bytes were
+written, when a document is replaced, when a blob drops to ref_count 0, or
+when a chunked upload is abandoned. collect_garbage() walks the tree one
+directory at a time and checks files in batches, one short read transaction
+per batch:
+
+  suppliers/<id>/...  -- one-off keys: looked up against every key column of
+                         the suppliers in the batch (documents, Supplier.*_key,
+                         product images, main_image_path, live upload sessions)
+  blobs/...           -- live while upload_blob.ref_count > 0
+  variants/<id>/...   -- live while their source image is
+  *.part              -- live while their upload session is open
+  tmp/...             -- never referenced
+
+Anything else is left alone. Files modified within the grace period are
+skipped; a transaction that wrote them may still be running.
+
+Orphans are not deleted right away but moved to quarantine/<key>. Each run
+looks at quarantine/ again: a file that something points to by now is put
+back, and one that has sat there for the grace period is deleted.
+"""
+import os
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import delete, or_, select
+
+from app.extensions import db
+from app.models import Product, ProductImage, Supplier, SupplierDocument, UploadBlob, UploadSession
+from storage_keys import is_blob_key, variant_source_id
+from storage_local import key_to_local_path
+
+QUARANTINE = "quarantine"
+DEFAULT_BATCH_SIZE = 500
+
+
+def _walk(root: Path, skip=()):
+    """Files under `root` as (key, DirEntry), one directory listing in memory at a time."""
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except FileNotFoundError:
+            continue
+        for entry in reversed(entries):
+            key = Path(entry.path).relative_to(root).as_posix()
+            if entry.is_dir(follow_symlinks=False):
+                if key not in skip:
+                    stack.append(entry.path)
+            elif entry.is_file(follow_symlinks=False):
+                yield key, entry
+
+
+def _batches(items, size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _classify(key: str):
+    """(kind, argument) for a key, or None for files the collector doesn't know about."""
+    name = key.rsplit("/", 1)[-1]
+    stem = name[:-len(".part")].split(".")
+    if name.endswith(".part") and len(stem) > 1 and len(stem[-1]) == 32:
+        return "part", stem[-1]   # <key>.<upload id>.part
+    if key.startswith("tmp/"):
+        return "tmp", None
+    if is_blob_key(key):
+        return "blob", name
+    parts = key.split("/")
+    if parts[0] == "variants" and len(parts) > 2:
+        return "variant", parts[1]
+    if parts[0] == "suppliers" and len(parts) > 2 and parts[1].isdigit():
+        return "supplier", int(parts[1])
+    return None
+
+
+class _References:
+    """Batched reference lookups, valid for one run."""
+
+    def __init__(self, cutoff: datetime):
+        self.cutoff = cutoff
+        self._path_variant_ids = None
+
+    def live(self, keys) -> set:
+        """The subset of `keys` that something still points to."""
+        kinds = {key: _classify(key) for key in keys}
+        by_kind = {}
+        for kind_arg in kinds.values():
+            if kind_arg:
+                by_kind.setdefault(kind_arg[0], set()).add(kind_arg[1])
+
+        sessions = self._open_sessions(by_kind.get("part", ()))
+        digests = self._referenced_digests(by_kind.get("blob", set()) | by_kind.get("variant", set()))
+        supplier_keys = self._supplier_keys(by_kind.get("supplier", ()))
+        db.session.rollback()   # end the read transaction between batches
+
+        live = set()
+        for key, kind_arg in kinds.items():
+            if kind_arg is None:
+                live.add(key)
+                continue
+            kind, arg = kind_arg
+            if (kind == "part" and arg in sessions
+                    or kind == "blob" and arg in digests
+                    or kind == "variant" and (arg in digests or arg in self.path_variant_ids())
+                    or kind == "supplier" and key in supplier_keys):
+                live.add(key)
+        return live
+
+    def _open_sessions(self, ids):
+        if not ids:
+            return set()
+        return set(db.session.execute(
+            select(UploadSession.id).where(UploadSession.id.in_(ids), UploadSession.completed_at.is_(None),
+                                           UploadSession.created_at >= self.cutoff)
+        ).scalars())
+
+    def _referenced_digests(self, digests):
+        if not digests:
+            return set()
+        return set(db.session.execute(
+            select(UploadBlob.digest).where(UploadBlob.digest.in_(digests), UploadBlob.ref_count > 0)
+        ).scalars())
+
+    def _supplier_keys(self, supplier_ids):
+        """Every key that the given suppliers' rows point to."""
+        if not supplier_ids:
+            return set()
+        ids = list(supplier_ids)
+        queries = (
+            select(SupplierDocument.key).where(SupplierDocument.supplier_id.in_(ids)),
+            select(Supplier.registration_cert_key, Supplier.bank_verification_doc_key,
+                   Supplier.director_id_doc_key).where(Supplier.id.in_(ids)),
+            select(Product.main_image_path).where(Product.supplier_id.in_(ids),
+                                                  Product.main_image_path.isnot(None)),
+            select(ProductImage.path).join(Product, Product.id == ProductImage.product_id)
+            .where(Product.supplier_id.in_(ids)),
+            # finished chunked uploads the form hasn't claimed yet
+            select(UploadSession.key).join(Supplier, Supplier.user_id == UploadSession.user_id)
+            .where(Supplier.id.in_(ids), UploadSession.created_at >= self.cutoff),
+        )
+        keys = set()
+        for stmt in queries:
+            for row in db.session.execute(stmt):
+                keys.update(k for k in row if k)
+        return keys
+
+    def path_variant_ids(self):
+        """variant_source_id of every product image stored under a one-off key; built once per run."""
+        if self._path_variant_ids is None:
+            ids, after = set(), 0
+            while True:
+                rows = db.session.execute(
+                    select(ProductImage.id, ProductImage.path)
+                    .where(ProductImage.id > after, ProductImage.path.like("suppliers/%"))
+                    .order_by(ProductImage.id).limit(5000)
+                ).all()
+                db.session.rollback()
+                if not rows:
+                    break
+                ids.update(variant_source_id(path) for _, path in rows)
+                after = rows[-1].id
+            self._path_variant_ids = ids
+        return self._path_variant_ids
+
+
+def _move(src: Path, dest: Path):
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    os.replace(src, dest)
+
+
+def collect_garbage(grace: timedelta, *, dry_run: bool = False, batch_size: int = DEFAULT_BATCH_SIZE):
+    """
+    Yield (action, key, size_bytes) with action "quarantine", "restore" or
+    "delete". With `dry_run` nothing is touched; the actions are what a real
+    run would do.
+    """
+    root = key_to_local_path("")
+    quarantine = root / QUARANTINE
+    now = time.time()
+    refs = _References(datetime.utcnow() - grace)
+
+    # 1) quarantine files nothing points to
+    old_enough = (
+        (key, entry) for key, entry in _walk(root, skip={QUARANTINE})
+        if now - entry.stat(follow_symlinks=False).st_mtime > grace.total_seconds()
+    )
+    for batch in _batches(old_enough, batch_size):
+        live = refs.live([key for key, _ in batch])
+        for key, entry in batch:
+            if key in live:
+                continue
+            size = entry.stat(follow_symlinks=False).st_size
+            if not dry_run:
+                dest = quarantine / key
+                _move(Path(entry.path), dest)
+                os.utime(dest)   # the grace period restarts in quarantine
+            yield "quarantine", key, size
+
+    # 2) restore quarantined files that are referenced again, delete the rest once their time is up
+    for batch in _batches(_walk(quarantine), batch_size):
+        live = refs.live([key for key, _ in batch])
+        for key, entry in batch:
+            stat = entry.stat(follow_symlinks=False)
+            if key in live:
+                if not dry_run:
+                    if key_to_local_path(key).exists():   # stored again meanwhile
+                        os.unlink(entry.path)
+                    else:
+                        _move(Path(entry.path), key_to_local_path(key))
+                yield "restore", key, stat.st_size
+            elif now - stat.st_mtime > grace.total_seconds():
+                # upload_blob rows stay: a concurrent upload of the same bytes may be about to reference it
+                if not dry_run:
+                    os.unlink(entry.path)
+                yield "delete", key, stat.st_size
+
+
+def prune_upload_sessions(grace: timedelta, *, dry_run: bool = False) -> int:
+    """Drop upload sessions started before the grace period; their .part files go with the next GC."""
+    expired = or_(UploadSession.created_at < datetime.utcnow() - grace, UploadSession.created_at.is_(None))
+    if dry_run:
+        count = db.session.query(UploadSession).filter(expired).count()
+        db.session.rollback()
+        return count
+    count = db.session.execute(delete(UploadSession).where(expired)).rowcount
+    db.session.commit()
+    return count
@@ -0,0 +1,92 @@
+# app/uploads.py
+"""
+Where uploaded bytes go.
+
+UPLOAD_STORAGE = "cas" (default) stores each distinct content once, under
+its sha256 (storage_local.save_local_content_addressed). An upload_blob row
+records the digest and real size. Rows that point at a blob
+(supplier_document.checksum, product_image.checksum) keep its ref_count
+through triggers, so replacing, deleting or cascading a row releases it
+whatever path the write took. Blobs at 0 references stay on disk for a cleanup job; request
+code never deletes blob files, since a concurrent upload may be reusing them.
+
+UPLOAD_STORAGE = "uuid" keeps the old one-file-per-upload keys.
+"""
+from collections import namedtuple
+
+from flask import current_app
+from sqlalchemy import event, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app.extensions import db
+from app.models import UploadBlob
+from app.sqlite_utils import is_sqlite
+from storage_local import key_to_local_path, save_local, save_local_content_addressed
+
+STORAGE_MODES = ("cas", "uuid")
+
+# key: storage key; checksum: sha256 hex or None (uuid mode); size_bytes: bytes on disk
+StoredUpload = namedtuple("StoredUpload", "key checksum size_bytes")
+
+# tables with a `checksum` column referencing upload_blob.digest
+BLOB_REF_TABLES = ("supplier_document", "product_image")
+
+BLOB_REFCOUNT_DDL = tuple(
+    ddl
+    for table in BLOB_REF_TABLES
+    for ddl in (
+        f"""
+        CREATE TRIGGER IF NOT EXISTS upload_blob_{table}_ai AFTER INSERT ON {table}
+        WHEN new.checksum IS NOT NULL
+        BEGIN
+            UPDATE upload_blob SET ref_count = ref_count + 1 WHERE digest = new.checksum;
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS upload_blob_{table}_au AFTER UPDATE OF checksum ON {table}
+        WHEN old.checksum IS NOT new.checksum
+        BEGIN
+            UPDATE upload_blob SET ref_count = ref_count - 1 WHERE digest = old.checksum;
+            UPDATE upload_blob SET ref_count = ref_count + 1 WHERE digest = new.checksum;
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS upload_blob_{table}_ad AFTER DELETE ON {table}
+        WHEN old.checksum IS NOT NULL
+        BEGIN
+            UPDATE upload_blob SET ref_count = ref_count - 1 WHERE digest = old.checksum;
+        END
+        """,
+    )
+)
+
+
+@event.listens_for(db.metadata, "after_create")
+def install_blob_triggers(target, connection, **kw):
+    if not is_sqlite(connection):
+        return
+    for ddl in BLOB_REFCOUNT_DDL:
+        connection.execute(text(ddl))
+
+
+def register_blob(digest: str, size: int):
+    """Make sure upload_blob has a row for `digest`; references are counted by the triggers."""
+    db.session.execute(
+        sqlite_insert(UploadBlob)
+        .values(digest=digest, size_bytes=size, ref_count=0)
+        .on_conflict_do_nothing(index_elements=["digest"])
+    )
+
+
+def store_upload(file_storage, uuid_key: str) -> StoredUpload:
+    """
+    Save `file_storage` according to UPLOAD_STORAGE. `uuid_key` is only used in
+    "uuid" mode. The caller stores key/checksum/size_bytes on its row and commits.
+    """
+    if current_app.config.get("UPLOAD_STORAGE", "cas") == "cas":
+        key, digest, size = save_local_content_addressed(file_storage)
+        register_blob(digest, size)
+        return StoredUpload(key, digest, size)
+
+    save_local(file_storage, uuid_key)
+    return StoredUpload(uuid_key, None, key_to_local_path(uuid_key).stat().st_size)
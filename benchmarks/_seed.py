@@ -0,0 +1,100 @@
+# benchmarks/_seed.py
+"""Shared helpers for the benchmark scripts: a throwaway app + synthetic catalog."""
+import os
+import random
+import sys
+import tempfile
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config  # noqa: E402
+
+WORDS = (
+    "coffee beans arabica robusta batik shirt silk sarong rattan basket mango "
+    "durian snacks chips dried fruit spice pepper cinnamon teak wood carving "
+    "ceramic bowl tea leaves jasmine pandan coconut oil soap handmade woven bag"
+).split()
+CATEGORIES = ["snacks", "fashion", "beauty", "home", "crafts", "coffee-tea"]
+COUNTRIES = ["MY", "SG", "TH", "ID", "PH", "VN"]
+INCOTERMS = [None, "EXW", "FOB", "CIF", "DDP"]
+
+
+def make_bench_app(path=None, **overrides):
+    """Create the real app against a fresh SQLite file and create the schema. `overrides` are config keys."""
+    from app import create_app
+    from app.extensions import db
+
+    path = path or tempfile.mktemp(prefix="aseara-bench-", suffix=".db")
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = "sqlite:///" + path
+        WTF_CSRF_ENABLED = False
+
+    for key, value in overrides.items():
+        setattr(BenchConfig, key, value)
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.create_all()
+    return app, path
+
+
+def _sentence(rng, n):
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+
+def _filler(rng, n, real=3):
+    """Mostly long-tail vocabulary with a few catalog words, like real descriptions."""
+    words = [f"w{rng.randint(0, 20000)}" for _ in range(n - real)] + [rng.choice(WORDS) for _ in range(real)]
+    rng.shuffle(words)
+    return " ".join(words)
+
+
+def seed_catalog(rows: int, suppliers: int = 50, seed: int = 42, chunk: int = 5000, description_words: int = 120):
+    """Insert `suppliers` approved suppliers and `rows` LIVE products (call inside an app context)."""
+    from app.extensions import db
+    from app.models import User, Supplier, SupplierStatus, Product, ProductStatus
+
+    rng = random.Random(seed)
+    supplier_ids = []
+    for i in range(suppliers):
+        u = User(first_name="Bench", last_name=str(i), email=f"bench{i}@example.com", role="supplier", password_hash="x")
+        db.session.add(u)
+        db.session.flush()
+        cc = COUNTRIES[i % len(COUNTRIES)]
+        s = Supplier(user_id=u.id, business_name=f"Bench Supplier {i}",
+                     company_registration_number=f"BENCH-{i}",
+                     country_code=cc, reg_country=cc, status=SupplierStatus.APPROVED)
+        db.session.add(s)
+        db.session.flush()
+        supplier_ids.append(s.id)
+    db.session.commit()
+
+    batch = []
+    for i in range(rows):
+        category = rng.choice(CATEGORIES)
+        batch.append(dict(
+            supplier_id=rng.choice(supplier_ids),
+            name=f"{_sentence(rng, 3).title()} {i}",
+            short_desc=_filler(rng, 8, real=2),
+            description=_filler(rng, description_words),
+            slug=f"bench-product-{i}",
+            category=category,
+            subcategory=f"{category}-{rng.randint(1, 5)}",
+            country_of_origin=rng.choice(COUNTRIES),
+            price=Decimal(rng.randint(100, 100000)) / 100,
+            currency="USD",
+            moq=rng.choice([1, 1, 5, 10, 50, 100, 500]),
+            stock=rng.randint(0, 10000),
+            incoterms=rng.choice(INCOTERMS),
+            status=ProductStatus.LIVE,
+            is_deleted=False,
+        ))
+        if len(batch) >= chunk:
+            db.session.execute(db.insert(Product), batch)
+            db.session.commit()
+            batch = []
+    if batch:
+        db.session.execute(db.insert(Product), batch)
+        db.session.commit()
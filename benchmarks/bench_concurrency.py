@@ -0,0 +1,137 @@
+# benchmarks/bench_concurrency.py
+"""
+Several worker processes reading and writing one SQLite file at once, like
+gunicorn workers behind the Procfile. Runs SQLite's defaults first, then the
+configured SQLITE_PRAGMAS, and counts 'database is locked' errors for each.
+
+    python benchmarks/bench_concurrency.py --writers 4 --readers 4 --seconds 10
+
+Exits non-zero if the configured profile still hits lock errors.
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import statistics
+import sys
+import time
+
+from sqlalchemy.exc import OperationalError
+
+from _seed import COUNTRIES, make_bench_app, seed_catalog
+
+from config import Config
+
+PROFILES = [
+    ("sqlite defaults", {}),
+    ("SQLITE_PRAGMAS", Config.SQLITE_PRAGMAS),
+]
+
+
+def _is_lock_error(exc):
+    return "locked" in str(exc.orig) or "busy" in str(exc.orig)
+
+
+def _read(db, rng):
+    from app.models import CatalogListing
+
+    qry = CatalogListing.query.filter(CatalogListing.effective_country == rng.choice(COUNTRIES))
+    qry.order_by(CatalogListing.product_id.desc()).limit(24).all()
+    qry.count()
+
+
+def _write(db, rng, product_ids):
+    from app.cart.store import get_cart_store, new_cart_id
+    from app.models import Product
+
+    if rng.random() < 0.5:
+        get_cart_store().save(new_cart_id(), {str(rng.choice(product_ids)): rng.randint(1, 9)})
+    else:
+        db.session.execute(
+            db.update(Product)
+            .where(Product.id == rng.choice(product_ids))
+            .values(stock=rng.randint(0, 10000))
+        )
+        db.session.commit()
+
+
+def worker(app, role, product_ids, seconds, seed, results):
+    """One process: read or write in a loop for `seconds`, report latencies and lock errors."""
+    from app.extensions import db
+
+    rng = random.Random(seed)
+    latencies, locked = [], 0
+    with app.app_context():
+        end = time.monotonic() + seconds
+        while time.monotonic() < end:
+            start = time.perf_counter()
+            try:
+                if role == "reader":
+                    _read(db, rng)
+                else:
+                    _write(db, rng, product_ids)
+            except OperationalError as e:
+                db.session.rollback()
+                if not _is_lock_error(e):
+                    raise
+                locked += 1
+                continue
+            latencies.append((time.perf_counter() - start) * 1000)
+        db.session.remove()
+    results.put((role, latencies, locked))
+
+
+def run(profile, pragmas, args):
+    app, path = make_bench_app(SQLITE_PRAGMAS=pragmas)
+    try:
+        with app.app_context():
+            from app.extensions import db
+            from app.models import Product
+
+            seed_catalog(args.rows, description_words=20)
+            product_ids = db.session.execute(db.select(Product.id)).scalars().all()
+            journal = db.session.execute(db.text("PRAGMA journal_mode")).scalar()
+            db.session.remove()
+        # the children inherit this app; sqlite_utils gives each a fresh pool after fork
+
+        ctx = multiprocessing.get_context("fork")
+        results = ctx.Queue()
+        procs = [ctx.Process(target=worker, args=(app, role, product_ids, args.seconds, i, results))
+                 for i, role in enumerate(["writer"] * args.writers + ["reader"] * args.readers)]
+        for p in procs:
+            p.start()
+        stats = {"reader": ([], 0), "writer": ([], 0)}
+        for _ in procs:
+            role, latencies, locked = results.get()
+            done, errors = stats[role]
+            stats[role] = (done + latencies, errors + locked)
+        for p in procs:
+            p.join()
+    finally:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+    for role in ("writer", "reader"):
+        latencies, locked = stats[role]
+        p99 = statistics.quantiles(latencies, n=100)[98] if len(latencies) > 1 else float("nan")
+        print(f"{profile:<18}{journal:>9}{role:>8}{len(latencies) / args.seconds:>10.0f}"
+              f"{statistics.median(latencies) if latencies else float('nan'):>11.1f}{p99:>10.1f}{locked:>8}")
+    return sum(locked for _latencies, locked in stats.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+
+    print(f"{'profile':<18}{'journal':>9}{'role':>8}{'ops/s':>10}{'median ms':>11}{'p99 ms':>10}{'locked':>8}")
+    locked = {profile: run(profile, pragmas, args) for profile, pragmas in PROFILES}
+    sys.exit(1 if locked["SQLITE_PRAGMAS"] else 0)
+
+
+if __name__ == "__main__":
+    main()
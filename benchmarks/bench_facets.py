@@ -0,0 +1,72 @@
+# benchmarks/bench_facets.py
+"""
+Time the single-statement facet counts against the configured budget.
+
+    python benchmarks/bench_facets.py --rows 500000
+"""
+import argparse
+import os
+import statistics
+import time
+
+from _seed import make_bench_app, seed_catalog
+
+FILTERS = [
+    ("everything", {}),
+    ("country=MY", {"country": "MY"}),
+    ("category=snacks", {"category": "snacks"}),
+    ("MY, snacks, FOB", {"country": "MY", "category": "snacks", "incoterms": "FOB"}),
+    ("q=coffee", {"q": "coffee"}),
+    ("q=batik, country=TH", {"q": "batik", "country": "TH"}),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=500000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    app, path = make_bench_app()
+    try:
+        with app.app_context():
+            from app.extensions import db
+            from app.models import CatalogListing
+            from app.catalog.facets import facet_counts
+            from app.catalog.search_index import apply_text_search
+
+            t0 = time.perf_counter()
+            seed_catalog(args.rows, description_words=20)
+            print(f"seeded {args.rows} products in {time.perf_counter() - t0:.1f}s")
+            budget = app.config["FACET_BUDGET_MS"]
+            print(f"budget: {budget} ms\n")
+
+            print(f"{'filters':<24}{'source':>8}{'median ms':>10}{'max ms':>10}{'within budget':>15}")
+            for label, f in FILTERS:
+                qry = CatalogListing.query
+                if "q" in f:
+                    qry, _rank = apply_text_search(qry, f["q"], id_column=CatalogListing.product_id)
+                if "country" in f:
+                    qry = qry.filter(CatalogListing.effective_country == f["country"])
+                if "category" in f:
+                    qry = qry.filter(CatalogListing.category == f["category"])
+                if "incoterms" in f:
+                    qry = qry.filter(CatalogListing.incoterms == f["incoterms"])
+
+                rollup = None if "q" in f else {k: v for k, v in f.items()}
+                samples, complete = [], True
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    facets = facet_counts(qry, rollup_filters=rollup, budget_ms=budget)
+                    samples.append((time.perf_counter() - start) * 1000)
+                    complete = complete and bool(facets)
+                source = "cte" if rollup is None else "rollup"
+                print(f"{label:<24}{source:>8}{statistics.median(samples):>10.1f}{max(samples):>10.1f}"
+                      f"{'yes' if complete else 'no (dropped)':>15}")
+            db.session.remove()
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# benchmarks/bench_search.py
+"""
+Compare the FTS5 search path with the old ILIKE scan.
+
+    python benchmarks/bench_search.py --rows 50000
+"""
+import argparse
+import os
+import statistics
+import time
+
+from _seed import make_bench_app, seed_catalog
+
+QUERIES = ["coffee", "batik shirt", "dried mango", "handmade woven bag", "teak"]
+
+
+def _time(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    app, path = make_bench_app()
+    try:
+        with app.app_context():
+            from app.extensions import db
+            from app.models import Product, ProductStatus
+            from app.catalog.search_index import apply_text_search, ilike_filter
+
+            t0 = time.perf_counter()
+            seed_catalog(args.rows)
+            print(f"seeded {args.rows} products in {time.perf_counter() - t0:.1f}s\n")
+
+            base = Product.query.filter(Product.is_deleted.is_(False), Product.status == ProductStatus.LIVE)
+
+            print(f"{'query':<22}{'ilike ms':>10}{'fts ms':>10}{'speedup':>10}{'hits':>8}")
+            for q in QUERIES:
+                def run_ilike():
+                    return base.filter(ilike_filter(q)).order_by(Product.created_at.desc()).limit(20).all()
+
+                def run_fts():
+                    qry, rank = apply_text_search(base, q)
+                    return qry.order_by(rank).limit(20).all()
+
+                hits = apply_text_search(base, q)[0].count()
+                ilike_ms = _time(run_ilike, args.repeat)
+                fts_ms = _time(run_fts, args.repeat)
+                print(f"{q:<22}{ilike_ms:>10.2f}{fts_ms:>10.2f}{ilike_ms / fts_ms:>9.1f}x{hits:>8}")
+            db.session.remove()
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,11 +7,43 @@ class Config:
     SECRET_KEY = 'nigger' #Put a more secure and politically correct key lol
     SQLALCHEMY_DATABASE_URI = 'sqlite:///'  + os.path.join(basedir, 'app.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLITE_PRAGMAS = { # Run on every new connection (app/sqlite_utils.py); {} keeps SQLite's defaults
+        'journal_mode': 'WAL', # readers don't block the writer, nor it them
+        'synchronous': 'NORMAL', # fsync at checkpoints only; safe with WAL, may lose the last commits on power loss
+        'busy_timeout': 10000, # ms a writer waits for the lock before 'database is locked'
+        'mmap_size': 256 * 1024 * 1024,
+        'cache_size': -32000, # KiB per connection
+        'temp_store': 'MEMORY',
+    }
     PERMANENT_SESSION_LIFETIME = timedelta(days = 1) #Arbitrary session hold selection
 
     CUSTOMER_COUNTRIES = ('BN', 'KH', 'ID', 'LA', 'MY', 'MM', 'PH', 'SG', 'TH', 'VN') # Adjust shipping destinations accordingly
     SUPPLIER_COUNTRIES = ('BN', 'KH', 'ID', 'LA', 'MY', 'MM', 'PH', 'SG', 'TH', 'VN') # Remove relevant countries accordingly
 
+    CART_STORE = 'sql' # Server-side cart backend, see app/cart/store.py
+    CART_BATCH_MAX_OPS = 1000 # Cap on operations per POST /cart/batch
+    PRODUCT_SYNC_MAX_ITEMS = 5000 # Cap on items per stock/price sync batch
+
+    PRINCIPAL_TTL_SECONDS = 60 # Logged-in user + role profile kept in memory this long (app/principal.py)
+
+    PAGE_CACHE_SECONDS = 300 # Anonymous catalog pages are re-rendered at least this often (app/page_cache.py)
+
+    FACET_BUDGET_MS = 150 # Search page drops the facet counts rather than wait longer than this
+    ADMIN_LOOKUP_BUDGET_MS = 100 # Admin supplier typeahead answers with what it has after this long
+
+    UPLOAD_STORAGE = 'cas' # 'cas': one file per distinct content, ref-counted; 'uuid': one file per upload (app/uploads.py)
+
+    UPLOAD_SERVE = 'app' # Who sends stored files: 'app', 'x-accel' (nginx) or 'x-sendfile' (app/files.py)
+    UPLOAD_ACCEL_PREFIX = '/_uploads/' # nginx `internal` location aliased to instance/uploads, for 'x-accel'
+    UPLOAD_CHUNK_BYTES = 4 * 1024 * 1024 # Chunk size suggested to clients of /dashboard/uploads (app/chunked_uploads.py)
+    UPLOAD_MAX_BYTES = 25 * 1024 * 1024 # Largest file a chunked upload may declare
+    UPLOAD_GC_GRACE_HOURS = 24 # flask dashboard gc-uploads: leave files this young alone, and keep orphans quarantined this long (app/upload_gc.py)
+
+    IMAGE_PIPELINE = 'thread' # 'thread': resize uploads in-process; 'worker': leave them to flask dashboard process-images (app/media.py)
+    IMAGE_PIPELINE_WORKERS = 2 # Threads for the in-process image pipeline
+
+    EXPORT_SETTLE_SECONDS = 5 # Catalog delta feed holds back products changed more recently than this (app/catalog/export.py)
+
     # @app.route('/login', methods=['POST'])
     # def login():
     #     # after validating credentials
@@ -0,0 +1,99 @@
+"""Admin dashboard metric counters
+
+Revision ID: 01ca7d8f21c2
+Revises: 97aa77a7b8cb
+Create Date: 2026-10-18 18:31:57.884120
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '01ca7d8f21c2'
+down_revision = '97aa77a7b8cb'
+branch_labels = None
+depends_on = None
+
+KEY = "metric, dim1, dim2, day"
+
+# keep in sync with METRICS in app/admin/metrics.py
+METRICS = {
+    "suppliers": ("supplier", "status, reg_country", "{r}.status", "coalesce({r}.reg_country, '')", "''"),
+    "products": ("product", "status, is_deleted, category",
+                 "CASE WHEN {r}.is_deleted THEN 'DELETED' ELSE {r}.status END",
+                 "coalesce({r}.category, '')", "''"),
+    "signups": ("user", "role, created_at", "{r}.role", "''", "coalesce(date({r}.created_at), '')"),
+}
+
+
+def _key_sql(metric, row):
+    _table, _columns, *exprs = METRICS[metric]
+    return ", ".join([f"'{metric}'"] + [expr.format(r=row) for expr in exprs])
+
+
+def _bump(metric, row):
+    return f"""INSERT INTO admin_metric ({KEY}, n) VALUES ({_key_sql(metric, row)}, 1)
+            ON CONFLICT ({KEY}) DO UPDATE SET n = n + 1;"""
+
+
+def _drop(metric, row):
+    return f"""UPDATE admin_metric SET n = n - 1 WHERE ({KEY}) = ({_key_sql(metric, row)});
+            DELETE FROM admin_metric WHERE ({KEY}) = ({_key_sql(metric, row)}) AND n <= 0;"""
+
+
+def _changed(metric):
+    _table, _columns, *exprs = METRICS[metric]
+    return " OR ".join(f"({e.format(r='old')}) IS NOT ({e.format(r='new')})" for e in exprs)
+
+
+def upgrade():
+    # existing accounts keep NULL: their signup day isn't known
+    op.add_column('user', sa.Column('created_at', sa.DateTime(), nullable=True))
+
+    op.create_table('admin_metric',
+    sa.Column('metric', sa.String(length=30), nullable=False),
+    sa.Column('dim1', sa.String(length=120), nullable=False),
+    sa.Column('dim2', sa.String(length=120), nullable=False),
+    sa.Column('day', sa.String(length=10), nullable=False),
+    sa.Column('n', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('metric', 'dim1', 'dim2', 'day')
+    )
+
+    for metric, (table, columns, *_exprs) in METRICS.items():
+        op.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS admin_metric_{metric}_ai AFTER INSERT ON "{table}"
+            BEGIN
+                {_bump(metric, 'new')}
+            END
+        """)
+        op.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS admin_metric_{metric}_au AFTER UPDATE OF {columns} ON "{table}"
+            WHEN {_changed(metric)}
+            BEGIN
+                {_drop(metric, 'old')}
+                {_bump(metric, 'new')}
+            END
+        """)
+        op.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS admin_metric_{metric}_ad AFTER DELETE ON "{table}"
+            BEGIN
+                {_drop(metric, 'old')}
+            END
+        """)
+
+        # backfill
+        op.execute(f"""
+            INSERT INTO admin_metric ({KEY}, n)
+            SELECT {_key_sql(metric, 't')}, count(*) FROM "{table}" t GROUP BY 2, 3, 4
+        """)
+
+
+def downgrade():
+    for metric in METRICS:
+        for suffix in ("ai", "au", "ad"):
+            op.execute(f"DROP TRIGGER IF EXISTS admin_metric_{metric}_{suffix}")
+    op.drop_table('admin_metric')
+
+    # not batch mode: recreating `user` would drop the principal-version triggers on it
+    op.execute('ALTER TABLE "user" DROP COLUMN created_at')
@@ -0,0 +1,47 @@
+"""Content version counters for the page cache
+
+Revision ID: 2f1d3287b59e
+Revises: 627121295d99
+Create Date: 2026-10-18 12:40:17.503961
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2f1d3287b59e'
+down_revision = '627121295d99'
+branch_labels = None
+depends_on = None
+
+BUMP = """
+    INSERT INTO content_version (name, version) VALUES ('catalog', 1)
+    ON CONFLICT (name) DO UPDATE SET version = version + 1;
+"""
+
+
+def upgrade():
+    op.create_table('content_version',
+    sa.Column('name', sa.String(length=40), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+    op.execute(f"CREATE TRIGGER IF NOT EXISTS content_version_product_ai AFTER INSERT ON product BEGIN {BUMP} END")
+    op.execute(f"CREATE TRIGGER IF NOT EXISTS content_version_product_au AFTER UPDATE ON product BEGIN {BUMP} END")
+    op.execute(f"CREATE TRIGGER IF NOT EXISTS content_version_product_ad AFTER DELETE ON product BEGIN {BUMP} END")
+    op.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS content_version_supplier_au
+        AFTER UPDATE OF status, business_name ON supplier
+        BEGIN {BUMP} END
+    """)
+    op.execute("INSERT INTO content_version (name, version) VALUES ('catalog', 1)")
+
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS content_version_supplier_au")
+    op.execute("DROP TRIGGER IF EXISTS content_version_product_ad")
+    op.execute("DROP TRIGGER IF EXISTS content_version_product_au")
+    op.execute("DROP TRIGGER IF EXISTS content_version_product_ai")
+    op.drop_table('content_version')
@@ -0,0 +1,73 @@
+"""Admin supplier lookup index
+
+Revision ID: 5e2c81d4a9b3
+Revises: 01ca7d8f21c2
+Create Date: 2026-10-18 19:12:40.316552
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e2c81d4a9b3'
+down_revision = '01ca7d8f21c2'
+branch_labels = None
+depends_on = None
+
+# keep in sync with SUPPLIER_SEARCH_DDL in app/admin/supplier_search.py
+ROW = """coalesce({r}.business_name, ''), coalesce({r}.company_registration_number, ''),
+            coalesce((SELECT lower(email) FROM "user" WHERE id = {r}.user_id), '')"""
+
+
+def upgrade():
+    op.create_index('ix_user_email_lower', 'user', [sa.text('lower(email)')], unique=False)
+
+    op.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS supplier_fts USING fts5(
+            business_name, registration_number, email,
+            tokenize='trigram'
+        )
+    """)
+    op.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS supplier_fts_ai AFTER INSERT ON supplier
+        BEGIN
+            INSERT INTO supplier_fts(rowid, business_name, registration_number, email)
+            VALUES (new.id, {ROW.format(r='new')});
+        END
+    """)
+    op.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS supplier_fts_au
+        AFTER UPDATE OF business_name, company_registration_number, user_id ON supplier
+        BEGIN
+            DELETE FROM supplier_fts WHERE rowid = old.id;
+            INSERT INTO supplier_fts(rowid, business_name, registration_number, email)
+            VALUES (new.id, {ROW.format(r='new')});
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS supplier_fts_ad AFTER DELETE ON supplier
+        BEGIN
+            DELETE FROM supplier_fts WHERE rowid = old.id;
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS supplier_fts_user_au AFTER UPDATE OF email ON "user"
+        BEGIN
+            UPDATE supplier_fts SET email = lower(new.email)
+            WHERE rowid IN (SELECT id FROM supplier WHERE user_id = new.id);
+        END
+    """)
+
+    # backfill
+    op.execute(f"""
+        INSERT INTO supplier_fts(rowid, business_name, registration_number, email)
+        SELECT s.id, {ROW.format(r='s')} FROM supplier s
+    """)
+
+
+def downgrade():
+    for trigger in ("supplier_fts_user_au", "supplier_fts_ad", "supplier_fts_au", "supplier_fts_ai"):
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    op.execute("DROP TABLE IF EXISTS supplier_fts")
+    op.drop_index('ix_user_email_lower', table_name='user')
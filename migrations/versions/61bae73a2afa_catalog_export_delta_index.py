@@ -0,0 +1,38 @@
+"""Catalog export delta index and supplier touch trigger
+
+Revision ID: 61bae73a2afa
+Revises: 38f625147cd9
+Create Date: 2026-10-18 15:12:07.408163
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '61bae73a2afa'
+down_revision = '38f625147cd9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('product', schema=None) as batch_op:
+        batch_op.create_index('ix_product_updated', ['updated_at', 'id'], unique=False)
+
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS product_touch_supplier_au
+        AFTER UPDATE OF status, business_name, country_code, reg_country ON supplier
+        WHEN old.status IS NOT new.status OR old.business_name IS NOT new.business_name
+          OR old.country_code IS NOT new.country_code OR old.reg_country IS NOT new.reg_country
+        BEGIN
+            UPDATE product SET updated_at = CURRENT_TIMESTAMP WHERE supplier_id = new.id;
+        END
+    """)
+
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS product_touch_supplier_au")
+
+    with op.batch_alter_table('product', schema=None) as batch_op:
+        batch_op.drop_index('ix_product_updated')
@@ -0,0 +1,59 @@
+"""Country landing-page snapshots
+
+Revision ID: 627121295d99
+Revises: d2b4934563c9
+Create Date: 2026-10-18 12:02:41.118230
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '627121295d99'
+down_revision = 'd2b4934563c9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('country_snapshot',
+    sa.Column('country_code', sa.String(length=2), nullable=False),
+    sa.Column('payload', sa.Text(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('is_stale', sa.Boolean(), nullable=False),
+    sa.Column('built_at', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.PrimaryKeyConstraint('country_code')
+    )
+
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS country_snapshot_listing_ai AFTER INSERT ON catalog_listing
+        BEGIN
+            UPDATE country_snapshot SET is_stale = 1, version = version + 1
+            WHERE country_code = new.effective_country;
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS country_snapshot_listing_ad AFTER DELETE ON catalog_listing
+        BEGIN
+            UPDATE country_snapshot SET is_stale = 1, version = version + 1
+            WHERE country_code = old.effective_country;
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS country_snapshot_supplier_au
+        AFTER UPDATE OF business_name, nature_of_business ON supplier
+        BEGIN
+            UPDATE country_snapshot SET is_stale = 1, version = version + 1
+            WHERE country_code IN (SELECT DISTINCT effective_country FROM catalog_listing
+                                   WHERE supplier_id = new.id);
+        END
+    """)
+    # no backfill: each country is built on its first visit
+
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS country_snapshot_supplier_au")
+    op.execute("DROP TRIGGER IF EXISTS country_snapshot_listing_ad")
+    op.execute("DROP TRIGGER IF EXISTS country_snapshot_listing_ai")
+    op.drop_table('country_snapshot')
@@ -0,0 +1,28 @@
+"""Supplier verification queue indexes
+
+Revision ID: 97aa77a7b8cb
+Revises: 886f6b706f06
+Create Date: 2026-10-18 17:48:36.509214
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '97aa77a7b8cb'
+down_revision = '886f6b706f06'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('supplier', schema=None) as batch_op:
+        batch_op.create_index('ix_supplier_queue', ['status', 'submitted_at', 'id'], unique=False)
+        batch_op.create_index('ix_supplier_country_queue', ['reg_country', 'status', 'submitted_at', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('supplier', schema=None) as batch_op:
+        batch_op.drop_index('ix_supplier_country_queue')
+        batch_op.drop_index('ix_supplier_queue')
@@ -0,0 +1,62 @@
+"""Product image variants
+
+Revision ID: b17da1f91716
+Revises: b70f355aa711
+Create Date: 2026-10-18 16:25:51.630417
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b17da1f91716'
+down_revision = 'b70f355aa711'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('product_image', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('checksum', sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column('width', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('height', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('variants', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('variants_status', sa.String(length=10), server_default='pending', nullable=False))
+        batch_op.create_index(batch_op.f('ix_product_image_variants_status'), ['variants_status'], unique=False)
+
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS upload_blob_product_image_ai AFTER INSERT ON product_image
+        WHEN new.checksum IS NOT NULL
+        BEGIN
+            UPDATE upload_blob SET ref_count = ref_count + 1 WHERE digest = new.checksum;
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS upload_blob_product_image_au AFTER UPDATE OF checksum ON product_image
+        WHEN old.checksum IS NOT new.checksum
+        BEGIN
+            UPDATE upload_blob SET ref_count = ref_count - 1 WHERE digest = old.checksum;
+            UPDATE upload_blob SET ref_count = ref_count + 1 WHERE digest = new.checksum;
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS upload_blob_product_image_ad AFTER DELETE ON product_image
+        WHEN old.checksum IS NOT NULL
+        BEGIN
+            UPDATE upload_blob SET ref_count = ref_count - 1 WHERE digest = old.checksum;
+        END
+    """)
+
+
+def downgrade():
+    for suffix in ("ai", "au", "ad"):
+        op.execute(f"DROP TRIGGER IF EXISTS upload_blob_product_image_{suffix}")
+
+    with op.batch_alter_table('product_image', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_product_image_variants_status'))
+        batch_op.drop_column('variants_status')
+        batch_op.drop_column('variants')
+        batch_op.drop_column('height')
+        batch_op.drop_column('width')
+        batch_op.drop_column('checksum')
@@ -0,0 +1,65 @@
+"""Content-addressed upload blobs
+
+Revision ID: b70f355aa711
+Revises: 61bae73a2afa
+Create Date: 2026-10-18 15:47:22.913570
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b70f355aa711'
+down_revision = '61bae73a2afa'
+branch_labels = None
+depends_on = None
+
+REF_TABLES = ("supplier_document",)
+
+
+def upgrade():
+    op.create_table('upload_blob',
+    sa.Column('digest', sa.String(length=64), nullable=False),
+    sa.Column('size_bytes', sa.Integer(), nullable=False),
+    sa.Column('ref_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.PrimaryKeyConstraint('digest')
+    )
+    with op.batch_alter_table('supplier_document', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('checksum', sa.String(length=64), nullable=True))
+
+    for table in REF_TABLES:
+        op.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS upload_blob_{table}_ai AFTER INSERT ON {table}
+            WHEN new.checksum IS NOT NULL
+            BEGIN
+                UPDATE upload_blob SET ref_count = ref_count + 1 WHERE digest = new.checksum;
+            END
+        """)
+        op.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS upload_blob_{table}_au AFTER UPDATE OF checksum ON {table}
+            WHEN old.checksum IS NOT new.checksum
+            BEGIN
+                UPDATE upload_blob SET ref_count = ref_count - 1 WHERE digest = old.checksum;
+                UPDATE upload_blob SET ref_count = ref_count + 1 WHERE digest = new.checksum;
+            END
+        """)
+        op.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS upload_blob_{table}_ad AFTER DELETE ON {table}
+            WHEN old.checksum IS NOT NULL
+            BEGIN
+                UPDATE upload_blob SET ref_count = ref_count - 1 WHERE digest = old.checksum;
+            END
+        """)
+
+
+def downgrade():
+    for table in REF_TABLES:
+        for suffix in ("ai", "au", "ad"):
+            op.execute(f"DROP TRIGGER IF EXISTS upload_blob_{table}_{suffix}")
+
+    with op.batch_alter_table('supplier_document', schema=None) as batch_op:
+        batch_op.drop_column('checksum')
+
+    op.drop_table('upload_blob')
@@ -0,0 +1,26 @@
+"""Index product_image.path for srcset widths
+
+Revision ID: c4f09e3b7a21
+Revises: 5e2c81d4a9b3
+Create Date: 2026-10-18 21:12:40.318562
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4f09e3b7a21'
+down_revision = '5e2c81d4a9b3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('product_image', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_product_image_path'), ['path'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('product_image', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_product_image_path'))
@@ -0,0 +1,68 @@
+"""Product full-text search (FTS5)
+
+Revision ID: c6411923f83d
+Revises: 1ef2526c7d17
+Create Date: 2026-10-18 09:12:41.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c6411923f83d'
+down_revision = '1ef2526c7d17'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS product_fts USING fts5(
+            name, short_desc, description,
+            content='product', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3'
+        )
+    """)
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS product_fts_ai AFTER INSERT ON product
+        WHEN coalesce(new.is_deleted, 0) = 0
+        BEGIN
+            INSERT INTO product_fts(rowid, name, short_desc, description)
+            VALUES (new.id, new.name, new.short_desc, new.description);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS product_fts_ad AFTER DELETE ON product
+        WHEN coalesce(old.is_deleted, 0) = 0
+        BEGIN
+            INSERT INTO product_fts(product_fts, rowid, name, short_desc, description)
+            VALUES ('delete', old.id, old.name, old.short_desc, old.description);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS product_fts_au
+        AFTER UPDATE OF name, short_desc, description, is_deleted ON product
+        BEGIN
+            INSERT INTO product_fts(product_fts, rowid, name, short_desc, description)
+            SELECT 'delete', old.id, old.name, old.short_desc, old.description
+            WHERE coalesce(old.is_deleted, 0) = 0;
+            INSERT INTO product_fts(rowid, name, short_desc, description)
+            SELECT new.id, new.name, new.short_desc, new.description
+            WHERE coalesce(new.is_deleted, 0) = 0;
+        END
+    """)
+    # index what is already there
+    op.execute("""
+        INSERT INTO product_fts(rowid, name, short_desc, description)
+        SELECT id, name, short_desc, description FROM product
+        WHERE coalesce(is_deleted, 0) = 0
+    """)
+
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS product_fts_au")
+    op.execute("DROP TRIGGER IF EXISTS product_fts_ad")
+    op.execute("DROP TRIGGER IF EXISTS product_fts_ai")
+    op.execute("DROP TABLE IF EXISTS product_fts")
@@ -0,0 +1,107 @@
+"""Catalog listing read model
+
+Revision ID: c9c1d42bac00
+Revises: c6411923f83d
+Create Date: 2026-10-18 10:03:17.552910
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c9c1d42bac00'
+down_revision = 'c6411923f83d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('catalog_listing',
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('supplier_id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=200), nullable=False),
+    sa.Column('short_desc', sa.String(length=300), nullable=True),
+    sa.Column('slug', sa.String(length=220), nullable=True),
+    sa.Column('category', sa.String(length=120), nullable=True),
+    sa.Column('subcategory', sa.String(length=120), nullable=True),
+    sa.Column('country_of_origin', sa.String(length=2), nullable=True),
+    sa.Column('effective_country', sa.String(length=2), nullable=True),
+    sa.Column('price', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('currency', sa.String(length=3), nullable=True),
+    sa.Column('moq', sa.Integer(), nullable=True),
+    sa.Column('stock', sa.Integer(), nullable=True),
+    sa.Column('incoterms', sa.String(length=20), nullable=True),
+    sa.Column('main_image_path', sa.String(length=255), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('supplier_name', sa.String(length=255), nullable=True),
+    sa.Column('supplier_country_code', sa.String(length=2), nullable=True),
+    sa.ForeignKeyConstraint(['product_id'], ['product.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('product_id')
+    )
+    with op.batch_alter_table('catalog_listing', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_catalog_listing_supplier_id'), ['supplier_id'], unique=False)
+        batch_op.create_index('ix_listing_created', ['created_at', 'product_id'], unique=False)
+        batch_op.create_index('ix_listing_price', ['price', 'product_id'], unique=False)
+        batch_op.create_index('ix_listing_name', ['name', 'product_id'], unique=False)
+        batch_op.create_index('ix_listing_country_created', ['effective_country', 'created_at', 'product_id'], unique=False)
+        batch_op.create_index('ix_listing_country_price', ['effective_country', 'price', 'product_id'], unique=False)
+        batch_op.create_index('ix_listing_country_category_created', ['effective_country', 'category', 'created_at', 'product_id'], unique=False)
+        batch_op.create_index('ix_listing_category_created', ['category', 'created_at', 'product_id'], unique=False)
+        batch_op.create_index('ix_listing_subcategory_created', ['subcategory', 'created_at', 'product_id'], unique=False)
+
+    # keep in sync with app/catalog/listing.py
+    columns = (
+        "product_id, supplier_id, name, short_desc, slug, category, subcategory, "
+        "country_of_origin, effective_country, price, currency, moq, stock, incoterms, "
+        "main_image_path, created_at, updated_at, supplier_name, supplier_country_code"
+    )
+    listing_select = """
+        SELECT p.id, p.supplier_id, p.name, p.short_desc, p.slug, p.category, p.subcategory,
+               p.country_of_origin,
+               upper(coalesce(nullif(p.country_of_origin, ''), nullif(s.country_code, ''), nullif(s.reg_country, ''))),
+               p.price, p.currency, p.moq, p.stock, p.incoterms,
+               p.main_image_path, p.created_at, p.updated_at, s.business_name, s.country_code
+        FROM product p JOIN supplier s ON s.id = p.supplier_id
+        WHERE coalesce(p.is_deleted, 0) = 0 AND p.status = 'LIVE' AND s.status = 'APPROVED'
+    """
+
+    op.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS catalog_listing_product_ai AFTER INSERT ON product
+        BEGIN
+            INSERT INTO catalog_listing ({columns}) {listing_select} AND p.id = new.id;
+        END
+    """)
+    op.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS catalog_listing_product_au AFTER UPDATE ON product
+        BEGIN
+            DELETE FROM catalog_listing WHERE product_id = old.id;
+            INSERT INTO catalog_listing ({columns}) {listing_select} AND p.id = new.id;
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS catalog_listing_product_ad AFTER DELETE ON product
+        BEGIN
+            DELETE FROM catalog_listing WHERE product_id = old.id;
+        END
+    """)
+    op.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS catalog_listing_supplier_au
+        AFTER UPDATE OF status, business_name, country_code, reg_country ON supplier
+        BEGIN
+            DELETE FROM catalog_listing WHERE supplier_id = old.id;
+            INSERT INTO catalog_listing ({columns}) {listing_select} AND s.id = new.id;
+        END
+    """)
+
+    # backfill
+    op.execute(f"INSERT INTO catalog_listing ({columns}) {listing_select}")
+
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS catalog_listing_supplier_au")
+    op.execute("DROP TRIGGER IF EXISTS catalog_listing_product_ad")
+    op.execute("DROP TRIGGER IF EXISTS catalog_listing_product_au")
+    op.execute("DROP TRIGGER IF EXISTS catalog_listing_product_ai")
+    op.drop_table('catalog_listing')
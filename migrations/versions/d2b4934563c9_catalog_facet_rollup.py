@@ -0,0 +1,83 @@
+"""Catalog facet rollup
+
+Revision ID: d2b4934563c9
+Revises: c9c1d42bac00
+Create Date: 2026-10-18 11:26:05.410377
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2b4934563c9'
+down_revision = 'c9c1d42bac00'
+branch_labels = None
+depends_on = None
+
+DIMS = "effective_country, category, subcategory, price_band, incoterms, moq_band"
+
+
+def _key_sql(row):
+    # keep in sync with PRICE_BANDS / MOQ_BANDS in app/catalog/facets.py
+    price_band = (
+        f"CASE WHEN {row}.price < 10 THEN '0-10' "
+        f"WHEN {row}.price >= 10 AND {row}.price < 50 THEN '10-50' "
+        f"WHEN {row}.price >= 50 AND {row}.price < 100 THEN '50-100' "
+        f"WHEN {row}.price >= 100 AND {row}.price < 500 THEN '100-500' "
+        f"WHEN {row}.price >= 500 THEN '500+' ELSE '' END"
+    )
+    moq = f"coalesce({row}.moq, 1)"
+    moq_band = (
+        f"CASE WHEN {moq} < 2 THEN '1' "
+        f"WHEN {moq} >= 2 AND {moq} < 11 THEN '2-10' "
+        f"WHEN {moq} >= 11 AND {moq} < 101 THEN '11-100' "
+        f"WHEN {moq} >= 101 THEN '101+' ELSE '' END"
+    )
+    return (
+        f"coalesce({row}.effective_country, ''), coalesce({row}.category, ''), "
+        f"coalesce({row}.subcategory, ''), {price_band}, coalesce({row}.incoterms, ''), {moq_band}"
+    )
+
+
+def upgrade():
+    op.create_table('catalog_facet_rollup',
+    sa.Column('effective_country', sa.String(length=2), nullable=False),
+    sa.Column('category', sa.String(length=120), nullable=False),
+    sa.Column('subcategory', sa.String(length=120), nullable=False),
+    sa.Column('price_band', sa.String(length=20), nullable=False),
+    sa.Column('incoterms', sa.String(length=20), nullable=False),
+    sa.Column('moq_band', sa.String(length=20), nullable=False),
+    sa.Column('n', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('effective_country', 'category', 'subcategory', 'price_band', 'incoterms', 'moq_band')
+    )
+
+    op.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS catalog_facet_rollup_ai AFTER INSERT ON catalog_listing
+        BEGIN
+            INSERT INTO catalog_facet_rollup ({DIMS}, n)
+            VALUES ({_key_sql('new')}, 1)
+            ON CONFLICT ({DIMS}) DO UPDATE SET n = n + 1;
+        END
+    """)
+    op.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS catalog_facet_rollup_ad AFTER DELETE ON catalog_listing
+        BEGIN
+            UPDATE catalog_facet_rollup SET n = n - 1
+            WHERE ({DIMS}) = ({_key_sql('old')});
+            DELETE FROM catalog_facet_rollup
+            WHERE ({DIMS}) = ({_key_sql('old')}) AND n <= 0;
+        END
+    """)
+
+    # backfill
+    op.execute(f"""
+        INSERT INTO catalog_facet_rollup ({DIMS}, n)
+        SELECT {_key_sql('l')}, count(*) FROM catalog_listing l GROUP BY 1, 2, 3, 4, 5, 6
+    """)
+
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS catalog_facet_rollup_ad")
+    op.execute("DROP TRIGGER IF EXISTS catalog_facet_rollup_ai")
+    op.drop_table('catalog_facet_rollup')
@@ -0,0 +1,37 @@
+"""Principal cache version triggers
+
+Revision ID: f48d25eba574
+Revises: fd484b89c497
+Create Date: 2026-10-18 13:58:30.271904
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f48d25eba574'
+down_revision = 'fd484b89c497'
+branch_labels = None
+depends_on = None
+
+TABLES = ("user", "customer", "supplier", "admin")
+ACTIONS = (("ai", "INSERT"), ("au", "UPDATE"), ("ad", "DELETE"))
+
+
+def upgrade():
+    for table in TABLES:
+        for suffix, action in ACTIONS:
+            op.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS content_version_{table}_principal_{suffix} AFTER {action} ON "{table}"
+                BEGIN
+                    INSERT INTO content_version (name, version) VALUES ('principals', 1)
+                    ON CONFLICT (name) DO UPDATE SET version = version + 1;
+                END
+            """)
+
+
+def downgrade():
+    for table in TABLES:
+        for suffix, _action in ACTIONS:
+            op.execute(f"DROP TRIGGER IF EXISTS content_version_{table}_principal_{suffix}")
@@ -1,3 +1,4 @@
+from hashlib import sha256
 from uuid import uuid4
 from werkzeug.utils import secure_filename
 import os
@@ -5,6 +6,13 @@ import os
 def _ext(name): 
     return (os.path.splitext(name)[1] or ".bin").lower()
 
+def blob_key(digest: str) -> str:
+    # content-addressed: the same bytes get the same key, whoever uploads them
+    return f"blobs/{digest[:2]}/{digest[2:4]}/{digest}"
+
+def is_blob_key(key: str) -> bool:
+    return (key or "").startswith("blobs/")
+
 def supplier_doc_key(supplier_id: int, kind: str, filename: str) -> str:
     return f"suppliers/{supplier_id}/documents/{kind}/{uuid4().hex}{_ext(filename)}"
 
@@ -12,6 +20,14 @@ def product_media_key(supplier_id: int, product_id: int, filename: str, variant:
     safe_ext = _ext(filename)
     return f"suppliers/{supplier_id}/products/{product_id}/{variant}/{uuid4().hex}{safe_ext}"
 
-# def product_thumb_key(supplier_id: int, product_id: int, source_key: str) -> str:
-#     # same uuid as original if you want to match; simplest: new uuid
-#     return f"suppliers/{supplier_id}/products/{product_id}/thumb/{uuid4().hex}.jpg"
+def is_storage_key(path: str) -> bool:
+    # product images saved before the storage layer are bare names under static/uploads/products
+    return is_blob_key(path) or (path or "").startswith("suppliers/")
+
+def variant_source_id(source_key: str) -> str:
+    # the blob's digest, or a hash of the one-off key
+    return source_key.rsplit("/", 1)[-1] if is_blob_key(source_key) else sha256(source_key.encode()).hexdigest()
+
+def variant_key(source_key: str, variant: str, ext: str) -> str:
+    # derived from the source, so the same original always maps to the same variants
+    return f"variants/{variant_source_id(source_key)}/{variant}.{ext}"
@@ -1,7 +1,12 @@
 # storage_local.py
+import hashlib
+import os
+import tempfile
 from pathlib import Path
 from flask import current_app
-# from PIL import Image
+from storage_keys import blob_key
+
+READ_CHUNK = 1024 * 1024
 
 def key_to_local_path(key: str) -> Path:
     root = Path(current_app.instance_path) / "uploads"
@@ -13,10 +18,62 @@ def save_local(file_storage, key: str):
     file_storage.save(path)
     return str(key)  # return the key you’ll store in DB
 
-# def make_thumbnail_local(src_key: str, dst_key: str, size=(800, 800)):
-#     src = key_to_local_path(src_key)
-#     dst = key_to_local_path(dst_key)
-#     dst.parent.mkdir(parents=True, exist_ok=True)
-#     with Image.open(src) as im:
-#         im.thumbnail(size)
-#         im.convert("RGB").save(dst, "JPEG", quality=85)
+def _hash_stream(stream, out=None):
+    """sha256 hex digest and byte count of what's left in `stream`, copied to `out` if given."""
+    digest, size = hashlib.sha256(), 0
+    while True:
+        chunk = stream.read(READ_CHUNK)
+        if not chunk:
+            return digest.hexdigest(), size
+        digest.update(chunk)
+        size += len(chunk)
+        if out is not None:
+            out.write(chunk)
+
+def save_local_content_addressed(file_storage):
+    """
+    Store the upload under its sha256 and return (key, digest, size).
+    Bytes already on disk are not written again: a seekable stream (werkzeug
+    spools uploads) is hashed first and only copied if the blob is new; anything
+    else is hashed while streaming to a temp file that's dropped if it was a dup.
+    """
+    stream = file_storage.stream
+    if stream.seekable():
+        start = stream.tell()
+        digest, size = _hash_stream(stream)
+        path = key_to_local_path(blob_key(digest))
+        if path.exists():
+            os.utime(path)   # in use again: restarts the upload GC's grace period
+            return blob_key(digest), digest, size
+        stream.seek(start)
+
+    tmp_dir = key_to_local_path("tmp")
+    tmp_dir.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=tmp_dir)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            digest, size = _hash_stream(stream, out)
+        path = key_to_local_path(blob_key(digest))
+        if path.exists():
+            os.unlink(tmp)
+            os.utime(path)
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(tmp, path)   # atomic; a racing writer has the same bytes anyway
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+    return blob_key(digest), digest, size
+
+def save_image_local(im, key: str, fmt: str, **options):
+    """Write a PIL image to `key` via a temp file, so readers never see a half-written variant."""
+    path = key_to_local_path(key)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            im.save(out, fmt, **options)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
@@ -0,0 +1,51 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+from app.extensions import db  # noqa: E402
+from config import Config  # noqa: E402
+
+
+@pytest.fixture
+def app(tmp_path):
+    class TestConfig(Config):
+        TESTING = True
+        SQLALCHEMY_DATABASE_URI = "sqlite:///" + str(tmp_path / "test.db")
+        WTF_CSRF_ENABLED = False
+
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def supplier(app):
+    """An approved supplier with its user."""
+    from app.models import Supplier, SupplierStatus, User
+
+    user = User(first_name="Test", last_name="Supplier", email="supplier@example.com",
+                role="supplier", password_hash="x")
+    db.session.add(user)
+    db.session.flush()
+    supplier = Supplier(user_id=user.id, business_name="Test Supplier", company_registration_number="T-1",
+                        country_code="MY", reg_country="MY", status=SupplierStatus.APPROVED)
+    db.session.add(supplier)
+    db.session.commit()
+    return supplier
+
+
+@pytest.fixture
+def client(app, supplier):
+    """Test client logged in as `supplier`."""
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session["_user_id"] = str(supplier.user_id)
+        session["_fresh"] = True
+    return client
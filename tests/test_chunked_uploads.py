@@ -0,0 +1,25 @@
+import pytest
+
+SHA = "a" * 64
+
+
+@pytest.mark.parametrize("body, error", [
+    ([1], "expected a JSON object"),
+    ({"kind": "registration_cert", "filename": "a.pdf", "size": 5, "sha256": 12345}, "sha256 must be 64 hex digits"),
+    ({"kind": "registration_cert", "filename": "a.pdf", "size": 5, "sha256": [SHA]}, "sha256 must be 64 hex digits"),
+    ({"kind": "registration_cert", "filename": "a.pdf", "size": 5, "sha256": "z" * 64}, "sha256 must be 64 hex digits"),
+    ({"kind": "registration_cert", "filename": "a.pdf", "size": True, "sha256": SHA}, "size must be a positive integer"),
+    ({"kind": "registration_cert", "filename": ["a.pdf"], "size": 5, "sha256": SHA},
+     "filename and content_type must be strings"),
+])
+def test_bad_start_requests_are_400(client, body, error):
+    resp = client.post("/dashboard/uploads", json=body)
+    assert resp.status_code == 400
+    assert resp.json == {"error": error}
+
+
+def test_start_upload(client):
+    resp = client.post("/dashboard/uploads", json={"kind": "registration_cert", "filename": "a.pdf",
+                                                   "size": 5, "sha256": SHA.upper()})
+    assert resp.status_code == 201
+    assert resp.json["offset"] == 0 and resp.json["size"] == 5
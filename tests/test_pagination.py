@@ -0,0 +1,26 @@
+import base64
+import json
+
+import pytest
+
+from app.pagination import decode_cursor, encode_cursor
+
+
+def _token(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).rstrip(b"=").decode()
+
+
+def test_round_trip():
+    assert decode_cursor(encode_cursor(["2026-01-01 00:00:00", 7]), 2) == ["2026-01-01 00:00:00", 7]
+
+
+@pytest.mark.parametrize("token", [
+    "not base64!", _token({"a": 1}), _token([{"a": 1}, 2]), _token([[1], 2]), _token([1, 2, 3]),
+])
+def test_garbled_cursors_decode_to_none(token):
+    assert decode_cursor(token, 2) is None
+
+
+def test_search_ignores_a_cursor_holding_objects(app):
+    resp = app.test_client().get("/catalog/search", query_string={"after": _token([{"a": 1}, 2])})
+    assert resp.status_code == 200
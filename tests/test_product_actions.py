@@ -0,0 +1,19 @@
+from app.dashboard.product_actions import MAX_IDS, bulk_product_action
+from app.extensions import db
+from app.models import Product, ProductStatus
+
+
+def test_ids_past_the_limit_are_skipped_not_dropped(supplier):
+    db.session.execute(db.insert(Product), [
+        dict(supplier_id=supplier.id, name=f"P{i}", slug=f"p-{i}", price=1, currency="USD",
+             status=ProductStatus.DRAFT, is_deleted=False)
+        for i in range(MAX_IDS + 5)
+    ])
+    db.session.commit()
+    ids = [pid for (pid,) in db.session.execute(db.select(Product.id).order_by(Product.id))]
+
+    changed, skipped = bulk_product_action(supplier.id, "archive", ids, can_publish=True)
+
+    assert len(changed) == MAX_IDS
+    assert skipped == {pid: "over the batch limit" for pid in ids[MAX_IDS:]}
+    assert Product.query.filter_by(status=ProductStatus.ARCHIVED).count() == MAX_IDS
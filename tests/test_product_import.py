@@ -0,0 +1,41 @@
+import io
+import json
+
+from sqlalchemy.exc import IntegrityError
+
+from app.dashboard import product_import
+from app.models import Product
+
+
+def _post_csv(client, body):
+    resp = client.post("/dashboard/supplier/products/import",
+                       data={"file": (io.BytesIO(body.encode()), "products.csv")},
+                       content_type="multipart/form-data")
+    assert resp.status_code == 200
+    return [json.loads(line) for line in resp.get_data(as_text=True).splitlines()]
+
+
+def test_names_whose_slugs_overlap_import(client):
+    records = _post_csv(client, "name,price\nCoffee,1\nCoffee,2\nCoffee 2,3\n")
+    assert records[-1] == {"done": True, "imported": 3, "failed": 0}
+    assert sorted(p.slug for p in Product.query) == ["coffee", "coffee-2", "coffee-2-2"]
+
+
+def test_unwritable_chunk_is_reported_per_row(supplier, monkeypatch):
+    real_insert = product_import._insert_chunk
+    calls = []
+
+    def insert_chunk(supplier_id, values):
+        calls.append(len(values))
+        if len(calls) == 1:
+            raise IntegrityError("INSERT", {}, Exception("UNIQUE constraint failed: product.slug"))
+        real_insert(supplier_id, values)
+
+    monkeypatch.setattr(product_import, "_insert_chunk", insert_chunk)
+    records = list(product_import.import_products(
+        supplier.id, io.BytesIO(b"name,price\nA,1\nB,2\nC,3\n"), "csv", chunk_size=2))
+    errors = [r for r in records if "errors" in r]
+    assert [r["line"] for r in errors] == [2, 3]
+    assert errors[0]["errors"] == {"row": ["could not allocate a unique slug"]}
+    assert records[-1] == {"done": True, "imported": 1, "failed": 2}
+    assert [p.name for p in Product.query] == ["C"]
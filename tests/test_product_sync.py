@@ -0,0 +1,22 @@
+import pytest
+
+from app.dashboard.product_sync import _parse_item
+
+
+@pytest.mark.parametrize("item, error", [
+    ({"product_id": 1, "price": "NaN"}, "price must be a number"),
+    ({"product_id": 1, "price": "1e30"}, "price must be <= 99999999.99"),
+    ({"product_id": 1, "price": "0"}, "price must be > 0"),
+    ({"product_id": 1, "stock": 1.9}, "stock must be an integer"),
+    ({"product_id": 1, "stock": True}, "stock must be an integer"),
+    ({"product_id": True, "stock": 1}, "product_id must be an integer"),
+])
+def test_invalid_items_are_rejected(item, error):
+    with pytest.raises(ValueError, match=error):
+        _parse_item(item)
+
+
+def test_nan_price_is_a_per_item_error(client):
+    resp = client.post("/dashboard/supplier/products/sync", json={"items": [{"product_id": 1, "price": "NaN"}]})
+    assert resp.status_code < 500
+    assert "price must be a number" in resp.get_data(as_text=True)
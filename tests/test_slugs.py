@@ -0,0 +1,10 @@
+from app.catalog.slugs import allocate_slugs
+
+
+def test_generated_suffix_does_not_collide_with_a_literal_base(app):
+    assert allocate_slugs(["coffee", "coffee", "coffee-2"]) == ["coffee", "coffee-2", "coffee-2-2"]
+
+
+def test_batch_slugs_are_unique(app):
+    slugs = allocate_slugs(["x", "x", "x-2", "x-2", "x", None, None])
+    assert len(set(slugs)) == len(slugs)